@@ -21,7 +21,9 @@
 
 # Standard imports
 import os
+import threading
 from datetime import datetime
+from typing import Optional
 # SWARM imports
 from swarm import Agent
     
@@ -29,6 +31,8 @@ from swarm import Agent
 from tools import (
     get_agency_id,
     get_pdf_content,
+    get_pdf_passages,
+    read_result,
     transfer_to_documents, 
     transfer_to_comments,
     transfer_to_dockets,    
@@ -38,10 +42,13 @@ from tools import (
 from rga_tools import(
     get_documents,
     get_document_details,
+    get_document_details_many,
     get_comments,
     get_comment_details,
+    get_comment_details_many,
     get_dockets,
     get_docket_details,
+    get_docket_details_many,
 )
 
 # Default model for all agents
@@ -76,16 +83,73 @@ def load_instructions(file_name: str, **kwargs) -> str:
 
 
 ##########################################################################################
-# Get the current date for dynamic substitution in instructions for all agents
+# Cache-Friendly Instructions
+#
+# The instructions are sent at the start of every call, so provider-side prompt caching only
+# helps if they begin with the same bytes each time. The markdown is therefore loaded once and
+# only refers to `current_date` by name; the values that change (today's date, session facts)
+# go in a short Session Context block at the end. Swarm calls the
+# instructions with the conversation's context variables on every turn, so the date stays
+# current on long-running servers without a restart.
 ##########################################################################################
-current_date = datetime.now().strftime("%Y-%m-%d")
+
+class AgentInstructions:
+    """
+    Callable instructions for a Swarm agent: a static body followed by a small volatile block.
+
+    Attributes:
+        static (str): The instructions without any volatile values.
+    """
+
+    def __init__(self, file_name: str):
+        """
+        Loads the instructions once.
+
+        Args:
+            file_name (str): The name of the markdown file in the 'instructions' folder.
+        """
+        self.static = load_instructions(file_name)
+        self._cached_date = None
+        self._cached_tail = ""
+        self._lock = threading.Lock()
+
+
+    def __call__(self, context_variables: Optional[dict] = None) -> str:
+        """
+        Returns the instructions for this turn.
+
+        Args:
+            context_variables (Optional[dict]): The conversation's context variables. Entries of
+                `session_facts` (a dict) are listed in the volatile block.
+
+        Returns:
+            str: The static instructions, then today's date and any session facts.
+        """
+        tail = self._date_block()
+        session_facts = (context_variables or {}).get("session_facts") or {}
+        if session_facts:
+            tail += "".join(f"- {key}: {value}\n" for key, value in session_facts.items())
+        return self.static + tail
+
+
+    def _date_block(self) -> str:
+        """
+        Returns the block with today's date, rebuilt only when the date changes.
+        """
+        current_date = datetime.now().strftime("%Y-%m-%d")
+        with self._lock:
+            if current_date != self._cached_date:
+                self._cached_date = current_date
+                self._cached_tail = f"\n\n---\n\n## Session Context\n- current_date (today's date): {current_date}\n"
+            return self._cached_tail
+
 
 ##########################################################################################
 # Triage Agent
 ##########################################################################################
 
-# Load instructions for the Triage Agent with dynamic substitution
-TRIAGE_AGENT_INSTRUCTIONS = load_instructions("triage_agent_instructions.md", current_date=current_date)
+# Load instructions for the Triage Agent (the date is added on each call)
+TRIAGE_AGENT_INSTRUCTIONS = AgentInstructions("triage_agent_instructions.md")
 
 # Define the Triage Agent
 triage_agent = Agent(
@@ -101,14 +165,14 @@ triage_agent = Agent(
 ##########################################################################################
 
 # Load instructions for the Documents Agent
-DOCUMENTS_AGENT_INSTRUCTIONS = load_instructions("documents_agent_instructions.md", current_date=current_date)
+DOCUMENTS_AGENT_INSTRUCTIONS = AgentInstructions("documents_agent_instructions.md")
 
 # Define the Documents Agent
 documents_agent = Agent(
     name="Documents Agent",
     instructions=DOCUMENTS_AGENT_INSTRUCTIONS,
     model=default_agent_model,
-    functions=[get_documents, get_document_details, get_agency_id, get_pdf_content, transfer_back_to_triage]
+    functions=[get_documents, get_document_details, get_document_details_many, get_agency_id, get_pdf_content, get_pdf_passages, read_result, transfer_back_to_triage]
 )
 
 ##########################################################################################
@@ -116,13 +180,13 @@ documents_agent = Agent(
 ##########################################################################################
 
 # Load instructions for the Comments Agent
-COMMENTS_AGENT_INSTRUCTIONS = load_instructions("comments_agent_instructions.md", current_date=current_date)
+COMMENTS_AGENT_INSTRUCTIONS = AgentInstructions("comments_agent_instructions.md")
 
 # Define the Comments Agent
 comments_agent = Agent(
     name="Comments Agent",
     instructions=COMMENTS_AGENT_INSTRUCTIONS,
-    functions=[get_comments, get_comment_details, get_agency_id, get_pdf_content, transfer_back_to_triage]
+    functions=[get_comments, get_comment_details, get_comment_details_many, get_agency_id, get_pdf_content, get_pdf_passages, read_result, transfer_back_to_triage]
 )
 
 ##########################################################################################
@@ -130,13 +194,13 @@ comments_agent = Agent(
 ##########################################################################################
 
 # Load instructions for the Dockets Agent
-DOCKETS_AGENT_INSTRUCTIONS = load_instructions("dockets_agent_instructions.md", current_date=current_date)
+DOCKETS_AGENT_INSTRUCTIONS = AgentInstructions("dockets_agent_instructions.md")
 
 # Define the Dockets Agent
 dockets_agent = Agent(
     name="Dockets Agent",
     instructions=DOCKETS_AGENT_INSTRUCTIONS,
-    functions=[get_dockets, get_docket_details, get_agency_id, get_pdf_content, transfer_back_to_triage]
+    functions=[get_dockets, get_docket_details, get_docket_details_many, get_agency_id, get_pdf_content, read_result, transfer_back_to_triage]
 )
 
 
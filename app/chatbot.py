@@ -26,6 +26,7 @@
 
 import os
 import sys
+import uuid
 import dotenv
 import json
 
@@ -36,11 +37,14 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from openai import AzureOpenAI
 
 # Import for SWARM 
-from swarm import Swarm
 from swarm.repl.repl import process_and_print_streaming_response, pretty_print_messages
 
 # Import the main agent
-from app.agents import triage_agent
+from app.agents import triage_agent, documents_agent, comments_agent, dockets_agent
+from app.context_budget import ContextBudget
+from app.parallel_swarm import ParallelSwarm
+from app.query_router import QueryRouter
+from app.fan_out import FanOutCoordinator
 
 
 # Load the .env file
@@ -68,18 +72,66 @@ def run_chatbot_loop(
     
     # Initialize the SWARM client
     print("\nStarting RGA Console Chatbot\n")
-    swarm_client = Swarm(client=aoai_client)
+    swarm_client = ParallelSwarm(client=aoai_client, max_workers=int(os.getenv("SWARM_TOOL_WORKERS", "8")))
 
     # Initialize the messages list
     messages = []
 
+    # Tools store large results per session; the ID scopes their handles to this conversation
+    context_variables = {"session_id": uuid.uuid4().hex}
+
+    # Only the part of the history that fits the agent's token budget is sent each turn
+    context_budget = ContextBudget(max_tokens=int(os.getenv("CHAT_CONTEXT_MAX_TOKENS", "12000")))
+
+    # Clear queries skip the Triage Agent's LLM call and go straight to the specialist
+    query_router = QueryRouter(
+        threshold=float(os.getenv("QUERY_ROUTER_THRESHOLD", "0.8")),
+        enabled=os.getenv("QUERY_ROUTER_ENABLED", "true").lower() == "true",
+    )
+    specialists = {"documents": documents_agent, "comments": comments_agent, "dockets": dockets_agent}
+    swarm_client.precompute_tool_schemas(triage_agent, *specialists.values())
+
+    # Compound questions run the specialists concurrently instead of transferring between them
+    fan_out = FanOutCoordinator(
+        swarm_client,
+        specialists,
+        model=triage_agent.model,
+        router=query_router,
+        enabled=os.getenv("CHAT_FAN_OUT_ENABLED", "true").lower() == "true",
+    )
+
     while True:
         user_input = input("\033[90mUser\033[0m: ")
         messages.append({"role": "user", "content": user_input})
 
+        if starting_agent is triage_agent:
+            result = fan_out.run(user_input, context_variables=context_variables, history=messages[:-1])
+            if result:
+                pretty_print_messages(result["messages"])
+                print(f"\033[90mAnswered by {', '.join(task['agent'] for task in result['tasks'])} "
+                      f"in {result['seconds']}s\033[0m")
+                if capture_tools_called and result["tools_called"]:
+                    print("\n\033[93mTools Called:\033[0m")
+                    for tool in result["tools_called"]:
+                        print(f"  - Tool: {tool['tool_name']}, Arguments: {tool['arguments']}")
+                if capture_internal_chatter and result["internal_chatter"]:
+                    print("\n\033[96mInternal Chatter:\033[0m")
+                    for message in result["internal_chatter"]:
+                        print(f"  - {message}")
+                messages.extend(result["messages"])
+                continue
+
+        decision = None
+        if starting_agent is triage_agent:
+            decision = query_router.route(user_input)
+            if decision["label"]:
+                starting_agent = specialists[decision["label"]]
+                print(f"\033[90mRouted to {starting_agent.name} (confidence {decision['confidence']})\033[0m")
+
         response = swarm_client.run(
             agent=starting_agent,
-            messages=messages,
+            messages=context_budget.prepare(messages, starting_agent.name),
+            context_variables=context_variables,
             stream=stream,
             debug=debug,
             capture_tools_called=capture_tools_called,
@@ -101,6 +153,16 @@ def run_chatbot_loop(
             for message in response.internal_chatter:
                 print(f"  - {message}")
 
+        if context_budget.last_metrics.get("tokens_saved"):
+            metrics = context_budget.last_metrics
+            print(f"\033[90mContext: {metrics['tokens_before']:,} -> {metrics['tokens_after']:,} tokens "
+                  f"(saved {metrics['tokens_saved']:,})\033[0m")
+
+        if decision and not decision["label"]:
+            # Record the Triage Agent's choice, so the router's threshold can be tuned
+            actual = next((label for label, agent in specialists.items() if agent.name == response.agent.name), "other")
+            query_router.observe(decision, actual)
+
         messages.extend(response.messages)
         starting_agent = response.agent
         print(f"Starting agent: {starting_agent.name}")
@@ -0,0 +1,249 @@
+"""
+context_budget.py
+
+Keeps the conversation sent to Azure OpenAI within a token budget.
+
+The chat loops keep every message and tool output, and Swarm resends all of them on every turn,
+so each turn is slower and more expensive than the last. `ContextBudget.prepare` builds the list
+that is actually sent, leaving the full history untouched for display:
+
+1. The latest user message and everything after it are always kept as they are.
+2. Old tool outputs are cut to a short preview first, oldest first. The tool messages stay, so
+   every assistant tool call still has its answer.
+3. If that is not enough, the oldest turns (a user message and everything up to the next one)
+   are folded into a rolling summary: one line per turn with the question, the tools used and
+   the start of the answer, sent as a system message ahead of the remaining turns.
+
+Tokens are estimated at four characters each, which is close enough for budgeting and needs no
+tokenizer. Each call records how many tokens it saved in `last_metrics`, and `stats()` totals
+them for the session.
+
+Usage Example:
+
+    budget = ContextBudget(max_tokens=12000, agent_budgets={"Triage Agent": 4000})
+    response = swarm_client.run(agent=agent, messages=budget.prepare(messages, agent.name))
+    messages.extend(response.messages)
+    print(budget.last_metrics)
+"""
+
+# Import necessary libraries
+import json
+import logging
+from typing import Optional, Dict, Any, List
+
+
+# Create a module-specific logger
+logger = logging.getLogger(__name__)
+
+# Characters per token for the estimate
+CHARS_PER_TOKEN = 4
+
+# Tokens added per message for its role and formatting
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Characters of a trimmed tool output that are kept as a preview
+TOOL_PREVIEW_CHARS = 300
+
+# Characters of the question and of the answer kept per summarized turn
+SUMMARY_QUESTION_CHARS = 200
+SUMMARY_ANSWER_CHARS = 300
+
+# The rolling summary keeps its most recent lines up to this many characters
+MAX_SUMMARY_CHARS = 3000
+
+# Agents that need less history than the default budget; the triage agent only routes
+DEFAULT_AGENT_BUDGETS = {"Triage Agent": 4000}
+
+
+def estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    """
+    Estimates the prompt tokens of a list of chat messages (content and tool calls).
+
+    Args:
+        messages (List[Dict[str, Any]]): The messages.
+
+    Returns:
+        int: The estimated token count.
+    """
+    chars = 0
+    for message in messages:
+        chars += len(message.get("content") or "")
+        for tool_call in message.get("tool_calls") or []:
+            function = tool_call.get("function") or {}
+            chars += len(function.get("name") or "") + len(function.get("arguments") or "")
+    return chars // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS * len(messages)
+
+
+def _clip(text: str, limit: int) -> str:
+    """
+    Shortens text to `limit` characters on one line.
+    """
+    text = " ".join(str(text or "").split())
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+class ContextBudget:
+    """
+    Trims the messages sent to the model to a per-agent token budget.
+
+    Attributes:
+        max_tokens (int): The default budget for the messages (the agent instructions and tool
+            schemas come on top).
+        agent_budgets (Dict[str, int]): Budgets for particular agents, by agent name.
+        last_metrics (Dict[str, Any]): What the last `prepare` call did.
+    """
+
+    def __init__(self, max_tokens: int = 12000, agent_budgets: Optional[Dict[str, int]] = None):
+        """
+        Initializes the budget.
+
+        Args:
+            max_tokens (int): The default budget for the messages.
+            agent_budgets (Optional[Dict[str, int]]): Budgets for particular agents, by agent name.
+                Defaults to `DEFAULT_AGENT_BUDGETS`.
+        """
+        self.max_tokens = max_tokens
+        self.agent_budgets = dict(DEFAULT_AGENT_BUDGETS if agent_budgets is None else agent_budgets)
+        self.last_metrics: Dict[str, Any] = {}
+        self._turns = 0
+        self._tokens_before = 0
+        self._tokens_saved = 0
+
+
+    def budget_for(self, agent_name: Optional[str] = None) -> int:
+        """
+        Returns the token budget of an agent.
+        """
+        return min(self.agent_budgets.get(agent_name, self.max_tokens), self.max_tokens)
+
+
+    def prepare(self, messages: List[Dict[str, Any]], agent_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Returns the messages to send for the next turn, within the agent's budget.
+
+        The list passed in is not changed.
+
+        Args:
+            messages (List[Dict[str, Any]]): The full conversation history.
+            agent_name (Optional[str]): The agent that will answer, for its budget.
+
+        Returns:
+            List[Dict[str, Any]]: The messages to send: an optional summary system message, the
+            kept earlier turns (with trimmed tool outputs) and the latest turn.
+        """
+        budget = self.budget_for(agent_name)
+        before = estimate_tokens(messages)
+        metrics = {
+            "agent": agent_name,
+            "budget": budget,
+            "tokens_before": before,
+            "tool_outputs_trimmed": 0,
+            "turns_summarized": 0,
+        }
+
+        # Split the history into turns, each starting at a user message
+        turns: List[List[Dict[str, Any]]] = []
+        for message in messages:
+            if message.get("role") == "user" or not turns:
+                turns.append([])
+            turns[-1].append(message)
+        latest = turns.pop() if turns else []
+
+        # 1. Cut old tool outputs to a preview, oldest first
+        turns = [list(turn) for turn in turns]
+        for turn in turns:
+            if estimate_tokens(self._flatten(turns, latest, [])) <= budget:
+                break
+            for position, message in enumerate(turn):
+                content = message.get("content") or ""
+                if message.get("role") == "tool" and len(content) > TOOL_PREVIEW_CHARS:
+                    turn[position] = {**message, "content": self._trim_tool_output(message)}
+                    metrics["tool_outputs_trimmed"] += 1
+
+        # 2. Fold the oldest turns into the rolling summary
+        summary: List[str] = []
+        while turns and estimate_tokens(self._flatten(turns, latest, summary)) > budget:
+            summary.append(self._summarize_turn(turns.pop(0)))
+            metrics["turns_summarized"] += 1
+
+        prepared = self._flatten(turns, latest, summary)
+        after = estimate_tokens(prepared)
+        metrics.update(tokens_after=after, tokens_saved=before - after, over_budget=after > budget)
+        self.last_metrics = metrics
+        self._turns += 1
+        self._tokens_before += before
+        self._tokens_saved += before - after
+        if metrics["tokens_saved"]:
+            logger.info("Context for %s: %s -> %s tokens (budget %s)", agent_name, before, after, budget)
+        return prepared
+
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Totals the savings of every `prepare` call so far.
+
+        Returns:
+            Dict[str, Any]: turns, tokens_before, tokens_saved and saved_ratio.
+        """
+        return {
+            "turns": self._turns,
+            "tokens_before": self._tokens_before,
+            "tokens_saved": self._tokens_saved,
+            "saved_ratio": round(self._tokens_saved / self._tokens_before, 3) if self._tokens_before else 0.0,
+        }
+
+
+    def _flatten(self, turns: List[List[Dict[str, Any]]], latest: List[Dict[str, Any]], summary: List[str]) -> List[Dict[str, Any]]:
+        """
+        Joins the summary, the kept turns and the latest turn into one message list.
+        """
+        messages = []
+        if summary:
+            text = "\n".join(summary)
+            if len(text) > MAX_SUMMARY_CHARS:
+                text = "…" + text[-MAX_SUMMARY_CHARS:].split("\n", 1)[-1]
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{text}"})
+        for turn in turns:
+            messages.extend(turn)
+        messages.extend(latest)
+        return messages
+
+
+    def _trim_tool_output(self, message: Dict[str, Any]) -> str:
+        """
+        Replaces a tool output with its start and a note that it was trimmed.
+        """
+        content = message.get("content") or ""
+        name = message.get("tool_name") or "the tool"
+        return (
+            f"{content[:TOOL_PREVIEW_CHARS]}… [Output of {name} trimmed from {len(content):,} characters "
+            f"to save context; call the tool again if the details are needed.]"
+        )
+
+
+    def _summarize_turn(self, turn: List[Dict[str, Any]]) -> str:
+        """
+        Describes one turn in a line: the question, the tools used and the start of the answer.
+        """
+        question = next((message.get("content") for message in turn if message.get("role") == "user"), "")
+        tools = []
+        for message in turn:
+            for tool_call in message.get("tool_calls") or []:
+                function = tool_call.get("function") or {}
+                arguments = function.get("arguments") or ""
+                try:
+                    arguments = ", ".join(f"{key}={value}" for key, value in json.loads(arguments).items())
+                except (ValueError, AttributeError):
+                    pass
+                tools.append(f"{function.get('name')}({_clip(arguments, 80)})")
+        answer = next(
+            (message.get("content") for message in reversed(turn) if message.get("role") == "assistant" and message.get("content")),
+            "",
+        )
+
+        line = f"- User: {_clip(question, SUMMARY_QUESTION_CHARS)}"
+        if tools:
+            line += f" | Tools: {'; '.join(tools)}"
+        if answer:
+            line += f" | Answer: {_clip(answer, SUMMARY_ANSWER_CHARS)}"
+        return line
@@ -0,0 +1,280 @@
+"""
+fan_out.py
+
+Answers compound questions by running the specialist agents at the same time.
+
+A question like "show the docket, its proposed rule and the latest comments" needs all three
+specialists. Through the Triage Agent it becomes a chain of transfers (Triage -> Dockets ->
+Triage -> Documents -> Triage -> Comments), each hop another LLM call made after the previous one.
+`FanOutCoordinator` instead:
+
+1. Checks locally whether the question makes separate requests of more than one kind of
+   content (documents, comments, dockets); other questions, including "comments on docket X",
+   take the usual path with no extra call.
+2. Asks the model once to split the question into sub-tasks, one per specialist, as JSON. The
+   recent conversation goes with it, so a follow-up like "now show its docket and the latest
+   comments" gets the IDs from earlier turns written into the sub-tasks.
+3. Runs the specialists on their sub-tasks at the same time, each with its own tools. Their
+   transfer tools are removed, so a branch cannot wander off to another agent.
+4. Merges the branch answers into one reply in a final synthesis call.
+
+End-to-end latency is then the planning call, the slowest branch and the synthesis call,
+rather than every hop added together. A branch that fails is reported in the reply instead of
+failing the others.
+
+Usage Example:
+
+    coordinator = FanOutCoordinator(swarm_client, specialists, router=query_router)
+    result = coordinator.run(user_input, context_variables={"session_id": session_id}, history=messages[:-1])
+    if result:
+        messages.extend(result["messages"])
+"""
+
+# Import necessary libraries
+import contextvars
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List
+
+from query_router import QueryRouter
+
+
+# Create a module-specific logger
+logger = logging.getLogger(__name__)
+
+# Most sub-tasks a question is split into
+MAX_TASKS = 4
+
+# Recent user and assistant messages passed to the planner and the branches, and the
+# characters kept of each
+HISTORY_MESSAGES = 6
+HISTORY_MESSAGE_CHARS = 1500
+
+# Most LLM turns (tool rounds included) a specialist gets for its sub-task
+MAX_BRANCH_TURNS = 8
+
+# Prompt of the planning call
+PLANNER_PROMPT = """You split questions about regulations.gov into sub-tasks for specialist agents.
+Agents: "documents" (rules, notices and other documents, and their attachments), "comments" (public comments) and "dockets" (docket details).
+Return JSON: {"tasks": [{"agent": "...", "task": "..."}]}.
+Give one task per agent that is needed, each a complete, self-contained request that repeats any IDs, agencies, topics and dates from the question.
+The question may refer back to the conversation ("its docket", "that rule"); write the IDs and names it refers to into the tasks.
+If the question needs only one agent, return a single task."""
+
+# Prompt of the synthesis call
+SYNTHESIS_PROMPT = """You are the regulations.gov assistant. Specialist agents have each answered part of the user's question.
+Combine their answers into one clear reply to the question. Use only the information in their answers; keep IDs, titles, dates and links as given.
+If a part could not be answered, say so briefly."""
+
+
+def _recent_conversation(history: Optional[List[Dict[str, Any]]]) -> str:
+    """
+    Renders the last user and assistant messages as a short preamble, or "" if there are none.
+    """
+    lines = []
+    for message in (history or []):
+        if message.get("role") in ("user", "assistant") and message.get("content"):
+            content = message["content"]
+            if len(content) > HISTORY_MESSAGE_CHARS:
+                content = content[:HISTORY_MESSAGE_CHARS] + "…"
+            lines.append(f"{message['role'].title()}: {content}")
+    lines = lines[-HISTORY_MESSAGES:]
+    return "Recent conversation:\n" + "\n\n".join(lines) + "\n\n" if lines else ""
+
+
+class FanOutCoordinator:
+    """
+    Splits compound questions into sub-tasks and runs the specialist agents on them concurrently.
+
+    Attributes:
+        swarm_client (Any): The Swarm client that runs the agents.
+        specialists (Dict[str, Any]): The specialist agents by label ("documents", "comments",
+            "dockets").
+        model (str): The model used for planning and synthesis.
+        enabled (bool): When False, `run` always returns None.
+    """
+
+    def __init__(
+        self,
+        swarm_client: Any,
+        specialists: Dict[str, Any],
+        model: str = "gpt-4o",
+        router: Optional[QueryRouter] = None,
+        enabled: bool = True,
+    ):
+        """
+        Initializes the coordinator.
+
+        Args:
+            swarm_client (Any): The Swarm client that runs the agents; its OpenAI client is also
+                used for planning and synthesis.
+            specialists (Dict[str, Any]): The specialist agents by label.
+            model (str): The model used for planning and synthesis.
+            router (Optional[QueryRouter]): Tells which specialists a question asks something of. A new one is
+                created if not given.
+            enabled (bool): When False, `run` always returns None.
+        """
+        self.swarm_client = swarm_client
+        self.specialists = specialists
+        self.model = model
+        self.router = router or QueryRouter()
+        self.enabled = enabled
+
+        # Each branch works on its own sub-task, so it gets no way to transfer elsewhere
+        self._branch_agents = {
+            label: agent.model_copy(update={
+                "functions": [function for function in agent.functions if not function.__name__.startswith("transfer_")]
+            })
+            for label, agent in specialists.items()
+        }
+        self._executor = ThreadPoolExecutor(max_workers=MAX_TASKS * 2, thread_name_prefix="fan-out")
+
+
+    def is_compound(self, query: str) -> bool:
+        """
+        Tells whether a question makes separate requests of more than one specialist, without an
+        LLM call.
+        """
+        return len(self.router.requested_labels(query)) > 1
+
+
+    def plan(self, query: str, history: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, str]]:
+        """
+        Asks the model to split a question into sub-tasks for the specialists.
+
+        Args:
+            query (str): The user's question.
+            history (Optional[List[Dict[str, Any]]]): The conversation before the question.
+
+        Returns:
+            List[Dict[str, str]]: Up to `MAX_TASKS` tasks, each with `agent` (a specialist label)
+            and `task`. Empty if the model's answer could not be used.
+        """
+        try:
+            completion = self.swarm_client.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": PLANNER_PROMPT},
+                    {"role": "user", "content": f"{_recent_conversation(history)}Question: {query}"},
+                ],
+                response_format={"type": "json_object"},
+                temperature=0,
+            )
+            tasks = json.loads(completion.choices[0].message.content).get("tasks") or []
+        except Exception as err:
+            logger.error("Planning failed: %s", err)
+            return []
+
+        plan = []
+        for task in tasks:
+            if isinstance(task, dict) and task.get("agent") in self.specialists and str(task.get("task") or "").strip():
+                plan.append({"agent": task["agent"], "task": str(task["task"]).strip()})
+        return plan[:MAX_TASKS]
+
+
+    def run(
+        self,
+        query: str,
+        context_variables: Optional[dict] = None,
+        history: Optional[List[Dict[str, Any]]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Answers a compound question with the specialists running concurrently.
+
+        Args:
+            query (str): The user's question.
+            context_variables (Optional[dict]): Passed to every branch (e.g., the session ID).
+            history (Optional[List[Dict[str, Any]]]): The conversation before the question. Its
+                recent messages go to the planner and the branches.
+
+        Returns:
+            Optional[Dict[str, Any]]: None when the question is not compound or splits into
+            fewer than two tasks; the caller then takes the usual path. Otherwise `answer`,
+            `messages` (the reply as an assistant message, for the history), `tasks` (each with
+            its `answer`, `seconds`, `tools_called` and `internal_chatter`), `tools_called` and
+            `internal_chatter` (those of every branch, in task order) and `seconds`.
+        """
+        if not self.enabled or not self.is_compound(query):
+            return None
+
+        start = time.perf_counter()
+        tasks = self.plan(query, history)
+        if len(tasks) < 2:
+            return None
+        logger.info("Fanning out %r into %s", query[:80], [task["agent"] for task in tasks])
+
+        futures = [
+            self._executor.submit(contextvars.copy_context().run, self._run_branch, task, query, history, dict(context_variables or {}))
+            for task in tasks
+        ]
+        branches = [future.result() for future in futures]
+        answer = self._synthesize(query, branches)
+
+        return {
+            "answer": answer,
+            "messages": [{"role": "assistant", "sender": "Triage Agent", "content": answer}],
+            "tasks": branches,
+            "tools_called": [tool for branch in branches for tool in branch["tools_called"]],
+            "internal_chatter": [message for branch in branches for message in branch["internal_chatter"]],
+            "seconds": round(time.perf_counter() - start, 2),
+        }
+
+
+    def _run_branch(self, task: Dict[str, str], query: str, history: Optional[List[Dict[str, Any]]], context_variables: dict) -> Dict[str, Any]:
+        """
+        Runs one specialist on its sub-task and returns the task with its answer, the tools it
+        called and its internal chatter.
+        """
+        start = time.perf_counter()
+        agent = self._branch_agents[task["agent"]]
+        content = f"{_recent_conversation(history)}{task['task']}\n\n(This is part of the user's question: {query})"
+        tools_called, internal_chatter = [], []
+        try:
+            response = self.swarm_client.run(
+                agent=agent,
+                messages=[{"role": "user", "content": content}],
+                context_variables=context_variables,
+                max_turns=MAX_BRANCH_TURNS,
+                capture_tools_called=True,
+                capture_internal_chatter=True,
+            )
+            tools_called = list(response.tools_called or [])
+            internal_chatter = list(response.internal_chatter or [])
+            answer = next(
+                (message["content"] for message in reversed(response.messages) if message.get("role") == "assistant" and message.get("content")),
+                "No answer.",
+            )
+        except Exception as err:
+            logger.error("%s failed on %r: %s", agent.name, task["task"], err)
+            answer = f"Error: {type(err).__name__}: {err}"
+        return {
+            **task,
+            "answer": answer,
+            "seconds": round(time.perf_counter() - start, 2),
+            "tools_called": tools_called,
+            "internal_chatter": internal_chatter,
+        }
+
+
+    def _synthesize(self, query: str, branches: List[Dict[str, Any]]) -> str:
+        """
+        Merges the branch answers into one reply. Falls back to listing them if the call fails.
+        """
+        sections = "\n\n".join(
+            f"### {self.specialists[branch['agent']].name}\nTask: {branch['task']}\n\n{branch['answer']}" for branch in branches
+        )
+        try:
+            completion = self.swarm_client.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": SYNTHESIS_PROMPT},
+                    {"role": "user", "content": f"Question: {query}\n\nSpecialist answers:\n\n{sections}"},
+                ],
+                temperature=0,
+            )
+            return completion.choices[0].message.content
+        except Exception as err:
+            logger.error("Synthesis failed: %s", err)
+            return sections
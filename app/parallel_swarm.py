@@ -0,0 +1,203 @@
+"""
+parallel_swarm.py
+
+A Swarm client that runs the tool calls of one assistant message concurrently.
+
+When the model asks for several tools at once (e.g., `get_document_details` for five IDs and
+`get_agency_id`), Swarm runs them one after another, so the turn takes as long as all the API
+round-trips added together. `ParallelSwarm` runs them on a bounded thread pool instead, so the
+turn takes about as long as the slowest one:
+
+- Each call goes through Swarm's own `handle_tool_calls`, one call at a time, so arguments,
+  `context_variables` and results are handled exactly as before.
+- The tool messages are added in the order the model asked for them.
+- A tool that raises only fails its own call: its message carries the error, and the other
+  calls still answer. A lone call that raises is handled the same way.
+- Agent transfers (`transfer_*`) run last, one at a time and in order, after every other tool
+  has answered, so the next agent is chosen exactly as it would be sequentially.
+
+It also builds each agent's tool schemas once. Swarm rebuilds them from the function
+signatures on every model call; `ParallelSwarm` keeps them per set of functions on the client
+and sends copies, so every call carries the same tool definitions without the rebuild.
+
+Usage Example:
+
+    swarm_client = ParallelSwarm(client=aoai_client, max_workers=8)
+    response = swarm_client.run(agent=triage_agent, messages=messages)
+"""
+
+# Import necessary libraries
+import contextvars
+import copy
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from swarm import Swarm
+from swarm.core import __CTX_VARS_NAME__
+from swarm.types import Response
+from swarm.util import debug_print, function_to_json
+
+
+# Create a module-specific logger
+logger = logging.getLogger(__name__)
+
+# Tool calls run at the same time, across all conversations served by one client
+DEFAULT_MAX_WORKERS = 8
+
+# Tools whose names start with this hand the conversation to another agent
+TRANSFER_PREFIX = "transfer_"
+
+
+class ParallelSwarm(Swarm):
+    """
+    A Swarm client whose tool calls within one assistant message run concurrently.
+
+    Attributes:
+        max_workers (int): The most tool calls running at the same time.
+    """
+
+    def __init__(self, client: Any = None, max_workers: int = DEFAULT_MAX_WORKERS, **kwargs: Any):
+        """
+        Initializes the client.
+
+        Args:
+            client (Any): The OpenAI (or Azure OpenAI) client.
+            max_workers (int): The most tool calls running at the same time.
+            **kwargs: Passed on to `Swarm`.
+        """
+        super().__init__(client=client, **kwargs)
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="swarm-tool")
+        self._tool_schemas: Dict[Tuple[Any, ...], List[dict]] = {}
+        self._schemas_lock = threading.Lock()
+
+
+    def tool_schemas(self, agent: Any) -> List[dict]:
+        """
+        Returns the tool schemas of an agent's functions, built on first use.
+
+        Args:
+            agent (Any): The agent.
+
+        Returns:
+            List[dict]: A copy of the schemas, without the `context_variables` parameter.
+        """
+        key = tuple(agent.functions)
+        with self._schemas_lock:
+            tools = self._tool_schemas.get(key)
+            if tools is None:
+                tools = []
+                for function in agent.functions:
+                    tool = function_to_json(function)
+                    parameters = tool["function"]["parameters"]
+                    parameters["properties"].pop(__CTX_VARS_NAME__, None)
+                    if __CTX_VARS_NAME__ in parameters.get("required", []):
+                        parameters["required"].remove(__CTX_VARS_NAME__)
+                    tools.append(tool)
+                self._tool_schemas[key] = tools
+        return copy.deepcopy(tools)
+
+
+    def precompute_tool_schemas(self, *agents: Any) -> None:
+        """
+        Builds the tool schemas of the agents up front.
+
+        Args:
+            *agents (Any): The agents.
+        """
+        for agent in agents:
+            self.tool_schemas(agent)
+
+
+    def get_chat_completion(self, agent: Any, history: List[dict], context_variables: dict, model_override: Any, stream: bool, debug: bool) -> Any:
+        """
+        Calls the model for an agent, as Swarm does, with the agent's cached tool schemas.
+        """
+        context_variables = defaultdict(str, context_variables)
+        instructions = agent.instructions(context_variables) if callable(agent.instructions) else agent.instructions
+        messages = [{"role": "system", "content": instructions}] + history
+        debug_print(debug, "Getting chat completion for...:", messages)
+
+        tools = self.tool_schemas(agent)
+        create_params = {
+            "model": model_override or agent.model,
+            "messages": messages,
+            "tools": tools or None,
+            "tool_choice": agent.tool_choice,
+            "stream": stream,
+        }
+        if tools:
+            create_params["parallel_tool_calls"] = agent.parallel_tool_calls
+        return self.client.chat.completions.create(**create_params)
+
+
+    def handle_tool_calls(self, tool_calls: List[Any], functions: List[Any], context_variables: dict, debug: bool, *args: Any, **kwargs: Any) -> Response:
+        """
+        Runs the tool calls of one assistant message, the independent ones concurrently.
+
+        Args:
+            tool_calls (List[Any]): The tool calls of the assistant message.
+            functions (List[Any]): The active agent's functions.
+            context_variables (dict): The conversation's context variables.
+            debug (bool): Whether Swarm prints debug output.
+            *args, **kwargs: Anything else Swarm passes, handed on unchanged.
+
+        Returns:
+            Response: The tool messages (in the order of `tool_calls`), the merged context
+            variables, and the agent chosen by the last transfer, if any.
+        """
+        def run_one(tool_call: Any) -> Response:
+            return self._run_one(tool_call, functions, context_variables, debug, *args, **kwargs)
+
+        if len(tool_calls) == 1:
+            return run_one(tool_calls[0])
+
+        transfers = [tool_call for tool_call in tool_calls if tool_call.function.name.startswith(TRANSFER_PREFIX)]
+        others = [tool_call for tool_call in tool_calls if not tool_call.function.name.startswith(TRANSFER_PREFIX)]
+
+        # Each call keeps the caller's context variables (e.g., the request priority)
+        futures = [self._executor.submit(contextvars.copy_context().run, run_one, tool_call) for tool_call in others]
+        results = {id(tool_call): future.result() for tool_call, future in zip(others, futures)}
+        for tool_call in transfers:
+            results[id(tool_call)] = run_one(tool_call)
+
+        merged = Response(messages=[], agent=None, context_variables={})
+        for tool_call in tool_calls:
+            partial = results[id(tool_call)]
+            merged.messages.extend(partial.messages)
+            merged.context_variables.update(partial.context_variables)
+            if partial.agent is not None:
+                merged.agent = partial.agent
+        return merged
+
+
+    def _run_one(self, tool_call: Any, functions: List[Any], context_variables: dict, debug: bool, *args: Any, **kwargs: Any) -> Response:
+        """
+        Runs one tool call through Swarm's own handler. If the tool raises, the error becomes the
+        call's tool message, whether or not other calls came with it.
+        """
+        try:
+            return super().handle_tool_calls([tool_call], functions, context_variables, debug, *args, **kwargs)
+        except Exception as err:
+            # Isolate the failure to this call; the model sees the error as the tool's answer
+            logger.error("Tool %s failed: %s", tool_call.function.name, err)
+            return Response(
+                messages=[{
+                    "role": "tool",
+                    "tool_call_id": tool_call.id,
+                    "tool_name": tool_call.function.name,
+                    "content": f"Error: {type(err).__name__}: {err}",
+                }],
+                agent=None,
+                context_variables={},
+            )
+
+
+    def shutdown(self) -> None:
+        """
+        Stops the tool thread pool once running calls finish.
+        """
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,376 @@
+"""
+query_router.py
+
+A local pre-router that sends clear queries straight to the specialist agent.
+
+Every new request first costs a full Azure OpenAI round-trip in the Triage Agent, only to pick
+`transfer_to_documents`, `transfer_to_comments` or `transfer_to_dockets`. `QueryRouter` makes that
+choice locally, in well under a millisecond, when the query is clear:
+
+1. A multinomial naive Bayes classifier, trained on the example queries below, scores the labels
+   "documents", "comments", "dockets" and "other" (out of scope).
+2. Rules add evidence on top: keywords ("comment", "docket", "proposed rule", ...), docket IDs
+   (e.g., `EPA-HQ-OAR-2021-0317`), document or comment IDs (a docket ID plus a sequence number)
+   and Federal Register document numbers (e.g., `2024-04567`). A docket ID next to "documents"
+   or "comments" is a filter, not a request about the docket, so it does not count for dockets.
+3. When the best label is a specialist and its probability reaches the threshold, the query is
+   routed. Otherwise (unclear, out of scope or asking for a clarification), the Triage Agent
+   decides as before.
+
+To tune the threshold, the chat loops report what the Triage Agent chose after each fallback
+(`observe`), and `stats()` shows the accuracy and coverage the router would have at several
+thresholds, with its latency.
+
+Usage Example:
+
+    router = QueryRouter(threshold=0.8)
+    decision = router.route("Find comments on EPA-HQ-OAR-2021-0317")
+    if decision["label"]:
+        agent = specialists[decision["label"]]
+"""
+
+# Import necessary libraries
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter, deque
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+
+from rga_passages import tokenize
+
+
+# Create a module-specific logger
+logger = logging.getLogger(__name__)
+
+# Labels the classifier scores; "other" covers out-of-scope and unclear queries
+LABELS = ("documents", "comments", "dockets", "other")
+
+# Probability the best label needs before the query is routed without the Triage Agent
+DEFAULT_THRESHOLD = 0.8
+
+# Laplace smoothing of the word counts
+SMOOTHING = 1.0
+
+# How much more likely a rule makes its label (a likelihood ratio applied to the classifier's odds)
+KEYWORD_WEIGHT = 6.0
+DOCKET_ID_WEIGHT = 8.0
+ITEM_ID_WEIGHT = 3.0
+FR_DOC_WEIGHT = 8.0
+
+# Keywords that point to a label; phrases are matched on stemmed terms
+KEYWORDS = {
+    "documents": [
+        "document", "rule", "proposed rule", "final rule", "notice", "federal register", "fr doc",
+        "pdf", "attachment", "regulation", "guidance", "rulemaking",
+    ],
+    "comments": ["comment", "commenter", "public comment", "submission", "submitted", "commented"],
+    "dockets": ["docket"],
+}
+
+# Thresholds reported by `stats()` for tuning
+STATS_THRESHOLDS = (0.5, 0.6, 0.7, 0.8, 0.9, 0.95)
+
+# Example queries the classifier is trained on
+TRAINING_EXAMPLES = [
+    ("documents", "Find proposed rules about water quality"),
+    ("documents", "Show me the latest EPA final rules"),
+    ("documents", "What rules were posted this week by the FDA?"),
+    ("documents", "Search for documents on greenhouse gas emissions"),
+    ("documents", "Summarize the proposed rule on vehicle emissions standards"),
+    ("documents", "Get the PDF of this rule and explain the exemptions"),
+    ("documents", "Which notices did the Department of Energy publish last month?"),
+    ("documents", "What does the regulation say about small businesses?"),
+    ("documents", "Find Federal Register notices about endangered species"),
+    ("documents", "Open the attachment and summarize section 3"),
+    ("documents", "Are there any rules open for comment on pesticides?"),
+    ("documents", "List documents with a comment period ending soon"),
+    ("documents", "Find guidance documents from the Department of Education"),
+    ("documents", "What is the effective date of the final rule?"),
+    ("documents", "Show me recent OSHA rulemaking on heat safety"),
+    ("documents", "Explain the requirements in this proposed regulation"),
+    ("comments", "Find public comments about the emissions rule"),
+    ("comments", "What did commenters say about the water rule?"),
+    ("comments", "Show comments submitted by the American Petroleum Institute"),
+    ("comments", "How many comments were received on this proposal?"),
+    ("comments", "Summarize the comments opposing the pesticide ban"),
+    ("comments", "Find comments from organizations in California"),
+    ("comments", "What are people saying in the public comments?"),
+    ("comments", "Get the details of this comment and its attachments"),
+    ("comments", "List recent comments posted to the FDA"),
+    ("comments", "Who commented on the student loan rule?"),
+    ("comments", "Show me submissions from individuals about net neutrality"),
+    ("comments", "What concerns did commenters raise?"),
+    ("dockets", "Find dockets about air quality"),
+    ("dockets", "Show me the docket details"),
+    ("dockets", "What is this docket about?"),
+    ("dockets", "List the EPA rulemaking dockets modified this year"),
+    ("dockets", "Give me the abstract and keywords of the docket"),
+    ("dockets", "Which dockets does the FAA have on drones?"),
+    ("dockets", "What is the RIN of this docket?"),
+    ("dockets", "Search nonrulemaking dockets for the Department of Labor"),
+    ("other", "What is the weather today?"),
+    ("other", "Tell me a joke"),
+    ("other", "Hello"),
+    ("other", "Hi there, what can you do?"),
+    ("other", "Thanks!"),
+    ("other", "Who won the game last night?"),
+    ("other", "Write a poem about the ocean"),
+    ("other", "Can you help me?"),
+    ("other", "What's the capital of France?"),
+    ("other", "Translate this sentence into Spanish"),
+    ("other", "Yes"),
+    ("other", "No, the other one"),
+    ("other", "Tell me more"),
+]
+
+# A docket ID ("EPA-HQ-OAR-2021-0317", "FDA-2013-N-0500") with an optional sequence number for
+# a document or comment ("EPA-HQ-OAR-2021-0317-0001")
+_REGULATIONS_ID = re.compile(
+    r"\b[A-Z][A-Z0-9]{1,11}(?:-[A-Z0-9]{1,12})*?-(?:19|20)\d{2}(?:-[A-Z])?-\d{3,6}(-\d{3,6})?\b"
+)
+
+# Where a query moves on to another request ("the docket, its rule and the latest comments")
+_REQUEST_SEPARATORS = re.compile(r"[,;]|\b(?:and|plus|as well as|along with|also)\b", re.IGNORECASE)
+
+# Phrases about a document's comment period, which do not ask for comments
+_FILTER_PHRASES = re.compile(r"\b(?:open for comments?|comment (?:period|deadline|end date|due date)s?)\b", re.IGNORECASE)
+
+# A Federal Register document number ("2024-04567") that is not part of a regulations.gov ID
+_FR_DOC_NUM = re.compile(r"(?<![\w-])(?:19|20)\d{2}-\d{5}(?![\w-])")
+
+
+class QueryRouter:
+    """
+    Routes clear queries to a specialist agent without an LLM call.
+
+    Attributes:
+        threshold (float): Probability the best label needs before the query is routed.
+        enabled (bool): When False, every query falls back to the Triage Agent.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        enabled: bool = True,
+        examples: Optional[Iterable[Tuple[str, str]]] = None,
+        window: int = 1000,
+    ):
+        """
+        Initializes the router and trains its classifier.
+
+        Args:
+            threshold (float): Probability the best label needs before the query is routed.
+            enabled (bool): When False, every query falls back to the Triage Agent.
+            examples (Optional[Iterable[Tuple[str, str]]]): (label, query) pairs to train on.
+                Defaults to `TRAINING_EXAMPLES`.
+            window (int): How many recent latencies and observations `stats()` covers.
+        """
+        self.threshold = threshold
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._routed: Counter = Counter()
+        self._fallbacks = 0
+        self._latencies = deque(maxlen=window)
+        self._observations = deque(maxlen=window)
+        self._keywords = {
+            label: [tuple(tokenize(keyword)) for keyword in keywords] for label, keywords in KEYWORDS.items()
+        }
+        self.train(TRAINING_EXAMPLES if examples is None else examples)
+
+
+    def train(self, examples: Iterable[Tuple[str, str]]) -> None:
+        """
+        Trains the classifier, replacing what it learned before.
+
+        Args:
+            examples (Iterable[Tuple[str, str]]): (label, query) pairs. Labels must be in `LABELS`.
+        """
+        word_counts = {label: Counter() for label in LABELS}
+        label_counts = Counter()
+        for label, query in examples:
+            if label not in word_counts:
+                raise ValueError(f"Unknown label {label!r}; expected one of {LABELS}")
+            label_counts[label] += 1
+            word_counts[label].update(tokenize(query))
+
+        vocabulary = set().union(*word_counts.values())
+        total = sum(label_counts.values())
+        self._log_priors = {label: math.log((label_counts[label] + SMOOTHING) / (total + SMOOTHING * len(LABELS))) for label in LABELS}
+        self._log_likelihoods = {}
+        self._log_unknown = {}
+        for label in LABELS:
+            denominator = sum(word_counts[label].values()) + SMOOTHING * (len(vocabulary) + 1)
+            self._log_likelihoods[label] = {
+                word: math.log((count + SMOOTHING) / denominator) for word, count in word_counts[label].items()
+            }
+            self._log_unknown[label] = math.log(SMOOTHING / denominator)
+        self._vocabulary = vocabulary
+
+
+    def route(self, query: str) -> Dict[str, Any]:
+        """
+        Decides whether a query can skip the Triage Agent.
+
+        Args:
+            query (str): The user's message.
+
+        Returns:
+            Dict[str, Any]: `label` (the specialist to route to, or None to fall back to the
+            Triage Agent), `predicted` (the best label, even when not routed), `confidence`,
+            `reasons` (the rules that fired) and `latency_ms`.
+        """
+        start = time.perf_counter()
+        predicted, confidence, reasons = self._classify(query)
+        routed = self.enabled and predicted != "other" and confidence >= self.threshold
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            self._latencies.append(latency_ms)
+            if routed:
+                self._routed[predicted] += 1
+            else:
+                self._fallbacks += 1
+
+        decision = {
+            "label": predicted if routed else None,
+            "predicted": predicted,
+            "confidence": round(confidence, 3),
+            "reasons": reasons,
+            "latency_ms": round(latency_ms, 3),
+        }
+        logger.debug("Routed %r: %s", query[:80], decision)
+        return decision
+
+
+    def observe(self, decision: Dict[str, Any], actual: str) -> None:
+        """
+        Records which label was right for a routed or fallen-back query, for `stats()`.
+
+        Args:
+            decision (Dict[str, Any]): What `route` returned.
+            actual (str): The right label: the specialist the Triage Agent transferred to, or
+                "other" when it answered itself (a refusal or a clarifying question).
+        """
+        with self._lock:
+            self._observations.append((decision["confidence"], decision["predicted"], actual))
+
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Summarizes the router's decisions, latency and observed accuracy.
+
+        Returns:
+            Dict[str, Any]: `routed` (per label), `fallbacks`, `latency_ms` (mean and p95),
+            `observed` and `by_threshold`: for each threshold, the share of observed queries that
+            would have been routed (`coverage`) and how many of those were right (`accuracy`).
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            observations = list(self._observations)
+            routed = dict(self._routed)
+            fallbacks = self._fallbacks
+
+        by_threshold = {}
+        for threshold in STATS_THRESHOLDS:
+            covered = [(predicted, actual) for confidence, predicted, actual in observations if confidence >= threshold and predicted != "other"]
+            correct = sum(1 for predicted, actual in covered if predicted == actual)
+            by_threshold[threshold] = {
+                "coverage": round(len(covered) / len(observations), 3) if observations else 0.0,
+                "accuracy": round(correct / len(covered), 3) if covered else None,
+            }
+
+        return {
+            "threshold": self.threshold,
+            "routed": routed,
+            "fallbacks": fallbacks,
+            "latency_ms": {
+                "mean": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+                "p95": round(latencies[int(0.95 * (len(latencies) - 1))], 3) if latencies else 0.0,
+            },
+            "observed": len(observations),
+            "by_threshold": by_threshold,
+        }
+
+
+    def requested_labels(self, query: str) -> List[str]:
+        """
+        Lists the specialists a query asks something of, one per request in it.
+
+        The query is split into requests at "and", "plus", "as well as", commas and semicolons.
+        Each request counts for the label of its first keyword, so the other keywords in it
+        (e.g., the docket in "comments on docket X", or the comment period in "rules open for
+        comment") are read as filters. A query with several labels (e.g., "the docket, its
+        proposed rule and the latest comments") is likely compound.
+
+        Args:
+            query (str): The user's message.
+
+        Returns:
+            List[str]: The labels, in the order they are first requested.
+        """
+        labels = []
+        for request in _REQUEST_SEPARATORS.split(query):
+            terms = tokenize(_FILTER_PHRASES.sub(" ", request))
+            matches = [
+                (position, label)
+                for label, phrases in self._keywords.items()
+                for phrase in phrases
+                for position in range(len(terms) - len(phrase) + 1)
+                if phrase and tuple(terms[position:position + len(phrase)]) == phrase
+            ]
+            if matches:
+                label = min(matches)[1]
+                if label not in labels:
+                    labels.append(label)
+        return labels
+
+
+    def _classify(self, query: str) -> Tuple[str, float, List[str]]:
+        """
+        Scores the labels of a query with the classifier and the rules.
+
+        Returns:
+            Tuple[str, float, List[str]]: The best label, its probability and the rules that fired.
+        """
+        terms = tokenize(query)
+        scores = dict(self._log_priors)
+        for label in LABELS:
+            likelihoods = self._log_likelihoods[label]
+            scores[label] += sum(likelihoods.get(term, self._log_unknown[label]) for term in terms if term in self._vocabulary)
+
+        # Rule evidence, as likelihood ratios on top of the classifier
+        reasons = []
+        keyword_labels = {label for label, phrases in self._keywords.items() if any(self._contains(terms, phrase) for phrase in phrases)}
+        if keyword_labels & {"documents", "comments"}:
+            keyword_labels.discard("dockets")  # "comments on docket X": the docket is a filter
+        for label in sorted(keyword_labels):
+            scores[label] += math.log(KEYWORD_WEIGHT)
+            reasons.append(f"keyword:{label}")
+
+        for match in _REGULATIONS_ID.finditer(query):
+            if match.group(1):
+                # A document or comment ID; the keywords or the classifier tell which
+                scores["documents"] += math.log(ITEM_ID_WEIGHT)
+                scores["comments"] += math.log(ITEM_ID_WEIGHT)
+                reasons.append(f"item_id:{match.group(0)}")
+            elif not keyword_labels:
+                scores["dockets"] += math.log(DOCKET_ID_WEIGHT)
+                reasons.append(f"docket_id:{match.group(0)}")
+        if _FR_DOC_NUM.search(query):
+            scores["documents"] += math.log(FR_DOC_WEIGHT)
+            reasons.append("fr_doc_num")
+
+        # Softmax over the log scores
+        best = max(scores, key=scores.get)
+        total = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1.0 / total, reasons
+
+
+    def _contains(self, terms: List[str], phrase: Tuple[str, ...]) -> bool:
+        """
+        Tells whether the terms contain a phrase (a tuple of terms) in order.
+        """
+        size = len(phrase)
+        return size > 0 and any(tuple(terms[position:position + size]) == phrase for position in range(len(terms) - size + 1))
@@ -0,0 +1,263 @@
+"""
+rga_agencies.py
+
+An in-memory index for resolving agency names to Regulations.gov agency IDs.
+
+The `get_agency_id` tool used to re-read `data/agency.json` on every call and hand the whole list
+(~200 agencies) to the model, which cost thousands of prompt tokens just to turn "State
+Department" into `DOS`. `AgencyIndex` loads the file once and answers with the few best
+candidates and their scores, matching in order of confidence:
+
+- the exact agency ID ("epa"),
+- the name or a common alias, ignoring word order, case, punctuation and filler words
+  ("State Dept" matches "U.S. Department of State"),
+- ID and word prefixes ("env prot" matches "Environmental Protection Agency"),
+- trigram similarity, which tolerates typos ("Enviromental Protection Agncy").
+
+Usage Example:
+
+    index = AgencyIndex("data/agency.json")
+    print(index.lookup("state department"))
+    # [{'ID': 'DOS', 'Agency': 'U.S. Department of State', 'score': 0.97}, ...]
+"""
+
+# Import necessary libraries
+import bisect
+import json
+import logging
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Any, List, Set, Tuple
+
+
+# Create a module-specific logger
+logger = logging.getLogger(__name__)
+
+# Candidates below this score are not returned
+MIN_SCORE = 0.3
+
+# Words that do not tell agencies apart
+FILLER_WORDS = frozenset(["the", "of", "and", "for", "on", "u", "s", "us", "united", "states"])
+
+# Common abbreviations, expanded before matching
+ABBREVIATIONS = {
+    "dept": "department",
+    "dep": "department",
+    "admin": "administration",
+    "assn": "association",
+    "natl": "national",
+    "nat": "national",
+    "fed": "federal",
+    "svc": "service",
+    "svcs": "services",
+    "comm": "commission",
+    "corp": "corporation",
+    "gov": "government",
+    "govt": "government",
+    "intl": "international",
+}
+
+# Names people use for agencies that neither the ID nor the official name match
+COMMON_ALIASES = {
+    "DOS": ["state department", "state"],
+    "DOD": ["pentagon", "defense department"],
+    "TREAS": ["treasury"],
+    "USCBP": ["customs and border protection", "cbp", "border patrol"],
+    "ICEB": ["immigration and customs enforcement", "ice"],
+    "COE": ["army corps of engineers", "usace"],
+    "FWS": ["fish and wildlife", "usfws"],
+    "CMS": ["medicare", "medicaid", "centers for medicare and medicaid services"],
+    "NOAA": ["national marine fisheries service", "nmfs", "weather service"],
+    "PTO": ["uspto", "patent office"],
+    "AID": ["usaid"],
+    "USBC": ["census bureau", "census"],
+    "BOP": ["bureau of prisons"],
+    "IRS": ["tax", "internal revenue"],
+    "HHS": ["health department"],
+    "DHS": ["homeland security"],
+    "USDA": ["agriculture"],
+    "DOI": ["interior"],
+    "VA": ["veterans affairs"],
+    "USGS": ["geological survey"],
+    "SSA": ["social security"],
+    "ONCD": ["cyber director"],
+    "FNS": ["snap", "food stamps"],
+}
+
+
+def normalize(text: str) -> Tuple[str, ...]:
+    """
+    Reduces a name to lowercase words, with abbreviations expanded and filler words dropped.
+
+    Args:
+        text (str): An agency name, alias or query.
+
+    Returns:
+        Tuple[str, ...]: The words, in order.
+    """
+    words = re.findall(r"[a-z0-9]+", text.lower().replace("&", " and "))
+    return tuple(ABBREVIATIONS.get(word, word) for word in words if word not in FILLER_WORDS)
+
+
+def _trigrams(words: Tuple[str, ...]) -> Set[str]:
+    """
+    Returns the character trigrams of each word (padded with spaces), so word order does not matter.
+    """
+    trigrams = set()
+    for word in words:
+        padded = f" {word} "
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+class AgencyIndex:
+    """
+    A thread-safe, lazily loaded index of agency IDs, names and aliases.
+
+    Attributes:
+        path (str): The agency list: a JSON array of objects with `ID` and `Agency`.
+        agencies (List[Dict[str, str]]): The loaded agencies (empty until the first lookup).
+    """
+
+    def __init__(self, path: str = "data/agency.json"):
+        """
+        Initializes the index. The file is read on the first lookup.
+
+        Args:
+            path (str): The agency list: a JSON array of objects with `ID` and `Agency`.
+        """
+        self.path = path
+        self.agencies: List[Dict[str, str]] = []
+        self._loaded = False
+        self._lock = threading.Lock()
+
+        # Each key is a name or alias of one agency: (agency position, words, trigrams)
+        self._keys: List[Tuple[int, Tuple[str, ...], Set[str]]] = []
+        self._by_id: Dict[str, int] = {}
+        self._by_words: Dict[frozenset, int] = {}
+        self._by_trigram: Dict[str, Set[int]] = defaultdict(set)
+        self._words: List[str] = []
+        self._keys_by_word: Dict[str, Set[int]] = defaultdict(set)
+
+
+    def load(self) -> None:
+        """
+        Reads the agency list and builds the index, once.
+        """
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            with open(self.path, "r", encoding="utf-8") as file:
+                agencies = json.load(file)
+
+            for position, agency in enumerate(agencies):
+                self._by_id[agency["ID"].upper()] = position
+                for name in [agency["Agency"]] + COMMON_ALIASES.get(agency["ID"], []):
+                    self._add_key(position, normalize(name))
+            self._words = sorted(self._keys_by_word)
+            self.agencies = agencies
+            self._loaded = True
+            logger.info("Indexed %s agencies from %s", len(agencies), self.path)
+
+
+    def _add_key(self, position: int, words: Tuple[str, ...]) -> None:
+        """
+        Adds one name or alias of an agency to the index.
+        """
+        if not words:
+            return
+        key = len(self._keys)
+        trigrams = _trigrams(words)
+        self._keys.append((position, words, trigrams))
+        self._by_words.setdefault(frozenset(words), position)
+        for trigram in trigrams:
+            self._by_trigram[trigram].add(key)
+        for word in words:
+            self._keys_by_word[word].add(key)
+
+
+    def lookup(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Finds the agencies that best match a name, alias or ID.
+
+        Args:
+            query (str): What the user called the agency (e.g., "State Department", "epa").
+            top_k (int): The most candidates to return.
+
+        Returns:
+            List[Dict[str, Any]]: Up to `top_k` agencies (`ID`, `Agency` and `score`, 1.0 for an
+            exact ID), best first. Candidates scoring under `MIN_SCORE` are left out.
+        """
+        self.load()
+        scores: Dict[int, float] = {}
+
+        def consider(position: int, score: float) -> None:
+            if score > scores.get(position, 0.0):
+                scores[position] = score
+
+        # Exact and prefix matches on the ID
+        compact = re.sub(r"[^A-Za-z0-9]", "", query).upper()
+        if compact in self._by_id:
+            consider(self._by_id[compact], 1.0)
+        if len(compact) >= 2:
+            for agency_id, position in self._by_id.items():
+                if agency_id.startswith(compact) and agency_id != compact:
+                    consider(position, 0.6 + 0.3 * len(compact) / len(agency_id))
+
+        words = normalize(query)
+        if not words:
+            return self._ranked(scores, top_k)
+
+        # The name or an alias, in any word order
+        position = self._by_words.get(frozenset(words))
+        if position is not None:
+            consider(position, 0.97)
+
+        # Every query word starts a word of the name (e.g., "env prot")
+        prefix_keys = None
+        for word in set(words):
+            matches = set()
+            start = bisect.bisect_left(self._words, word)
+            for indexed_word in self._words[start:]:
+                if not indexed_word.startswith(word):
+                    break
+                matches |= self._keys_by_word[indexed_word]
+            prefix_keys = matches if prefix_keys is None else prefix_keys & matches
+        for key in prefix_keys or ():
+            position, key_words, _ = self._keys[key]
+            consider(position, 0.55 + 0.4 * min(len(set(words)) / len(key_words), 1.0))
+
+        # Trigram similarity (Dice coefficient) for misspellings
+        query_trigrams = _trigrams(words)
+        shared: Dict[int, int] = defaultdict(int)
+        for trigram in query_trigrams:
+            for key in self._by_trigram.get(trigram, ()):
+                shared[key] += 1
+        for key, count in shared.items():
+            position, _, key_trigrams = self._keys[key]
+            consider(position, 0.9 * 2 * count / (len(query_trigrams) + len(key_trigrams)))
+
+        return self._ranked(scores, top_k)
+
+
+    def _ranked(self, scores: Dict[int, float], top_k: int) -> List[Dict[str, Any]]:
+        """
+        Returns the best-scoring agencies as tool results.
+        """
+        best = sorted(scores.items(), key=lambda item: (-item[1], self.agencies[item[0]]["ID"]))
+        return [
+            {**self.agencies[position], "score": round(score, 2)}
+            for position, score in best[:top_k]
+            if score >= MIN_SCORE
+        ]
+
+
+    def all(self) -> List[Dict[str, str]]:
+        """
+        Returns every agency, as listed in the file.
+        """
+        self.load()
+        return self.agencies
@@ -0,0 +1,533 @@
+"""
+rga_async_wrapper.py
+
+An asyncio client for the Regulations.gov API (v4) with the same surface as `RegulationsGovAPI`.
+
+Parameter building and response handling are shared with the blocking client through
+`RegulationsGovBase`, so both clients send identical requests and return identical results
+(including the 404/500 error dictionaries). Requests run on a pooled `httpx.AsyncClient`, and
+a semaphore caps how many are in flight at once, which makes it safe to fan out dozens of
+lookups with `asyncio.gather` without opening a thread per request. Response cache reads and
+writes go to SQLite, so they run in worker threads and never block the event loop.
+
+Usage Example:
+
+    async with AsyncRegulationsGovAPI(api_key="YOUR_API_KEY", max_concurrency=10) as api:
+        details = await asyncio.gather(*(api.get_document_details(doc_id) for doc_id in ids))
+"""
+
+# Import necessary libraries
+import asyncio
+import logging
+import httpx
+from typing import Optional, Dict, Any, List, Tuple, Union, Callable, Awaitable, AsyncIterator, Sequence
+
+from rga_cache import ResponseCache, make_cache_key
+from rga_coalesce import AsyncSingleFlight
+from rga_key_pool import ApiKeyPool
+from rga_scheduler import RETRY_STATUS_CODES
+from rga_wrapper import RegulationsGovBase, DEFAULT_TIMEOUT, MAX_PAGE_SIZE
+
+
+# Create a module-specific logger
+logger = logging.getLogger(__name__)
+
+
+class AsyncRegulationsGovAPI(RegulationsGovBase):
+    """
+    An asyncio wrapper for the Regulations.gov API (v4).
+
+    Attributes:
+        api_key (str): The API key for authenticating requests.
+        base_url (str): The base URL for the Regulations.gov API.
+        timeout (Union[float, Tuple[float, float]]): A single timeout or a (connect, read) pair in seconds.
+        max_concurrency (int): The maximum number of requests in flight at once.
+    """
+
+    def __init__(
+        self,
+        api_key: Union[str, Sequence[str]],
+        base_url: str = "https://api.regulations.gov/v4",
+        timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+        max_concurrency: int = 10,
+        max_keepalive_connections: int = 32,
+        key_pool: Optional[ApiKeyPool] = None,
+        cache: Optional[ResponseCache] = None,
+    ):
+        """
+        Initializes the AsyncRegulationsGovAPI instance.
+
+        Args:
+            api_key (Union[str, Sequence[str]]): The API key, or several keys to spread requests across.
+            base_url (str): The base URL for the Regulations.gov API. Defaults to the production endpoint.
+            timeout (Union[float, Tuple[float, float]]): A single timeout or a (connect, read) pair in seconds.
+            max_concurrency (int): The maximum number of requests in flight at once. Extra calls wait
+                for a free slot instead of failing.
+            max_keepalive_connections (int): The maximum number of idle keep-alive connections to retain.
+            key_pool (Optional[ApiKeyPool]): A pool shared with other clients. Pass the blocking client's
+                `key_pool` to share a single budget. Defaults to a new pool.
+            cache (Optional[ResponseCache]): A response cache to read from and write to. Defaults to none.
+        """
+        super().__init__(api_key, base_url=base_url, timeout=timeout, key_pool=key_pool, cache=cache)
+        self.max_concurrency = max_concurrency
+        self.max_keepalive_connections = max_keepalive_connections
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._in_flight = AsyncSingleFlight()
+        logger.info("AsyncRegulationsGovAPI initialized with base URL: %s", self.base_url)
+
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Returns the pooled `httpx.AsyncClient`, creating it on first use.
+        """
+        if self._client is None:
+            if isinstance(self.timeout, tuple):
+                connect_timeout, read_timeout = self.timeout
+                timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+            else:
+                timeout = httpx.Timeout(self.timeout)
+            limits = httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_keepalive_connections,
+            )
+            self._client = httpx.AsyncClient(timeout=timeout, limits=limits)
+        return self._client
+
+
+    async def _get(self, url: str, params: Optional[Dict[str, Any]] = None) -> httpx.Response:
+        """
+        Issues a GET request once a concurrency slot is free.
+
+        The request waits for a key with quota first, and 429/502/503/504 responses are retried (on
+        another key for a 429, with backoff for the others) up to `key_pool.max_retries` times
+        before the last response is returned. Interactive requests stop waiting after
+        `key_pool.max_interactive_wait` seconds in total.
+        The concurrency slot is released while waiting to retry.
+
+        Args:
+            url (str): The request URL.
+            params (Optional[Dict[str, Any]]): The query parameters.
+
+        Returns:
+            httpx.Response: The raw HTTP response.
+
+        Raises:
+            httpx.TimeoutException: If the connect or read timeout is exceeded.
+            RateLimitWaitError: If an interactive request would wait on the rate limit too long.
+        """
+        attempt = 0
+        deadline = self.key_pool.deadline()
+        while True:
+            api_key = await self.key_pool.acquire_async(deadline=deadline)
+            async with self._semaphore:
+                response = await self._get_client().get(url, headers=self._headers_for(api_key), params=params)
+            self.key_pool.update_from_headers(api_key, response.headers)
+
+            if response.status_code not in RETRY_STATUS_CODES or attempt >= self.key_pool.max_retries:
+                return response
+
+            delay = self.key_pool.retry_delay(
+                api_key, response.status_code, response.headers.get("Retry-After"), attempt
+            )
+            logger.warning("HTTP %s from %s; retrying in %.1fs", response.status_code, url, delay)
+            self.key_pool.check_wait(delay, deadline)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+    async def _fetch(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Returns the handled response for a GET request, from the cache when possible.
+
+        On a cache miss, coroutines asking for the same request at the same time share a single
+        network call. The cache is SQLite-backed, so it is read in a worker thread rather than on
+        the event loop.
+
+        Args:
+            url (str): The request URL.
+            params (Optional[Dict[str, Any]]): The query parameters.
+
+        Returns:
+            Any: The JSON data from the response or error details (see `_handle_response`).
+        """
+        key = make_cache_key("GET", url, params)
+        if self.cache is not None:
+            hit, value = await asyncio.to_thread(self._cache_lookup, key)
+            if hit:
+                return value
+        return await self._in_flight.do(key, self._fetch_from_api, key, url, params)
+
+
+    async def _fetch_from_api(self, key: str, url: str, params: Optional[Dict[str, Any]]) -> Any:
+        """
+        Sends the request, handles the response and caches the result (in a worker thread, like
+        the lookup).
+        """
+        data = self._handle_response(await self._get(url, params))
+        if self.cache is not None:
+            await asyncio.to_thread(self._cache_store, key, url, data)
+        return data
+
+
+    async def aclose(self) -> None:
+        """
+        Closes the pooled client and releases its connections.
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+    async def __aenter__(self) -> "AsyncRegulationsGovAPI":
+        return self
+
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+    async def _iter_pages(
+        self,
+        fetch: Callable[..., Awaitable[Any]],
+        filters: Dict[str, Any],
+        page_size: int,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Walks the pages of a findAll endpoint and yields one record at a time.
+
+        The next page is requested as a separate task while the records of the current page
+        are being consumed. If the caller stops early, the pending request is cancelled.
+
+        Args:
+            fetch (Callable[..., Awaitable[Any]]): The endpoint coroutine (e.g., `self.get_documents`).
+            filters (Dict[str, Any]): The filters passed to every page request.
+            page_size (int): The number of records per page.
+
+        Yields:
+            Dict[str, Any]: Each record of the `data` array, in API order.
+        """
+        page_number = 1
+        task = asyncio.ensure_future(fetch(pageNumber=page_number, pageSize=page_size, **filters))
+        try:
+            while task is not None:
+                page = await task
+                next_page_number = self._next_page_number(page, page_number)
+
+                # Start fetching the next page before handing out this one
+                task = None
+                if next_page_number is not None:
+                    page_number = next_page_number
+                    task = asyncio.ensure_future(fetch(pageNumber=page_number, pageSize=page_size, **filters))
+
+                for record in page.get("data", []):
+                    yield record
+        finally:
+            if task is not None and not task.done():
+                task.cancel()
+
+
+    def iter_documents(self, page_size: int = MAX_PAGE_SIZE, **filters: Any) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterates over every document matching the filters, following pages automatically.
+
+        See `RegulationsGovAPI.iter_documents`; use with `async for`.
+        """
+        return self._iter_pages(self.get_documents, filters, page_size)
+
+
+    def iter_comments(self, page_size: int = MAX_PAGE_SIZE, **filters: Any) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterates over every comment matching the filters, following pages automatically.
+
+        See `RegulationsGovAPI.iter_comments`; use with `async for`.
+        """
+        return self._iter_pages(self.get_comments, filters, page_size)
+
+
+    def iter_dockets(self, page_size: int = MAX_PAGE_SIZE, **filters: Any) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterates over every docket matching the filters, following pages automatically.
+
+        See `RegulationsGovAPI.iter_dockets`; use with `async for`.
+        """
+        return self._iter_pages(self.get_dockets, filters, page_size)
+
+
+    async def get_documents(
+        self,
+        agencyId: Optional[str] = None,
+        commentEndDate: Optional[str] = None,
+        docketId: Optional[str] = None,
+        documentType: Optional[str] = None,
+        frDocNum: Optional[str] = None,
+        searchTerm: Optional[str] = None,
+        postedDate: Optional[str] = None,
+        postedDateGe: Optional[str] = None,
+        postedDateLe: Optional[str] = None,
+        lastModifiedDate: Optional[str] = None,
+        lastModifiedDateGe: Optional[str] = None,
+        lastModifiedDateLe: Optional[str] = None,
+        subtype: Optional[str] = None,
+        withinCommentPeriod: Optional[bool] = None,
+        sort: Optional[str] = None,
+        pageNumber: Optional[int] = 1,
+        pageSize: Optional[int] = 5,
+    ) -> Any:
+        """
+        Retrieves a list of documents based on the provided filters.
+
+        See `RegulationsGovAPI.get_documents` for the parameters.
+
+        Returns:
+            Any: The JSON response from the API.
+        """
+        url, params = self._documents_request(
+            agencyId=agencyId,
+            commentEndDate=commentEndDate,
+            docketId=docketId,
+            documentType=documentType,
+            frDocNum=frDocNum,
+            searchTerm=searchTerm,
+            postedDate=postedDate,
+            postedDateGe=postedDateGe,
+            postedDateLe=postedDateLe,
+            lastModifiedDate=lastModifiedDate,
+            lastModifiedDateGe=lastModifiedDateGe,
+            lastModifiedDateLe=lastModifiedDateLe,
+            subtype=subtype,
+            withinCommentPeriod=withinCommentPeriod,
+            sort=sort,
+            pageNumber=pageNumber,
+            pageSize=pageSize,
+        )
+
+        self._log_request("GET", url, params)
+
+        try:
+            return await self._fetch(url, params)
+        except Exception as e:
+            logger.error("Error handling response: %s", e)
+            raise
+
+
+    async def get_document_details(
+        self,
+        document_id: str,
+        include_attachments: Optional[bool] = True,
+    ) -> Any:
+        """
+        Retrieves detailed information for a specific document.
+
+        See `RegulationsGovAPI.get_document_details` for the parameters.
+
+        Returns:
+            Any: The JSON response from the API.
+
+        Raises:
+            ValueError: If the document_id is not provided or is empty.
+        """
+        url, params = self._document_details_request(document_id, include_attachments)
+
+        self._log_request("GET", url, params)
+
+        try:
+            return await self._fetch(url, params)
+        except Exception as e:
+            logger.error("Error handling response for document ID %s: %s", document_id, e)
+            raise
+
+
+    async def get_comments(
+        self,
+        agencyId: Optional[str] = None,
+        searchTerm: Optional[str] = None,
+        postedDate: Optional[str] = None,
+        postedDateGe: Optional[str] = None,
+        postedDateLe: Optional[str] = None,
+        lastModifiedDate: Optional[str] = None,
+        lastModifiedDateGe: Optional[str] = None,
+        lastModifiedDateLe: Optional[str] = None,
+        commentOnId: Optional[str] = None,
+        sort: Optional[str] = None,
+        pageNumber: Optional[int] = 1,
+        pageSize: Optional[int] = 5,
+    ) -> Any:
+        """
+        Retrieves a list of comments based on the provided filters.
+
+        See `RegulationsGovAPI.get_comments` for the parameters.
+
+        Returns:
+            Any: The JSON response from the API.
+        """
+        url, params = self._comments_request(
+            agencyId=agencyId,
+            searchTerm=searchTerm,
+            postedDate=postedDate,
+            postedDateGe=postedDateGe,
+            postedDateLe=postedDateLe,
+            lastModifiedDate=lastModifiedDate,
+            lastModifiedDateGe=lastModifiedDateGe,
+            lastModifiedDateLe=lastModifiedDateLe,
+            commentOnId=commentOnId,
+            sort=sort,
+            pageNumber=pageNumber,
+            pageSize=pageSize,
+        )
+
+        self._log_request("GET", url, params)
+
+        try:
+            return await self._fetch(url, params)
+        except Exception as e:
+            logger.error("Error handling response for comments: %s", e)
+            raise
+
+
+    async def get_comment_details(
+        self,
+        comment_id: str,
+        include_attachments: Optional[bool] = True,
+    ) -> Any:
+        """
+        Retrieves detailed information for a specific comment.
+
+        See `RegulationsGovAPI.get_comment_details` for the parameters.
+
+        Returns:
+            Any: The JSON response from the API.
+
+        Raises:
+            ValueError: If the comment_id is not provided or is empty.
+        """
+        url, params = self._comment_details_request(comment_id, include_attachments)
+
+        self._log_request("GET", url, params)
+
+        try:
+            return await self._fetch(url, params)
+        except Exception as e:
+            logger.error("Error handling response for comment ID %s: %s", comment_id, e)
+            raise
+
+
+    async def get_dockets(
+        self,
+        agencyId: Optional[str] = None,
+        searchTerm: Optional[str] = None,
+        lastModifiedDate: Optional[str] = None,
+        lastModifiedDateGe: Optional[str] = None,
+        lastModifiedDateLe: Optional[str] = None,
+        sort: Optional[str] = None,
+        pageNumber: Optional[int] = None,
+        pageSize: Optional[int] = None,
+    ) -> Any:
+        """
+        Retrieves a list of dockets based on the provided filters.
+
+        See `RegulationsGovAPI.get_dockets` for the parameters.
+
+        Returns:
+            Any: The JSON response from the API.
+        """
+        url, params = self._dockets_request(
+            agencyId=agencyId,
+            searchTerm=searchTerm,
+            lastModifiedDate=lastModifiedDate,
+            lastModifiedDateGe=lastModifiedDateGe,
+            lastModifiedDateLe=lastModifiedDateLe,
+            sort=sort,
+            pageNumber=pageNumber,
+            pageSize=pageSize,
+        )
+
+        self._log_request("GET", url, params)
+
+        try:
+            return await self._fetch(url, params)
+        except Exception as e:
+            logger.error("Error handling response for dockets: %s", e)
+            raise
+
+
+    async def get_docket_details(self, docket_id: str) -> Any:
+        """
+        Retrieves detailed information for a specific docket.
+
+        See `RegulationsGovAPI.get_docket_details` for the parameters.
+
+        Returns:
+            Any: The JSON response from the API.
+
+        Raises:
+            ValueError: If the docket_id is not provided or is empty.
+        """
+        url, _ = self._docket_details_request(docket_id)
+
+        self._log_request("GET", url)
+
+        try:
+            return await self._fetch(url)
+        except Exception as e:
+            logger.error("Error handling response for docket ID %s: %s", docket_id, e)
+            raise
+
+
+    async def _details_many(
+        self,
+        fetch: Callable[..., Awaitable[Any]],
+        ids: Sequence[str],
+        **kwargs: Any,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetches the details of several resources concurrently, bounded by `max_concurrency`.
+
+        A failure is reported in that ID's entry and never fails the whole batch.
+
+        Returns:
+            List[Dict[str, Any]]: One entry per unique ID, in input order (see `_detail_result`).
+        """
+        async def fetch_one(resource_id: str) -> Dict[str, Any]:
+            try:
+                return self._detail_result(resource_id, await fetch(resource_id, **kwargs))
+            except Exception as err:
+                logger.error("Error fetching details for ID %s: %s", resource_id, err)
+                return self._detail_result(resource_id, error=err)
+
+        return list(await asyncio.gather(*(fetch_one(resource_id) for resource_id in self._unique_ids(ids))))
+
+
+    async def get_document_details_many(
+        self,
+        document_ids: Sequence[str],
+        include_attachments: Optional[bool] = True,
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieves detailed information for several documents at once.
+
+        See `RegulationsGovAPI.get_document_details_many`.
+        """
+        return await self._details_many(self.get_document_details, document_ids, include_attachments=include_attachments)
+
+
+    async def get_comment_details_many(
+        self,
+        comment_ids: Sequence[str],
+        include_attachments: Optional[bool] = True,
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieves detailed information for several comments at once.
+
+        See `RegulationsGovAPI.get_comment_details_many`.
+        """
+        return await self._details_many(self.get_comment_details, comment_ids, include_attachments=include_attachments)
+
+
+    async def get_docket_details_many(self, docket_ids: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        Retrieves detailed information for several dockets at once.
+
+        See `RegulationsGovAPI.get_docket_details_many`.
+        """
+        return await self._details_many(self.get_docket_details, docket_ids)
@@ -0,0 +1,419 @@
+"""
+rga_attachments.py
+
+Reads Regulations.gov attachments as Markdown, whole or a few pages at a time.
+
+`AttachmentReader` ties together the pieces behind the `get_pdf_content` tool:
+
+- `DownloadManager` (rga_downloads.py) streams the file to disk.
+- `ConversionCache` (rga_conversion_cache.py) remembers which file a URL served and what it
+  converted to, so repeat requests skip the download and the conversion.
+- `ConversionPool` (rga_converter.py) runs the CPU-bound work in worker processes.
+
+PDFs are read lazily by page. `read_pages` returns the outline (bookmarks) and the requested
+pages, stopping at a character budget and reporting where to continue: the next page, and a
+character offset into it when a long page had to be cut. Each page is extracted once and
+cached on its own, so reading a 300-page rule page by page costs no more than converting it
+once, and a question about the preamble never converts the rest.
+
+`search_passages` answers a question from the few passages that match it best (see
+rga_passages.py) instead of whole pages. The passages of each file are cached with its
+converted text, so a file is only chunked once.
+
+Usage Example:
+
+    reader = AttachmentReader(download_manager, conversion_cache, conversion_pool)
+    result = reader.read_pages(url, pages="1-5", max_chars=20000)
+    for page_number, text in result["pages"]:
+        ...
+"""
+
+# Import necessary libraries
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Sequence, Tuple
+from urllib.parse import urlparse
+
+from rga_conversion_cache import ConversionCache
+from rga_converter import ConversionPool
+from rga_downloads import DownloadManager
+from rga_passages import PassageIndex, chunk_pages
+
+
+# Create a module-specific logger
+logger = logging.getLogger(__name__)
+
+# Characters of text returned per read unless the caller sets another budget (~10k tokens)
+DEFAULT_MAX_CHARS = 40000
+
+# Pages extracted per worker job while a read fills its character budget
+PAGES_PER_BATCH = 8
+
+# Passage indexes (one per set of attachments searched together) kept in memory
+MAX_INDEXES = 16
+
+
+def parse_page_ranges(pages: Optional[str], page_count: int) -> List[int]:
+    """
+    Parses a page selection such as "1-5, 8, 20-" into one-based page numbers.
+
+    Args:
+        pages (Optional[str]): Comma-separated pages and ranges. An open range ("20-") runs to the
+            last page. None or "" selects every page.
+        page_count (int): The number of pages in the document.
+
+    Returns:
+        List[int]: The selected pages that exist, in the order given, without duplicates.
+
+    Raises:
+        ValueError: If the selection cannot be parsed.
+    """
+    if not pages or not str(pages).strip():
+        return list(range(1, page_count + 1))
+
+    selected = []
+    for part in str(pages).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        match = re.fullmatch(r"(\d*)\s*-\s*(\d*)|(\d+)", part)
+        if not match:
+            raise ValueError(f"Invalid page selection '{part}'. Use pages like '1-5, 8, 20-'.")
+        if match.group(3):
+            first = last = int(match.group(3))
+        else:
+            first = int(match.group(1)) if match.group(1) else 1
+            last = int(match.group(2)) if match.group(2) else page_count
+        selected.extend(range(max(first, 1), min(last, page_count) + 1))
+    return list(dict.fromkeys(selected))
+
+
+def format_page_ranges(page_numbers: List[int], page_count: int) -> str:
+    """
+    Formats page numbers as a selection `parse_page_ranges` reads back, e.g. [8, 12, 13, 14] as "8, 12-14".
+
+    Runs of consecutive pages become ranges, and a run that reaches the last page is left open ("20-").
+
+    Args:
+        page_numbers (List[int]): One-based page numbers, in the order to read them.
+        page_count (int): The number of pages in the document.
+
+    Returns:
+        str: The selection, or "" if there are no pages.
+    """
+    runs = []
+    for page_number in page_numbers:
+        if runs and page_number == runs[-1][1] + 1:
+            runs[-1][1] = page_number
+        else:
+            runs.append([page_number, page_number])
+
+    parts = []
+    for first, last in runs:
+        if last == page_count and first != last:
+            parts.append(f"{first}-")
+        else:
+            parts.append(str(first) if first == last else f"{first}-{last}")
+    return ", ".join(parts)
+
+
+class AttachmentReader:
+    """
+    Reads attachments through the download manager, the conversion cache and the conversion pool.
+
+    Attributes:
+        downloads (DownloadManager): Streams files to disk.
+        cache (ConversionCache): Caches what each URL served and its converted text.
+        pool (ConversionPool): Converts and extracts text in worker processes.
+    """
+
+    def __init__(self, downloads: DownloadManager, cache: ConversionCache, pool: ConversionPool):
+        """
+        Initializes the reader.
+
+        Args:
+            downloads (DownloadManager): Streams files to disk.
+            cache (ConversionCache): Caches what each URL served and its converted text.
+            pool (ConversionPool): Converts and extracts text in worker processes.
+        """
+        self.downloads = downloads
+        self.cache = cache
+        self.pool = pool
+        self._indexes: "OrderedDict[Tuple[str, ...], PassageIndex]" = OrderedDict()
+        self._indexes_lock = threading.Lock()
+
+
+    def is_pdf(self, url: str) -> bool:
+        """
+        Tells whether a URL points to a PDF, which can be read by page.
+        """
+        return urlparse(url).path.lower().endswith(".pdf")
+
+
+    def markdown(self, url: str, size: Optional[int] = None) -> str:
+        """
+        Converts a whole attachment to Markdown.
+
+        Args:
+            url (str): The attachment URL.
+            size (Optional[int]): The file size in bytes from the `fileFormats` metadata, if known.
+
+        Returns:
+            str: The Markdown content.
+        """
+        # A URL (and size) converted before needs neither a download nor a conversion
+        markdown = self.cache.get(url, size=size)
+        if markdown is not None:
+            return markdown
+
+        source = self._source(url, size)
+        path = self._path(source)
+
+        # The same file may have been converted before under another URL
+        markdown = self.cache.get_content(source["sha256"])
+        if markdown is None:
+            markdown = self.pool.convert(path)
+            self.cache.put_content(source["sha256"], markdown)
+        return markdown
+
+
+    def outline(self, url: str, size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Reads the page count and bookmarks of a PDF attachment.
+
+        Args:
+            url (str): The attachment URL.
+            size (Optional[int]): The file size in bytes from the `fileFormats` metadata, if known.
+
+        Returns:
+            Dict[str, Any]: `page_count` and `outline` (see `ConversionPool.outline`).
+        """
+        return self._outline(self._source(url, size))
+
+
+    def read_pages(
+        self,
+        url: str,
+        pages: Optional[str] = None,
+        size: Optional[int] = None,
+        max_chars: int = DEFAULT_MAX_CHARS,
+        page_offset: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Reads the selected pages of a PDF attachment, up to a character budget.
+
+        Pages are extracted a batch at a time, and extraction stops as soon as the budget is
+        reached. At least part of the first selected page is always returned. A first page that
+        does not fit is cut, and `next_page` and `next_offset` point at the rest of it.
+
+        Args:
+            url (str): The attachment URL.
+            pages (Optional[str]): The pages to read (see `parse_page_ranges`). Defaults to every page.
+            size (Optional[int]): The file size in bytes from the `fileFormats` metadata, if known.
+            max_chars (int): The most characters of page text to return.
+            page_offset (int): The character of the first selected page to start from (0 for the
+                start of the page), as given by `next_offset`.
+
+        Returns:
+            Dict[str, Any]: `page_count`, `outline`, `pages` (a list of (page number, text) pairs),
+            `truncated` (whether the last page returned was cut to fit the budget), `next_page`
+            (the page to continue from, or None), `next_offset` (the character of `next_page`
+            to continue from; 0 unless that page was cut) and `remaining_pages` (the selected
+            pages not yet read in full, starting with `next_page`).
+        """
+        source = self._source(url, size)
+        outline = self._outline(source)
+        selected = parse_page_ranges(pages, outline["page_count"])
+        page_offset = max(int(page_offset or 0), 0)
+
+        returned, used = [], 0
+        for start in range(0, len(selected), PAGES_PER_BATCH):
+            batch = selected[start:start + PAGES_PER_BATCH]
+            texts = self._page_texts(source, batch)
+            for index, page_number in enumerate(batch, start):
+                text = texts.get(page_number, "")
+                if index == 0:
+                    text = text[page_offset:]
+                if used + len(text) > max_chars:
+                    remaining = selected[index:]
+                    if returned:
+                        return self._pages_result(outline, returned, False, remaining, 0)
+                    # The first page alone is over the budget; the rest of it is read next time
+                    returned.append((page_number, text[:max_chars]))
+                    return self._pages_result(outline, returned, True, remaining, page_offset + max_chars)
+                returned.append((page_number, text))
+                used += len(text)
+        return self._pages_result(outline, returned, False, [], 0)
+
+
+    def passages(self, url: str, size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Cuts an attachment into passages for retrieval.
+
+        PDF passages carry the page they come from. Other formats are converted whole, and their
+        passages have no page (`page` is None) but keep the nearest heading as `section`.
+
+        Args:
+            url (str): The attachment URL.
+            size (Optional[int]): The file size in bytes from the `fileFormats` metadata, if known.
+
+        Returns:
+            List[Dict[str, Any]]: The passages (see `chunk_pages`), with `source` set to the URL.
+        """
+        source = self._source(url, size)
+        key = f"{source['sha256']}:passages"
+        cached = self.cache.get_content(key)
+        if cached is not None:
+            return [{**passage, "source": url} for passage in json.loads(cached)]
+
+        if self.is_pdf(url):
+            page_count = self._outline(source)["page_count"]
+            batches = [
+                list(range(first, min(first + PAGES_PER_BATCH, page_count + 1)))
+                for first in range(1, page_count + 1, PAGES_PER_BATCH)
+            ]
+            # Pages not extracted yet are extracted in parallel, one batch per worker
+            self._path(source)
+            with ThreadPoolExecutor(max_workers=self.pool.max_workers, thread_name_prefix="rga-pages") as executor:
+                texts = {}
+                for batch_texts in executor.map(lambda batch: self._page_texts(source, batch), batches):
+                    texts.update(batch_texts)
+            pages = [(page_number, texts.get(page_number, "")) for page_number in range(1, page_count + 1)]
+        else:
+            pages = [(None, self.markdown(url, size))]
+
+        passages = chunk_pages(pages, source=url)
+        self.cache.put_content(key, json.dumps(passages))
+        return passages
+
+
+    def search_passages(
+        self,
+        query: str,
+        urls: Sequence[str],
+        top_k: int = 5,
+        sizes: Optional[Dict[str, Optional[int]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Finds the passages of one or more attachments (e.g., every attachment in a docket) that
+        best match a query.
+
+        The attachments are ranked together in one index, which is kept in memory for the next
+        question about the same set.
+
+        Args:
+            query (str): The question or keywords.
+            urls (Sequence[str]): The attachment URLs to search.
+            top_k (int): The number of passages to return.
+            sizes (Optional[Dict[str, Optional[int]]]): File sizes by URL, if known.
+
+        Returns:
+            List[Dict[str, Any]]: The best passages, highest score first, with `source` (the URL),
+            `page`, `section`, `text` and `score`.
+        """
+        sizes = sizes or {}
+        urls = list(dict.fromkeys(urls))
+        key = tuple(sorted(self._source(url, sizes.get(url))["sha256"] + " " + url for url in urls))
+
+        with self._indexes_lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+        if index is None:
+            passages = [passage for url in urls for passage in self.passages(url, sizes.get(url))]
+            index = PassageIndex(passages)
+            with self._indexes_lock:
+                self._indexes[key] = index
+                while len(self._indexes) > MAX_INDEXES:
+                    self._indexes.popitem(last=False)
+        return index.search(query, top_k)
+
+
+    def _pages_result(
+        self,
+        outline: Dict[str, Any],
+        pages: List[Any],
+        truncated: bool,
+        remaining_pages: List[int],
+        next_offset: int,
+    ) -> Dict[str, Any]:
+        """
+        Builds the result of `read_pages` from the selected pages that are left to read.
+        """
+        return {
+            "page_count": outline["page_count"],
+            "outline": outline["outline"],
+            "pages": pages,
+            "truncated": truncated,
+            "next_page": remaining_pages[0] if remaining_pages else None,
+            "next_offset": next_offset,
+            "remaining_pages": remaining_pages,
+        }
+
+
+    def _source(self, url: str, size: Optional[int]) -> Dict[str, Any]:
+        """
+        Identifies the file behind a URL, downloading it only if the URL has not been seen before.
+        """
+        source = {"url": url, "size": size, "sha256": self.cache.get_source(url, size=size), "path": None}
+        if source["sha256"] is None:
+            self._download(source)
+        return source
+
+
+    def _path(self, source: Dict[str, Any]) -> str:
+        """
+        Returns the local path of a source's file, downloading it again if it has been pruned.
+
+        The file is looked up on every call, which marks it as just used so it is not pruned
+        while it is being read.
+        """
+        source["path"] = self.downloads.find(source["sha256"], source["url"])
+        if source["path"] is None:
+            self._download(source)
+        return source["path"]
+
+
+    def _download(self, source: Dict[str, Any]) -> None:
+        """
+        Downloads a source's file and records which file the URL served.
+        """
+        download = self.downloads.download(source["url"], expected_size=source["size"])
+        self.cache.put_source(source["url"], download["sha256"], download["size"], download["etag"])
+        source.update(sha256=download["sha256"], path=download["path"])
+
+
+    def _outline(self, source: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Returns a PDF's page count and bookmarks, from the cache or the conversion pool.
+        """
+        key = f"{source['sha256']}:outline"
+        cached = self.cache.get_content(key)
+        if cached is not None:
+            return json.loads(cached)
+        outline = self.pool.outline(self._path(source))
+        self.cache.put_content(key, json.dumps(outline))
+        return outline
+
+
+    def _page_texts(self, source: Dict[str, Any], page_numbers: List[int]) -> Dict[int, str]:
+        """
+        Returns the text of some one-based pages, extracting only those not cached yet.
+        """
+        texts = {}
+        for page_number in page_numbers:
+            cached = self.cache.get_content(f"{source['sha256']}:page:{page_number}")
+            if cached is not None:
+                texts[page_number] = cached
+
+        missing = [page_number for page_number in page_numbers if page_number not in texts]
+        if missing:
+            extracted = self.pool.extract_pages(self._path(source), [page_number - 1 for page_number in missing])
+            for page_index, text in extracted:
+                texts[page_index + 1] = text
+                self.cache.put_content(f"{source['sha256']}:page:{page_index + 1}", text)
+        return texts
@@ -0,0 +1,218 @@
+"""
+rga_cache.py
+
+A persistent response cache for the Regulations.gov API (v4) clients.
+
+Responses are stored in SQLite (a file on disk, or memory) under a canonical key made of the HTTP
+method, the URL and the sorted query parameters, so the same question asked by different users or
+sessions is answered locally. Each kind of endpoint has its own time-to-live: detail lookups change
+rarely and are kept for a long time, list searches only briefly, and the 404 dictionaries returned
+by `_handle_response` are cached too (negative caching) so repeated lookups of a bad ID do not go
+back to the network. The cache is capped in bytes and evicts the least recently used entries.
+
+Usage Example:
+
+    cache = ResponseCache("rga_cache.sqlite3", max_bytes=256 * 1024 * 1024)
+    api = RegulationsGovAPI(api_key="YOUR_API_KEY", cache=cache)
+    ...
+    print(cache.stats())
+"""
+
+# Import necessary libraries
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional, Dict, Any, Tuple
+
+
+# Create a module-specific logger
+logger = logging.getLogger(__name__)
+
+# Default time-to-live in seconds for each kind of cached response
+DEFAULT_TTLS = {
+    "details": 24 * 60 * 60,
+    "list": 10 * 60,
+    "not_found": 5 * 60,
+}
+
+
+def make_cache_key(method: str, url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Builds the canonical key of a request: method + URL + sorted query parameters.
+
+    Args:
+        method (str): The HTTP method (e.g., GET).
+        url (str): The request URL.
+        params (Optional[Dict[str, Any]]): The query parameters.
+
+    Returns:
+        str: A SHA-256 hex digest identifying the request.
+    """
+    canonical = json.dumps(
+        [method.upper(), url, sorted((str(name), str(value)) for name, value in (params or {}).items())],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    A thread-safe, size-bounded LRU cache of API responses with per-endpoint TTLs.
+
+    Attributes:
+        path (str): The SQLite database path, or ":memory:".
+        max_bytes (int): The largest total size of the stored (compressed) responses.
+        ttls (Dict[str, float]): Time-to-live in seconds for "details", "list" and "not_found" entries.
+        hits (int): The number of lookups answered from the cache.
+        misses (int): The number of lookups that had to go to the API.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        max_bytes: int = 128 * 1024 * 1024,
+        ttls: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Opens (or creates) the cache database.
+
+        Args:
+            path (str): The SQLite database path. Defaults to an in-memory database.
+            max_bytes (int): The largest total size of the stored responses before eviction.
+            ttls (Optional[Dict[str, float]]): Overrides for the default time-to-live of each kind.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self._total_bytes = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Looks up a response.
+
+        Args:
+            key (str): The key built by `make_cache_key`.
+
+        Returns:
+            Tuple[bool, Any]: (True, response) on a hit, (False, None) on a miss or an expired entry.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, size, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[2] <= now:
+                if row is not None:
+                    self._delete(key, row[1])
+                self.misses += 1
+                return False, None
+
+            self._connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return True, json.loads(zlib.decompress(row[0]))
+
+
+    def set(self, key: str, value: Any, kind: str) -> None:
+        """
+        Stores a response, evicting the least recently used entries if the cache is over its size cap.
+
+        Args:
+            key (str): The key built by `make_cache_key`.
+            value (Any): The JSON-serializable response.
+            kind (str): "details", "list" or "not_found"; selects the time-to-live.
+        """
+        blob = zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+        if len(blob) > self.max_bytes:
+            return
+
+        now = time.time()
+        with self._lock:
+            previous = self._connection.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if previous is not None:
+                self._total_bytes -= previous[0]
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now + self.ttls[kind], now),
+            )
+            self._total_bytes += len(blob)
+            self._evict()
+
+
+    def _delete(self, key: str, size: int) -> None:
+        """
+        Removes one entry. Must be called with the lock held.
+        """
+        self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+        self._total_bytes -= size
+
+
+    def _evict(self) -> None:
+        """
+        Drops expired entries, then the least recently used ones, until the cache fits. Must be
+        called with the lock held.
+        """
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        self._connection.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+        self._total_bytes = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+        rows = self._connection.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        for key, size in rows:
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._delete(key, size)
+
+
+    def clear(self) -> None:
+        """
+        Removes every entry and resets the counters.
+        """
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+            self._total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Reports the cache's hit/miss counters and size.
+
+        Returns:
+            Dict[str, Any]: hits, misses, hit_rate, entries and bytes.
+        """
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "entries": entries,
+                "bytes": self._total_bytes,
+            }
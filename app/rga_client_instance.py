@@ -1,13 +1,85 @@
 import os
+import tempfile
 from dotenv import load_dotenv
+from rga_attachments import AttachmentReader
+from rga_cache import ResponseCache
+from rga_compact import DEFAULT_FIELDS, ResultCompactor
+from rga_conversion_cache import ConversionCache
+from rga_converter import ConversionPool
+from rga_downloads import DownloadManager
+from rga_mirror import LocalMirror
+from rga_results import ResultStore
 from rga_wrapper import RegulationsGovAPI
 
 # Load environment variables
 load_dotenv()
 
-# Initialize the Regulations.gov API client
-api_key = os.getenv("RGA_API_KEY")
-if not api_key:
+# Initialize the Regulations.gov API client. RGA_API_KEYS (comma-separated) spreads requests
+# across several keys; otherwise the single RGA_API_KEY is used.
+api_keys = [key.strip() for key in os.getenv("RGA_API_KEYS", "").split(",") if key.strip()]
+if not api_keys and os.getenv("RGA_API_KEY"):
+    api_keys = [os.getenv("RGA_API_KEY")]
+if not api_keys:
     raise ValueError("Error: RGA_API_KEY not found in .env. Please set it before running.")
 
-rga_client = RegulationsGovAPI(api_key=api_key)
+# Transport settings for the shared, pooled client (all optional)
+connect_timeout = float(os.getenv("RGA_CONNECT_TIMEOUT", "5"))
+read_timeout = float(os.getenv("RGA_READ_TIMEOUT", "30"))
+pool_maxsize = int(os.getenv("RGA_POOL_MAXSIZE", "32"))
+
+# Optional persistent response cache shared by every session
+cache_path = os.getenv("RGA_CACHE_PATH")
+cache_max_mb = int(os.getenv("RGA_CACHE_MAX_MB", "128"))
+rga_cache = ResponseCache(cache_path, max_bytes=cache_max_mb * 1024 * 1024) if cache_path else None
+
+rga_client = RegulationsGovAPI(
+    api_key=api_keys,
+    timeout=(connect_timeout, read_timeout),
+    pool_maxsize=pool_maxsize,
+    cache=rga_cache,
+)
+
+# Optional local mirror; list tools answer from it when a recent sync covers the request
+mirror_path = os.getenv("RGA_MIRROR_PATH")
+mirror_max_age_hours = float(os.getenv("RGA_MIRROR_MAX_AGE_HOURS", "24"))
+rga_mirror = LocalMirror(mirror_path, client=rga_client, max_age=mirror_max_age_hours * 3600) if mirror_path else None
+
+# Attachment downloads, streamed to disk (the directory defaults to the system temp directory)
+download_manager = DownloadManager(
+    directory=os.getenv("RGA_DOWNLOAD_DIR") or None,
+    max_bytes=int(os.getenv("RGA_DOWNLOAD_MAX_MB", "512")) * 1024 * 1024,
+)
+
+# Converted attachments, kept on disk so repeat requests skip the download and the conversion
+conversion_cache = ConversionCache(
+    os.getenv("RGA_CONVERSION_CACHE_PATH") or os.path.join(tempfile.gettempdir(), "rga_conversions.sqlite3"),
+    max_bytes=int(os.getenv("RGA_CONVERSION_CACHE_MAX_MB", "512")) * 1024 * 1024,
+)
+
+# Attachment conversion runs in warm worker processes, off the chat request thread
+conversion_pool = ConversionPool(
+    max_workers=int(os.getenv("RGA_CONVERSION_WORKERS", "0")) or None,
+    timeout=float(os.getenv("RGA_CONVERSION_TIMEOUT", "300")),
+    memory_limit=int(os.getenv("RGA_CONVERSION_MEMORY_MB", "2048")) * 1024 * 1024,
+)
+
+# Reads attachments whole or by page through the downloads, the conversion cache and the pool
+attachment_reader = AttachmentReader(download_manager, conversion_cache, conversion_pool)
+
+# Tool results are projected to a few short-keyed fields before they reach the agents.
+# RGA_COMPACT_RESULTS=0 returns the raw API payloads; RGA_COMPACT_FIELDS_<KIND> (e.g.
+# RGA_COMPACT_FIELDS_DOCUMENTS=title,postedDate) replaces the attributes kept for one kind.
+result_compactor = ResultCompactor(
+    enabled=os.getenv("RGA_COMPACT_RESULTS", "1") != "0",
+    fields={
+        kind: [name.strip() for name in os.getenv(f"RGA_COMPACT_FIELDS_{kind.upper()}", "").split(",") if name.strip()]
+        for kind in DEFAULT_FIELDS
+    },
+)
+
+# Tool results too large for the conversation are kept per session and read back by handle
+result_store = ResultStore(
+    ttl=float(os.getenv("RGA_RESULT_TTL_MINUTES", "30")) * 60,
+    max_bytes=int(os.getenv("RGA_RESULT_STORE_MAX_MB", "64")) * 1024 * 1024,
+    inline_chars=int(os.getenv("RGA_RESULT_INLINE_CHARS", "12000")),
+)
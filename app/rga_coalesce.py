@@ -0,0 +1,119 @@
+"""
+rga_coalesce.py
+
+Single-flight request coalescing for the Regulations.gov API (v4) clients.
+
+When several callers ask for the same thing at the same moment (several Streamlit sessions
+opening the docket of a rule that was just published, or several tool calls in one turn), only
+the first caller goes to the network. The others wait for that call and receive its result (or
+its exception). Once the call has finished the key is forgotten, so later requests go through
+the cache or the network as usual.
+
+`SingleFlight` serves threaded callers and `AsyncSingleFlight` serves coroutines on one event loop.
+"""
+
+# Import necessary libraries
+import asyncio
+import copy
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls made from different threads.
+
+    Attributes:
+        calls (int): The number of calls that went through to `fn`.
+        shared (int): The number of calls that received another caller's result instead.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+
+
+    def do(self, key: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Runs `fn(*args)` unless a call with the same key is already running, in which case its
+        result is returned instead.
+
+        Args:
+            key (str): Identifies identical calls (e.g., `make_cache_key(...)`).
+            fn (Callable[..., Any]): The function to run.
+            *args: The arguments for `fn`.
+
+        Returns:
+            Any: The result of `fn`. Waiting callers get their own copy, so no caller can change
+            what another one sees.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            return copy.deepcopy(future.result())
+
+        try:
+            result = fn(*args)
+        except BaseException as err:
+            future.set_exception(err)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+
+class AsyncSingleFlight:
+    """
+    Coalesces identical concurrent calls made from coroutines on the same event loop.
+
+    Attributes:
+        calls (int): The number of calls that went through to `fn`.
+        shared (int): The number of calls that received another caller's result instead.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+
+    async def do(self, key: str, fn: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """
+        Awaits `fn(*args)` unless a call with the same key is already running, in which case its
+        result is awaited instead.
+
+        The shared call runs as its own task, so a caller that is cancelled while waiting does
+        not cancel the request for the others.
+
+        Args:
+            key (str): Identifies identical calls (e.g., `make_cache_key(...)`).
+            fn (Callable[..., Awaitable[Any]]): The coroutine function to run.
+            *args: The arguments for `fn`.
+
+        Returns:
+            Any: The result of `fn`. Waiting callers get their own copy.
+        """
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.shared += 1
+            return copy.deepcopy(await asyncio.shield(task))
+
+        self.calls += 1
+        task = asyncio.ensure_future(fn(*args))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
@@ -0,0 +1,276 @@
+"""
+rga_compact.py
+
+Compacts Regulations.gov API responses before the tools hand them to the agents.
+
+The API answers in JSON:API form: every record carries `links`, `relationships` and dozens of
+attributes, most of them null for any given record (e.g., the submitter address fields of a
+rule). Swarm serializes the whole payload into the conversation, and every later turn resends
+it. `ResultCompactor` keeps only a configurable set of attributes per kind of result, renames
+them to short, stable keys, drops nulls and empty values, and reduces timestamps to their
+Eastern-time dates.
+
+List results become a table, so the field names are sent once instead of once per record:
+
+    {
+        "columns": ["id", "title", "type", "posted", ...],
+        "rows": [["EPA-HQ-OAR-2021-0317-0001", "Standards of ...", "Rule", "2024-03-08", ...], ...],
+        "total": 212, "page": 1, "pages": 43, "hasNext": true
+    }
+
+Details become one flat object, with attachments as `files` (url, format, size) and, when
+requested, `attachments` (title and files of each attachment).
+
+Usage Example:
+
+    compactor = ResultCompactor()
+    compact = compactor.compact_list("documents", rga_client.get_documents(searchTerm="water"))
+    details = compactor.compact_details("documents", rga_client.get_document_details(document_id))
+"""
+
+# Import necessary libraries
+import logging
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from typing import Optional, Dict, Any, List, Iterable
+
+
+# Create a module-specific logger
+logger = logging.getLogger(__name__)
+
+# Short, stable names for the API's attributes. Attributes not listed keep their API name.
+SHORT_KEYS = {
+    "agencyId": "agency",
+    "docketId": "docket",
+    "documentType": "type",
+    "docketType": "type",
+    "frDocNum": "frDoc",
+    "postedDate": "posted",
+    "lastModifiedDate": "modified",
+    "modifyDate": "modified",
+    "commentStartDate": "commentStart",
+    "commentEndDate": "commentEnd",
+    "openForComment": "open",
+    "highlightedContent": "match",
+    "docAbstract": "abstract",
+    "dkAbstract": "abstract",
+    "commentOnDocumentId": "commentOnDoc",
+    "receiveDate": "received",
+    "effectiveDate": "effective",
+    "organization": "org",
+    "fileFormats": "files",
+    "pageCount": "pages",
+}
+
+# The attributes kept for each kind of result, in output order
+DEFAULT_FIELDS = {
+    "documents": [
+        "title", "documentType", "subtype", "agencyId", "docketId", "frDocNum", "objectId",
+        "postedDate", "commentEndDate", "openForComment", "withdrawn", "highlightedContent",
+    ],
+    "comments": ["title", "agencyId", "documentType", "objectId", "postedDate", "withdrawn", "highlightedContent"],
+    "dockets": ["title", "docketType", "agencyId", "objectId", "lastModifiedDate", "highlightedContent"],
+    "document_details": [
+        "title", "documentType", "subtype", "agencyId", "docketId", "frDocNum", "objectId",
+        "postedDate", "commentStartDate", "commentEndDate", "effectiveDate", "openForComment",
+        "withdrawn", "pageCount", "docAbstract", "fileFormats",
+    ],
+    "comment_details": [
+        "title", "agencyId", "docketId", "commentOnDocumentId", "postedDate", "receiveDate",
+        "withdrawn", "firstName", "lastName", "organization", "city", "stateProvinceRegion",
+        "country", "comment", "fileFormats",
+    ],
+    "docket_details": [
+        "title", "docketType", "agencyId", "objectId", "modifyDate", "effectiveDate", "rin",
+        "program", "keywords", "dkAbstract",
+    ],
+}
+
+# Attributes holding UTC timestamps that are reduced to their date in Eastern time, the time
+# zone regulations.gov uses for dates and deadlines (e.g., a comment period ending at 11:59 PM
+# Eastern is "2024-03-09T04:59:59Z", reported as "2024-03-08")
+DATE_FIELDS = frozenset([
+    "postedDate", "lastModifiedDate", "modifyDate", "commentStartDate", "commentEndDate",
+    "receiveDate", "effectiveDate",
+])
+
+
+try:
+    EASTERN = ZoneInfo("America/New_York")
+except ZoneInfoNotFoundError:  # No time zone database (e.g., Windows without tzdata)
+    EASTERN = None
+
+
+def _eastern_date(value: str) -> str:
+    """
+    Returns the Eastern-time date of a UTC timestamp, or the timestamp unchanged if it cannot be
+    converted (so a deadline is never reported on the wrong day).
+    """
+    if len(value) <= 10 or EASTERN is None:
+        return value
+    try:
+        moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return value
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(EASTERN).date().isoformat()
+
+
+def _is_empty(value: Any) -> bool:
+    """
+    Tells whether a value carries no information (None, "", [] or {}).
+    """
+    return value is None or value == "" or value == [] or value == {}
+
+
+class ResultCompactor:
+    """
+    Projects API responses to a few short-keyed fields per kind of result.
+
+    Attributes:
+        enabled (bool): When False, responses are returned unchanged.
+        fields (Dict[str, List[str]]): The attributes kept for each kind ("documents",
+            "document_details", ...), in output order.
+    """
+
+    def __init__(self, enabled: bool = True, fields: Optional[Dict[str, Optional[Iterable[str]]]] = None):
+        """
+        Initializes the compactor.
+
+        Args:
+            enabled (bool): When False, responses are returned unchanged.
+            fields (Optional[Dict[str, Optional[Iterable[str]]]]): Attribute lists that replace the
+                defaults for some kinds. None values keep the default.
+        """
+        self.enabled = enabled
+        self.fields = {kind: list(names) for kind, names in DEFAULT_FIELDS.items()}
+        for kind, names in (fields or {}).items():
+            if names:
+                self.fields[kind] = list(names)
+
+
+    def compact_list(self, kind: str, response: Any) -> Any:
+        """
+        Compacts a list response ({"data": [...], "meta": {...}}) into a table.
+
+        Args:
+            kind (str): "documents", "comments" or "dockets".
+            response (Any): The JSON response from the API or the local mirror.
+
+        Returns:
+            Any: `columns`, `rows` and the paging fields `total`, `page`, `pages` and `hasNext`.
+            Columns that are empty for every row are left out. Responses of another shape are
+            returned unchanged.
+        """
+        if not self.enabled or not isinstance(response, dict) or not isinstance(response.get("data"), list):
+            return response
+
+        fields = self.fields[kind]
+        records = [self._project(fields, record) for record in response["data"]]
+        columns = ["id"] + [self._key(name) for name in fields]
+        columns = [column for column in columns if any(column in record for record in records)]
+
+        result = {
+            "columns": columns,
+            "rows": [[record.get(column) for column in columns] for record in records],
+        }
+        meta = response.get("meta") or {}
+        paging = {
+            "total": meta.get("totalElements"),
+            "page": meta.get("pageNumber"),
+            "pages": meta.get("totalPages"),
+            "hasNext": meta.get("hasNextPage"),
+        }
+        result.update({key: value for key, value in paging.items() if value is not None})
+        return result
+
+
+    def compact_details(self, kind: str, response: Any) -> Any:
+        """
+        Compacts a details response ({"data": {...}, "included": [...]}) into one flat object.
+
+        Args:
+            kind (str): "documents", "comments" or "dockets".
+            response (Any): The JSON response from the API.
+
+        Returns:
+            Any: The projected fields, plus `attachments` when the response included them.
+            Responses of another shape are returned unchanged.
+        """
+        if not self.enabled or not isinstance(response, dict) or not isinstance(response.get("data"), dict):
+            return response
+
+        result = self._project(self.fields[f"{kind[:-1]}_details"], response["data"])
+        attachments = []
+        for included in response.get("included") or []:
+            if included.get("type") == "attachments":
+                attributes = included.get("attributes") or {}
+                attachment = {"title": attributes.get("title"), "files": self._files(attributes.get("fileFormats"))}
+                attachments.append({key: value for key, value in attachment.items() if not _is_empty(value)})
+        if attachments:
+            result["attachments"] = attachments
+        return result
+
+
+    def compact_details_many(self, kind: str, results: Any) -> Any:
+        """
+        Compacts the result of a `get_*_details_many` call, entry by entry.
+
+        Args:
+            kind (str): "documents", "comments" or "dockets".
+            results (Any): A list of `{"id": ..., **response}` or `{"id": ..., "error": ...}` entries.
+
+        Returns:
+            Any: The entries with each response compacted. Error entries are kept as they are.
+        """
+        if not self.enabled or not isinstance(results, list):
+            return results
+
+        compacted = []
+        for entry in results:
+            if isinstance(entry, dict) and "error" not in entry and "data" in entry:
+                response = {key: value for key, value in entry.items() if key != "id"}
+                entry = {"id": entry["id"], **self.compact_details(kind, response)}
+            compacted.append(entry)
+        return compacted
+
+
+    def _project(self, fields: List[str], record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Keeps the listed attributes of a JSON:API record under their short keys, dropping empty ones.
+        """
+        attributes = record.get("attributes") or {}
+        projected = {"id": record.get("id")} if record.get("id") else {}
+        for name in fields:
+            value = attributes.get(name)
+            if name == "fileFormats":
+                value = self._files(value)
+            elif name in DATE_FIELDS and isinstance(value, str):
+                value = _eastern_date(value)
+            elif isinstance(value, str):
+                value = value.strip()
+            if not _is_empty(value):
+                projected[self._key(name)] = value
+        return projected
+
+
+    def _files(self, file_formats: Any) -> Optional[List[Dict[str, Any]]]:
+        """
+        Reduces `fileFormats` entries to their url, format and size.
+        """
+        if not isinstance(file_formats, list):
+            return None
+        files = []
+        for item in file_formats:
+            if isinstance(item, dict):
+                file = {"url": item.get("fileUrl"), "format": item.get("format"), "size": item.get("size")}
+                files.append({key: value for key, value in file.items() if not _is_empty(value)})
+        return files
+
+
+    def _key(self, name: str) -> str:
+        """
+        Returns the short key of an attribute.
+        """
+        return SHORT_KEYS.get(name, name)
@@ -0,0 +1,287 @@
+"""
+rga_conversion_cache.py
+
+A persistent cache of attachment-to-Markdown conversions.
+
+Converting a large PDF takes far longer than any API call, and the same Federal Register PDF is
+asked about by many users. The cache keeps the converted Markdown, zlib-compressed, in SQLite on
+disk, and answers at two levels:
+
+- By URL: an attachment URL seen before, with the same size (from `fileFormats[].size`) and ETag
+  when they are known, is answered without downloading or converting anything.
+- By content: a file that was downloaded (e.g., through a new URL) but hashes to a SHA-256 that
+  was already converted is answered without converting it again.
+
+Derived text, such as the pages of a PDF extracted one at a time, can be stored under its own
+content key (e.g., "<sha256>:page:12") with `put_content`.
+
+The cache is capped in bytes and evicts the least recently used conversions.
+
+Usage Example:
+
+    cache = ConversionCache("rga_conversions.sqlite3", max_bytes=512 * 1024 * 1024)
+    markdown = cache.get(url, size=file_format["size"])
+    if markdown is None:
+        ...  # download and convert, then:
+        cache.put(url, sha256, markdown, size=file_format["size"], etag=etag)
+    print(cache.stats())
+"""
+
+# Import necessary libraries
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional, Dict, Any
+
+
+# Create a module-specific logger
+logger = logging.getLogger(__name__)
+
+
+class ConversionCache:
+    """
+    A thread-safe, size-bounded LRU cache of converted attachments, keyed by URL and by content hash.
+
+    Attributes:
+        path (str): The SQLite database path, or ":memory:".
+        max_bytes (int): The largest total size of the stored (compressed) Markdown.
+        url_hits (int): The number of lookups answered by URL (no download, no conversion).
+        content_hits (int): The number of lookups answered by content hash (no conversion).
+        misses (int): The number of lookups that needed a conversion.
+    """
+
+    def __init__(self, path: str = ":memory:", max_bytes: int = 512 * 1024 * 1024):
+        """
+        Opens (or creates) the cache database.
+
+        Args:
+            path (str): The SQLite database path. Defaults to an in-memory database.
+            max_bytes (int): The largest total size of the stored Markdown before eviction.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.url_hits = 0
+        self.content_hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS conversions (
+                sha256 TEXT PRIMARY KEY,
+                markdown BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS conversions_accessed_at ON conversions (accessed_at);
+
+            CREATE TABLE IF NOT EXISTS sources (
+                url TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                file_size INTEGER,
+                etag TEXT
+            );
+            """
+        )
+        self._total_bytes = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM conversions").fetchone()[0]
+
+
+    def get(self, url: str, size: Optional[int] = None, etag: Optional[str] = None) -> Optional[str]:
+        """
+        Looks up the conversion of an attachment URL.
+
+        The entry is only used if the size and ETag recorded for the URL match the ones given
+        (when both sides know them), so a file replaced at the same URL is converted again.
+
+        Args:
+            url (str): The attachment URL.
+            size (Optional[int]): The file size in bytes from the `fileFormats` metadata, if known.
+            etag (Optional[str]): The file's ETag, if known.
+
+        Returns:
+            Optional[str]: The Markdown, or None on a miss.
+        """
+        sha256 = self.get_source(url, size, etag)
+        if sha256 is None:
+            return None
+        with self._lock:
+            markdown = self._read(sha256)
+            if markdown is not None:
+                self.url_hits += 1
+            return markdown
+
+
+    def get_source(self, url: str, size: Optional[int] = None, etag: Optional[str] = None) -> Optional[str]:
+        """
+        Returns the SHA-256 of the file last downloaded from a URL, if the size and ETag still match.
+
+        Args:
+            url (str): The attachment URL.
+            size (Optional[int]): The file size in bytes from the `fileFormats` metadata, if known.
+            etag (Optional[str]): The file's ETag, if known.
+
+        Returns:
+            Optional[str]: The SHA-256 hex digest, or None if the URL is unknown or changed.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT sha256, file_size, etag FROM sources WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None or (size and row[1] and int(size) != row[1]) or (etag and row[2] and etag != row[2]):
+            return None
+        return row[0]
+
+
+    def get_content(self, sha256: str) -> Optional[str]:
+        """
+        Looks up the conversion of a downloaded file by its content hash (or a derived content key).
+
+        Args:
+            sha256 (str): The SHA-256 hex digest of the file, or a key passed to `put_content`.
+
+        Returns:
+            Optional[str]: The Markdown, or None if the file was never converted (a miss).
+        """
+        with self._lock:
+            markdown = self._read(sha256)
+            if markdown is None:
+                self.misses += 1
+            else:
+                self.content_hits += 1
+            return markdown
+
+
+    def put(
+        self,
+        url: str,
+        sha256: str,
+        markdown: str,
+        size: Optional[int] = None,
+        etag: Optional[str] = None,
+    ) -> None:
+        """
+        Stores a conversion and records which URL it came from.
+
+        Also call this after a `get_content` hit, so the next request for the URL skips the download.
+
+        Args:
+            url (str): The attachment URL.
+            sha256 (str): The SHA-256 hex digest of the file.
+            markdown (str): The converted Markdown.
+            size (Optional[int]): The file size in bytes.
+            etag (Optional[str]): The file's ETag (or Last-Modified value), if known.
+        """
+        self.put_content(sha256, markdown)
+        self.put_source(url, sha256, size, etag)
+
+
+    def put_source(self, url: str, sha256: str, size: Optional[int] = None, etag: Optional[str] = None) -> None:
+        """
+        Records which file a URL served, so later lookups by URL can find its converted text.
+
+        Args:
+            url (str): The attachment URL.
+            sha256 (str): The SHA-256 hex digest of the file.
+            size (Optional[int]): The file size in bytes.
+            etag (Optional[str]): The file's ETag (or Last-Modified value), if known.
+        """
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO sources (url, sha256, file_size, etag) VALUES (?, ?, ?, ?)",
+                (url, sha256, size, etag),
+            )
+
+
+    def put_content(self, key: str, markdown: str) -> None:
+        """
+        Stores converted text under a content key: a file's SHA-256, or a key derived from it.
+
+        Args:
+            key (str): The content key (e.g., a SHA-256, or "<sha256>:page:12").
+            markdown (str): The converted text.
+        """
+        blob = zlib.compress(markdown.encode("utf-8"))
+        if len(blob) > self.max_bytes:
+            return
+
+        with self._lock:
+            self._connection.execute("BEGIN")
+            previous = self._connection.execute("SELECT size FROM conversions WHERE sha256 = ?", (key,)).fetchone()
+            if previous is not None:
+                self._total_bytes -= previous[0]
+            self._connection.execute(
+                "INSERT OR REPLACE INTO conversions (sha256, markdown, size, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time()),
+            )
+            self._total_bytes += len(blob)
+            self._evict()
+            self._connection.execute("COMMIT")
+
+
+    def _read(self, sha256: str) -> Optional[str]:
+        """
+        Reads and decompresses a conversion, marking it as recently used. Must be called with the lock held.
+        """
+        row = self._connection.execute("SELECT markdown FROM conversions WHERE sha256 = ?", (sha256,)).fetchone()
+        if row is None:
+            return None
+        self._connection.execute("UPDATE conversions SET accessed_at = ? WHERE sha256 = ?", (time.time(), sha256))
+        return zlib.decompress(row[0]).decode("utf-8")
+
+
+    def _evict(self) -> None:
+        """
+        Drops the least recently used conversions, and the URLs that point to them, until the
+        cache fits. Must be called with the lock held.
+        """
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        rows = self._connection.execute("SELECT sha256, size FROM conversions ORDER BY accessed_at").fetchall()
+        for sha256, size in rows:
+            if self._total_bytes <= self.max_bytes:
+                break
+            self._connection.execute("DELETE FROM conversions WHERE sha256 = ?", (sha256,))
+            self._connection.execute("DELETE FROM sources WHERE sha256 = ?", (sha256,))
+            self._total_bytes -= size
+
+
+    def clear(self) -> None:
+        """
+        Removes every entry and resets the counters.
+        """
+        with self._lock:
+            self._connection.execute("DELETE FROM conversions")
+            self._connection.execute("DELETE FROM sources")
+            self._total_bytes = 0
+            self.url_hits = 0
+            self.content_hits = 0
+            self.misses = 0
+
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Reports the cache's hit/miss counters and size.
+
+        Returns:
+            Dict[str, Any]: url_hits, content_hits, misses, hit_rate, entries, urls and bytes.
+        """
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM conversions").fetchone()[0]
+            urls = self._connection.execute("SELECT COUNT(*) FROM sources").fetchone()[0]
+            hits = self.url_hits + self.content_hits
+            lookups = hits + self.misses
+            return {
+                "url_hits": self.url_hits,
+                "content_hits": self.content_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "entries": entries,
+                "urls": urls,
+                "bytes": self._total_bytes,
+            }
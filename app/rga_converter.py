@@ -0,0 +1,419 @@
+"""
+rga_converter.py
+
+A process pool that converts attachments to Markdown off the chat request thread.
+
+Converting a PDF with MarkItDown is CPU-bound pure Python. Run inline, a 400-page rule holds the
+GIL and blocks the whole Streamlit session for as long as it takes. `ConversionPool` runs
+conversions in worker processes instead:
+
+- Warm workers: each worker process creates its `MarkItDown` instance once, when it starts.
+- Timeouts: a job that runs too long is interrupted inside its worker (with `SIGALRM`, where
+  available). If the worker does not come back shortly after, the pool is replaced.
+- Memory limits: each worker may grow its address space by at most `memory_limit` beyond what
+  it uses once started (`RLIMIT_AS`, where available), so a pathological file fails with a
+  MemoryError instead of exhausting the host.
+- Clean start: workers come from a fork server (or are spawned where there is none) rather than
+  forked from the app, which runs many threads whose locks a forked child could inherit held.
+  As with any non-fork start method, a script that uses the pool must keep its top-level work
+  under `if __name__ == "__main__":`, since the main module is imported again for the workers.
+- Cancellation: jobs that have not started yet can be cancelled through their future.
+- Batches: `convert_many` converts several files (e.g., all attachments of a docket) in parallel.
+
+PDFs can also be read a few pages at a time: `outline` returns the page count and the bookmarks,
+and `extract_pages` extracts the text of only the requested pages (with pdfminer, which MarkItDown
+uses for PDFs), so a question about the preamble does not convert all 300 pages.
+
+Usage Example:
+
+    pool = ConversionPool(max_workers=4, timeout=120)
+    markdown = pool.convert("/tmp/rga_downloads/5563...88bb.pdf")
+    results = pool.convert_many(paths)
+    print(pool.outline(path)["page_count"], pool.extract_pages(path, [0, 1, 2]))
+"""
+
+# Import necessary libraries
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Dict, Any, List, Tuple, Callable, Iterator, Sequence
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+# Create a module-specific logger
+logger = logging.getLogger(__name__)
+
+# Extra seconds the caller waits for a timed-out job before it replaces the pool
+TIMEOUT_GRACE = 10.0
+
+# Seconds between checks on whether a job waited for has started running
+POLL_INTERVAL = 0.5
+
+# The MarkItDown instance of a worker process, created by `_init_worker`
+_markitdown = None
+
+
+class ConversionTimeoutError(TimeoutError):
+    """
+    Raised when a conversion runs longer than its timeout.
+    """
+
+
+def _address_space() -> Optional[int]:
+    """
+    Returns the current virtual size of this process in bytes, where /proc is available.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _init_worker(memory_limit: Optional[int]) -> None:
+    """
+    Prepares a worker process: creates its MarkItDown instance and caps its memory.
+
+    The cap is `memory_limit` bytes on top of the worker's size once MarkItDown is loaded, so the
+    imports never count against the budget of a conversion. Where the size cannot be read, the
+    data segment (`RLIMIT_DATA`) is capped at `memory_limit` instead.
+    """
+    global _markitdown
+    from markitdown import MarkItDown
+    _markitdown = MarkItDown()
+
+    if memory_limit and resource is not None:
+        current = _address_space()
+        limit_name = resource.RLIMIT_AS if current is not None else resource.RLIMIT_DATA
+        limit = (current or 0) + memory_limit
+        _, hard = resource.getrlimit(limit_name)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        try:
+            resource.setrlimit(limit_name, (limit, hard))
+        except (ValueError, OSError) as err:
+            logger.warning("Could not cap the memory of conversion worker %s: %s", os.getpid(), err)
+
+
+def _raise_timeout(signum: int, frame: Any) -> None:
+    """
+    SIGALRM handler of a worker process.
+    """
+    raise ConversionTimeoutError("The conversion took longer than its timeout.")
+
+
+@contextmanager
+def _time_limit(timeout: Optional[float]) -> Iterator[None]:
+    """
+    Interrupts the enclosed work in a worker process after `timeout` seconds, where SIGALRM exists.
+    """
+    use_alarm = bool(timeout) and hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        yield
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _convert_in_worker(path: str, timeout: Optional[float]) -> str:
+    """
+    Converts one file to Markdown inside a worker process.
+    """
+    with _time_limit(timeout):
+        return _markitdown.convert(path).text_content
+
+
+def _extract_pages_in_worker(path: str, page_numbers: List[int], timeout: Optional[float]) -> List[Tuple[int, str]]:
+    """
+    Extracts the text of the given zero-based pages of a PDF inside a worker process.
+    """
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+
+    with _time_limit(timeout):
+        wanted = sorted(set(page_numbers))
+        return [
+            (page_number, "".join(element.get_text() for element in layout if isinstance(element, LTTextContainer)))
+            for page_number, layout in zip(wanted, extract_pages(path, page_numbers=wanted))
+        ]
+
+
+def _outline_page(document: Any, destination: Any, action: Any, page_numbers: Dict[int, int]) -> Optional[int]:
+    """
+    Resolves the one-based page number a PDF bookmark points to, or None if it cannot be resolved.
+    """
+    from pdfminer.pdftypes import resolve1
+
+    try:
+        if destination is None and action is not None:
+            action = resolve1(action)
+            if isinstance(action, dict) and getattr(action.get("S"), "name", None) == "GoTo":
+                destination = action.get("D")
+        destination = resolve1(destination)
+        if isinstance(destination, (str, bytes)) or hasattr(destination, "name"):
+            # A named destination
+            destination = resolve1(document.get_dest(getattr(destination, "name", destination)))
+        if isinstance(destination, dict):
+            destination = resolve1(destination.get("D"))
+        if isinstance(destination, list) and destination:
+            return page_numbers.get(getattr(destination[0], "objid", None))
+    except Exception:
+        pass
+    return None
+
+
+def _outline_in_worker(path: str, timeout: Optional[float]) -> Dict[str, Any]:
+    """
+    Reads the page count and the bookmarks of a PDF inside a worker process.
+    """
+    from pdfminer.pdfdocument import PDFDocument, PDFNoOutlines
+    from pdfminer.pdfpage import PDFPage
+    from pdfminer.pdfparser import PDFParser
+
+    with _time_limit(timeout), open(path, "rb") as file:
+        document = PDFDocument(PDFParser(file))
+        page_numbers = {page.pageid: index + 1 for index, page in enumerate(PDFPage.create_pages(document))}
+        outline = []
+        try:
+            for level, title, destination, action, _ in document.get_outlines():
+                outline.append({
+                    "level": level,
+                    "title": str(title).strip(),
+                    "page": _outline_page(document, destination, action, page_numbers),
+                })
+        except PDFNoOutlines:
+            pass
+        return {"page_count": len(page_numbers), "outline": outline}
+
+
+class ConversionPool:
+    """
+    A pool of warm worker processes that convert files to Markdown.
+
+    Attributes:
+        max_workers (int): The number of worker processes.
+        timeout (Optional[float]): The default per-job timeout in seconds (None for no limit).
+        memory_limit (Optional[int]): The memory in bytes each worker may use for conversions, on
+            top of its size after start-up (None for no limit).
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = 300.0,
+        memory_limit: Optional[int] = 2 * 1024 * 1024 * 1024,
+    ):
+        """
+        Initializes the pool. Worker processes are started on the first job.
+
+        Args:
+            max_workers (Optional[int]): The number of worker processes. Defaults to the CPU count, up to 4.
+            timeout (Optional[float]): The default per-job timeout in seconds.
+            memory_limit (Optional[int]): The memory in bytes each worker may use for conversions.
+        """
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._owners: "weakref.WeakKeyDictionary[Future, ProcessPoolExecutor]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """
+        The process pool, started on first use (and again after it has been replaced).
+        """
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # Forking the threaded app could copy locks held by other threads into a worker
+                    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context(start_method),
+                        initializer=_init_worker,
+                        initargs=(self.memory_limit,),
+                    )
+        return self._executor
+
+
+    def submit(self, path: str, timeout: Optional[float] = None) -> Future:
+        """
+        Queues the conversion of a file.
+
+        Args:
+            path (str): The path of the file to convert.
+            timeout (Optional[float]): The job's timeout in seconds. Defaults to the pool's.
+
+        Returns:
+            Future: Resolves to the Markdown. `future.cancel()` drops the job if it has not started.
+        """
+        return self._submit(_convert_in_worker, path, timeout or self.timeout)
+
+
+    def _submit(self, job: Callable[..., Any], *args: Any) -> Future:
+        """
+        Queues a job in the pool and remembers which pool it went to.
+        """
+        executor = self.executor
+        future = executor.submit(job, *args)
+        self._owners[future] = executor
+        return future
+
+
+    def result(self, future: Future, timeout: Optional[float] = None) -> str:
+        """
+        Waits for a submitted conversion.
+
+        The timeout counts from when the job starts running, not from when it was queued. If a
+        running job does not return within the timeout plus a grace period (e.g., it is stuck in
+        native code), the pool is replaced. This also fails the other jobs running in it. A job
+        still queued after as long is cancelled instead, leaving the pool and its other jobs alone.
+
+        Args:
+            future (Future): The future returned by `submit`.
+            timeout (Optional[float]): The timeout the job was submitted with. Defaults to the pool's.
+
+        Returns:
+            str: The Markdown content.
+
+        Raises:
+            ConversionTimeoutError: If the conversion took longer than its timeout, or waited
+                longer than that for a worker.
+            MemoryError: If the conversion went over the worker's memory limit.
+        """
+        timeout = timeout or self.timeout
+        limit = timeout + TIMEOUT_GRACE if timeout else None
+        queued_at = time.monotonic()
+        started_at = None
+        try:
+            while True:
+                try:
+                    return future.result(timeout=POLL_INTERVAL if limit else None)
+                except FutureTimeoutError:
+                    if future.done():
+                        # The worker interrupted the job itself (ConversionTimeoutError is a TimeoutError too)
+                        raise
+                now = time.monotonic()
+                if future.running():
+                    started_at = started_at or now
+                    if now - started_at > limit:
+                        self._replace_executor(self._owners.get(future))
+                        raise ConversionTimeoutError(f"The conversion did not finish within {timeout}s.")
+                elif now - queued_at > limit and future.cancel():
+                    raise ConversionTimeoutError(f"The conversion waited more than {timeout}s for a free worker.")
+        except BrokenProcessPool:
+            # A worker died (e.g., killed by the operating system for its memory use)
+            self._replace_executor(self._owners.get(future))
+            raise
+
+
+    def convert(self, path: str, timeout: Optional[float] = None) -> str:
+        """
+        Converts a file to Markdown in a worker process.
+
+        Args:
+            path (str): The path of the file to convert.
+            timeout (Optional[float]): The job's timeout in seconds. Defaults to the pool's.
+
+        Returns:
+            str: The Markdown content.
+        """
+        return self.result(self.submit(path, timeout), timeout)
+
+
+    def convert_many(self, paths: Sequence[str], timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Converts several files in parallel.
+
+        Args:
+            paths (Sequence[str]): The paths of the files to convert.
+            timeout (Optional[float]): The timeout of each job in seconds. Defaults to the pool's.
+
+        Returns:
+            List[Dict[str, Any]]: One entry per path, in input order: `{"path": ..., "markdown": ...}`,
+            or `{"path": ..., "error": ...}` if that conversion failed.
+        """
+        futures = [self.submit(path, timeout) for path in paths]
+        results = []
+        for path, future in zip(paths, futures):
+            try:
+                results.append({"path": path, "markdown": self.result(future, timeout)})
+            except Exception as err:
+                logger.error("Error converting %s: %s", path, err)
+                results.append({"path": path, "error": f"{type(err).__name__}: {err}"})
+        return results
+
+
+    def extract_pages(self, path: str, page_numbers: Sequence[int], timeout: Optional[float] = None) -> List[Tuple[int, str]]:
+        """
+        Extracts the text of some pages of a PDF, without reading the others.
+
+        Args:
+            path (str): The path of the PDF.
+            page_numbers (Sequence[int]): The zero-based page numbers to extract.
+            timeout (Optional[float]): The job's timeout in seconds. Defaults to the pool's.
+
+        Returns:
+            List[Tuple[int, str]]: (zero-based page number, text) pairs in page order. Pages past
+            the end of the document are left out.
+        """
+        timeout = timeout or self.timeout
+        return self.result(self._submit(_extract_pages_in_worker, path, list(page_numbers), timeout), timeout)
+
+
+    def outline(self, path: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Reads the page count and the bookmarks (table of contents) of a PDF.
+
+        Args:
+            path (str): The path of the PDF.
+            timeout (Optional[float]): The job's timeout in seconds. Defaults to the pool's.
+
+        Returns:
+            Dict[str, Any]: `page_count`, and `outline`: a list of bookmarks with their `level`,
+            `title` and one-based `page` (None if it could not be resolved).
+        """
+        timeout = timeout or self.timeout
+        return self.result(self._submit(_outline_in_worker, path, timeout), timeout)
+
+
+    def _replace_executor(self, executor: Optional[ProcessPoolExecutor]) -> None:
+        """
+        Terminates the worker processes of a pool and drops it; the next job starts a new one.
+        Does nothing if that pool was already replaced.
+        """
+        with self._lock:
+            if executor is None or executor is not self._executor:
+                return
+            self._executor = None
+        logger.warning("Replacing the conversion pool after a stuck or crashed worker")
+        # ProcessPoolExecutor cannot stop a running job, so its processes are terminated directly
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+    def shutdown(self) -> None:
+        """
+        Stops the worker processes, cancelling jobs that have not started.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,331 @@
+"""
+rga_downloads.py
+
+A streaming, disk-backed download manager for Regulations.gov attachments.
+
+Attachments (the `fileFormats[].fileUrl` links of documents and comments) can be hundreds of MB.
+The manager never holds a whole file in memory: it streams the body to disk in chunks, and the
+finished file is hashed in chunks too. Finished files are named by their SHA-256, so concurrent sessions never overwrite
+each other's files, and the same file reached through two URLs is stored once.
+
+The download goes to a `.part` file named after the URL. If the connection drops, the download
+continues from where it stopped with an HTTP `Range` request, both on the next retry and on the
+next call. A size limit is checked against the `fileFormats[].size` metadata before anything is
+downloaded, then against `Content-Length`, and finally while streaming. Several downloads can run
+in parallel with `download_many`. Identical downloads that are in flight at the same time share
+one transfer.
+
+Finished files are kept as a small disk cache, and the least recently used ones are removed once
+the directory grows past `max_cache_bytes`. Files used within the last `prune_grace` seconds
+(returned by `download` or `find`, which touch them) are never removed, so a file another thread
+is about to convert does not disappear under it.
+
+Usage Example:
+
+    downloads = DownloadManager("/tmp/rga_downloads", max_bytes=500 * 1024 * 1024)
+    result = downloads.download(file_url, expected_size=file_format["size"])
+    print(result["path"], result["size"], result["sha256"])
+"""
+
+# Import necessary libraries
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, Any, List, Tuple, Union, Sequence
+from urllib.parse import urlparse
+
+from rga_coalesce import SingleFlight
+
+
+# Create a module-specific logger
+logger = logging.getLogger(__name__)
+
+# Default (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5.0, 60.0)
+
+# Bytes read from the network and written to disk at a time
+CHUNK_SIZE = 1024 * 1024
+
+
+class DownloadTooLargeError(ValueError):
+    """
+    Raised when a file is larger than the download limit.
+    """
+
+
+class DownloadManager:
+    """
+    Streams attachments to content-addressed files, with resume, size limits and parallelism.
+
+    Attributes:
+        directory (str): Where finished and partial downloads are stored.
+        max_bytes (int): The largest file that may be downloaded.
+        max_cache_bytes (int): The total size of finished files kept on disk.
+        prune_grace (float): Seconds after its last use during which a file is never pruned.
+        max_workers (int): The number of downloads `download_many` runs at the same time.
+        max_retries (int): How many times an interrupted transfer is resumed before giving up.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_bytes: int = 512 * 1024 * 1024,
+        max_cache_bytes: int = 2 * 1024 * 1024 * 1024,
+        max_workers: int = 4,
+        max_retries: int = 3,
+        timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+        prune_grace: float = 600.0,
+    ):
+        """
+        Initializes the manager and creates its directory.
+
+        Args:
+            directory (Optional[str]): Where downloads are stored. Defaults to `rga_downloads` in the temp directory.
+            max_bytes (int): The largest file that may be downloaded.
+            max_cache_bytes (int): The total size of finished files kept on disk.
+            max_workers (int): The number of downloads `download_many` runs at the same time.
+            max_retries (int): How many times an interrupted transfer is resumed before giving up.
+            timeout (Union[float, Tuple[float, float]]): A single timeout or a (connect, read) pair in seconds.
+            prune_grace (float): Seconds after its last use during which a file is never pruned.
+        """
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "rga_downloads")
+        self.max_bytes = max_bytes
+        self.max_cache_bytes = max_cache_bytes
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.prune_grace = prune_grace
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(max_workers, 4))
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._in_flight = SingleFlight()
+        self._prune_lock = threading.Lock()
+
+
+    def download(self, url: str, expected_size: Optional[int] = None, max_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Downloads a file to disk, resuming a previous partial download of the same URL.
+
+        Args:
+            url (str): The file URL.
+            expected_size (Optional[int]): The size from the `fileFormats` metadata, if known.
+            max_bytes (Optional[int]): Overrides the manager's size limit for this download.
+
+        Returns:
+            Dict[str, Any]: url, path (the content-addressed file), size, sha256, etag (the ETag or
+            Last-Modified value, if the server sent one) and resumed (whether part of the file came
+            from an earlier, interrupted transfer).
+
+        Raises:
+            DownloadTooLargeError: If the file is larger than the size limit.
+            requests.HTTPError: If the server answers with an error status.
+        """
+        limit = max_bytes or self.max_bytes
+        if expected_size and expected_size > limit:
+            raise DownloadTooLargeError(f"{url} is {expected_size} bytes, over the {limit} byte download limit.")
+        return self._in_flight.do(url, self._download, url, limit)
+
+
+    def download_many(self, items: Sequence[Union[str, Tuple[str, Optional[int]]]]) -> List[Dict[str, Any]]:
+        """
+        Downloads several files in parallel.
+
+        Args:
+            items (Sequence[Union[str, Tuple[str, Optional[int]]]]): URLs, or (url, expected_size) pairs.
+
+        Returns:
+            List[Dict[str, Any]]: One entry per item, in input order: the `download` result, or
+            `{"url": ..., "error": ...}` if that download failed.
+        """
+        def download_one(item: Union[str, Tuple[str, Optional[int]]]) -> Dict[str, Any]:
+            url, expected_size = (item, None) if isinstance(item, str) else item
+            try:
+                return self.download(url, expected_size)
+            except Exception as err:
+                logger.error("Error downloading %s: %s", url, err)
+                return {"url": url, "error": f"{type(err).__name__}: {err}"}
+
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items)), thread_name_prefix="rga-download") as executor:
+            return list(executor.map(download_one, items))
+
+
+    def find(self, sha256: str, url: str) -> Optional[str]:
+        """
+        Returns the path of a file downloaded earlier, if it is still on disk.
+
+        Args:
+            sha256 (str): The SHA-256 hex digest of the file.
+            url (str): A URL the file was downloaded from (for its extension).
+
+        Returns:
+            Optional[str]: The path, or None if the file has been pruned.
+        """
+        path = os.path.join(self.directory, sha256 + self._extension(url))
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+
+    def _download(self, url: str, limit: int) -> Dict[str, Any]:
+        """
+        Runs one download, resuming the transfer up to `max_retries` times if it is interrupted.
+        """
+        part_path = os.path.join(self.directory, hashlib.sha256(url.encode("utf-8")).hexdigest()[:32] + ".part")
+        resumed = os.path.exists(part_path) and os.path.getsize(part_path) > 0
+        validator = None
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                validator = self._transfer(url, part_path, limit)
+                break
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as err:
+                if attempt == self.max_retries:
+                    raise
+                resumed = True
+                logger.warning("Download of %s was interrupted (%s); resuming (attempt %s)", url, err, attempt + 1)
+            except (DownloadTooLargeError, requests.HTTPError):
+                # The partial file can never be completed; anything else keeps it for a later resume
+                self._remove(part_path)
+                self._remove(part_path + ".json")
+                raise
+
+        sha256, size = self._hash_file(part_path)
+        path = os.path.join(self.directory, sha256 + self._extension(url))
+        if os.path.exists(path):
+            os.remove(part_path)
+            os.utime(path)
+        else:
+            os.replace(part_path, path)
+        self._remove(part_path + ".json")
+        self._prune(keep=path)
+        logger.info("Downloaded %s (%s bytes) to %s", url, size, path)
+        return {"url": url, "path": path, "size": size, "sha256": sha256, "etag": validator, "resumed": resumed}
+
+
+    def _transfer(self, url: str, part_path: str, limit: int) -> Optional[str]:
+        """
+        Streams the rest of the file into `part_path` and returns its ETag or Last-Modified value.
+
+        An existing partial file is continued with a `Range` request. `If-Range` makes the server
+        send the whole file again if it changed since the partial file was started.
+        """
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        validator = self._read_validator(part_path) if offset else None
+        headers = {"Accept-Encoding": "identity"}
+        if offset and validator:
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = validator
+        else:
+            offset = 0
+
+        with self._session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code == 416:
+                # The partial file already holds the whole body
+                return validator
+            response.raise_for_status()
+            if response.status_code != 206:
+                offset = 0
+
+            length = response.headers.get("Content-Length")
+            if length and length.isdigit() and offset + int(length) > limit:
+                raise DownloadTooLargeError(f"{url} is {offset + int(length)} bytes, over the {limit} byte download limit.")
+
+            validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+            if offset == 0 and validator:
+                self._write_validator(part_path, validator)
+
+            written = offset
+            with open(part_path, "ab" if offset else "wb") as part_file:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    written += len(chunk)
+                    if written > limit:
+                        raise DownloadTooLargeError(f"{url} is over the {limit} byte download limit.")
+                    part_file.write(chunk)
+            return validator
+
+
+    def _read_validator(self, part_path: str) -> Optional[str]:
+        """
+        Returns the ETag or Last-Modified value saved when a partial download was started.
+        """
+        try:
+            with open(part_path + ".json", "r", encoding="utf-8") as file:
+                return json.load(file).get("validator")
+        except (OSError, ValueError):
+            return None
+
+
+    def _write_validator(self, part_path: str, validator: str) -> None:
+        """
+        Saves the ETag or Last-Modified value of a download that is being started.
+        """
+        with open(part_path + ".json", "w", encoding="utf-8") as file:
+            json.dump({"validator": validator}, file)
+
+
+    def _hash_file(self, path: str) -> Tuple[str, int]:
+        """
+        Returns the SHA-256 hex digest and size of a file, reading it in chunks.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, "rb") as file:
+            while chunk := file.read(CHUNK_SIZE):
+                digest.update(chunk)
+                size += len(chunk)
+        return digest.hexdigest(), size
+
+
+    def _extension(self, url: str) -> str:
+        """
+        Returns the file extension of a URL's path (e.g., ".pdf"), or "" if it has none.
+        """
+        extension = os.path.splitext(urlparse(url).path)[1].lower()
+        return extension if 1 < len(extension) <= 6 else ""
+
+
+    def _remove(self, path: str) -> None:
+        """
+        Removes a file if it exists.
+        """
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+    def _prune(self, keep: str) -> None:
+        """
+        Removes the least recently used finished files, except `keep`, until the directory fits
+        `max_cache_bytes`. Files used within `prune_grace` seconds are kept even if the directory
+        stays over its budget for a while.
+        """
+        with self._prune_lock:
+            recent = time.time() - self.prune_grace
+            entries = []
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    if entry.is_file() and entry.path != keep and not entry.name.endswith((".part", ".json")):
+                        stat = entry.stat()
+                        entries.append((max(stat.st_atime, stat.st_mtime), stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries) + os.path.getsize(keep)
+            for last_used, size, path in sorted(entries):
+                if total <= self.max_cache_bytes or last_used >= recent:
+                    break
+                self._remove(path)
+                total -= size
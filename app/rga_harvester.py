@@ -0,0 +1,352 @@
+"""
+rga_harvester.py
+
+A bulk harvester for the Regulations.gov API (v4) that gets past the findAll result cap.
+
+A single findAll query can return at most 20 pages of 250 results (5,000 records), even when
+`meta.totalElements` is larger. The harvester works around this by splitting the query into
+date slices (on `lastModifiedDate`, or `postedDate` for documents and comments) until every
+slice holds no more than 5,000 records. The slices are fetched in parallel, each one sorted by
+the slicing date, and the records are streamed back in date order with duplicates removed.
+
+Harvest requests run at `Priority.BACKGROUND` by default, so they use the rate budget left over
+by interactive chat calls sharing the same client.
+
+Usage Example:
+
+    api = RegulationsGovAPI(api_key="YOUR_API_KEY")
+    harvester = RegulationsGovHarvester(api, max_workers=4)
+    for comment in harvester.harvest_docket_comments("EPA-HQ-OAR-2021-0317"):
+        print(comment["id"])
+"""
+
+# Import necessary libraries
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Optional, Dict, Any, List, Tuple, Union, Callable, Iterator
+
+from rga_scheduler import Priority, request_priority
+from rga_wrapper import RegulationsGovAPI, MAX_PAGE_SIZE, MAX_PAGE_NUMBER
+
+
+# Create a module-specific logger
+logger = logging.getLogger(__name__)
+
+# The most records a single findAll query can page through
+MAX_RESULTS_PER_QUERY = MAX_PAGE_SIZE * MAX_PAGE_NUMBER
+
+# The earliest date used when the caller does not give a start date
+DEFAULT_START = datetime(1990, 1, 1)
+
+# For each date field that can be sliced on: the (ge, le) filter names, the filter format
+# expected by the API, and the smallest step a slice can be split into.
+DATE_FIELDS = {
+    "lastModifiedDate": ("lastModifiedDateGe", "lastModifiedDateLe", "%Y-%m-%d %H:%M:%S", timedelta(seconds=1)),
+    "postedDate": ("postedDateGe", "postedDateLe", "%Y-%m-%d", timedelta(days=1)),
+}
+
+DateLike = Union[str, date, datetime]
+
+
+def _to_datetime(value: DateLike) -> datetime:
+    """
+    Converts a `YYYY-MM-DD`, `YYYY-MM-DD HH:MM:SS` string, date or datetime to a datetime.
+    """
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return datetime.fromisoformat(value.strip().replace("T", " ").rstrip("Z"))
+
+
+class RegulationsGovHarvester:
+    """
+    Harvests complete result sets from the findAll endpoints by slicing on a date field.
+
+    Attributes:
+        client (RegulationsGovAPI): The client used for every request.
+        max_workers (int): The number of slices probed or fetched at the same time.
+        priority (Priority): The scheduler priority of every harvest request.
+    """
+
+    def __init__(
+        self,
+        client: RegulationsGovAPI,
+        max_workers: int = 4,
+        priority: Priority = Priority.BACKGROUND,
+    ):
+        """
+        Initializes the harvester.
+
+        Args:
+            client (RegulationsGovAPI): The client used for every request.
+            max_workers (int): The number of slices probed or fetched at the same time.
+            priority (Priority): The scheduler priority of every harvest request.
+        """
+        self.client = client
+        self.max_workers = max_workers
+        self.priority = priority
+
+
+    def harvest_documents(
+        self,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+        date_field: str = "lastModifiedDate",
+        **filters: Any,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streams every document matching the filters between `start` and `end`.
+
+        Args:
+            start (Optional[DateLike]): The earliest date to include. Defaults to 1990-01-01.
+            end (Optional[DateLike]): The latest date to include. Defaults to now.
+            date_field (str): The field to slice and order on: "lastModifiedDate" or "postedDate".
+            **filters: Any other filter accepted by `RegulationsGovAPI.get_documents`.
+
+        Yields:
+            Dict[str, Any]: One document record at a time, ordered by `date_field`.
+        """
+        return self._harvest(self.client.get_documents, self.client.iter_documents, start, end, date_field, filters)
+
+
+    def harvest_comments(
+        self,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+        date_field: str = "lastModifiedDate",
+        **filters: Any,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streams every comment matching the filters between `start` and `end`.
+
+        Args:
+            start (Optional[DateLike]): The earliest date to include. Defaults to 1990-01-01.
+            end (Optional[DateLike]): The latest date to include. Defaults to now.
+            date_field (str): The field to slice and order on: "lastModifiedDate" or "postedDate".
+            **filters: Any other filter accepted by `RegulationsGovAPI.get_comments`.
+
+        Yields:
+            Dict[str, Any]: One comment record at a time, ordered by `date_field`.
+        """
+        return self._harvest(self.client.get_comments, self.client.iter_comments, start, end, date_field, filters)
+
+
+    def harvest_dockets(
+        self,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+        **filters: Any,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streams every docket matching the filters between `start` and `end`.
+
+        Dockets can only be filtered on `lastModifiedDate`, so that is always the slicing field.
+
+        Args:
+            start (Optional[DateLike]): The earliest date to include. Defaults to 1990-01-01.
+            end (Optional[DateLike]): The latest date to include. Defaults to now.
+            **filters: Any other filter accepted by `RegulationsGovAPI.get_dockets`.
+
+        Yields:
+            Dict[str, Any]: One docket record at a time, ordered by `lastModifiedDate`.
+        """
+        return self._harvest(self.client.get_dockets, self.client.iter_dockets, start, end, "lastModifiedDate", filters)
+
+
+    def harvest_docket_comments(
+        self,
+        docket_id: str,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streams every comment on every document of a docket.
+
+        The comments endpoint cannot filter on a docket, so this lists the docket's documents
+        and harvests the comments of each one through its `objectId` (`commentOnId`).
+
+        Args:
+            docket_id (str): The docket ID (e.g., "EPA-HQ-OAR-2021-0317").
+            start (Optional[DateLike]): The earliest `lastModifiedDate` to include.
+            end (Optional[DateLike]): The latest `lastModifiedDate` to include.
+
+        Yields:
+            Dict[str, Any]: One comment record at a time, grouped by document.
+
+        Raises:
+            ValueError: If the docket_id is not provided or is empty.
+        """
+        if not docket_id:
+            raise ValueError("The 'docket_id' parameter is required and cannot be empty.")
+
+        for document in self.harvest_documents(docketId=docket_id):
+            object_id = document.get("attributes", {}).get("objectId")
+            if object_id:
+                yield from self.harvest_comments(start, end, commentOnId=object_id)
+
+
+    def _harvest(
+        self,
+        fetch: Callable[..., Any],
+        iterate: Callable[..., Iterator[Dict[str, Any]]],
+        start: Optional[DateLike],
+        end: Optional[DateLike],
+        date_field: str,
+        filters: Dict[str, Any],
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Plans the date slices for a query, then fetches them in parallel and streams the records.
+
+        `fetch` is the single-page endpoint method used to count records while planning, and
+        `iterate` the matching `iter_*` method used to page through each slice.
+
+        Slices are submitted in date order and at most `2 * max_workers` of them are in flight or
+        buffered at once, so memory stays bounded however large the harvest is.
+        """
+        if date_field not in DATE_FIELDS:
+            raise ValueError(f"date_field must be one of {sorted(DATE_FIELDS)}, not '{date_field}'.")
+        for reserved in ("pageNumber", "pageSize", "sort"):
+            filters.pop(reserved, None)
+
+        start_dt = _to_datetime(start) if start is not None else DEFAULT_START
+        end_dt = _to_datetime(end) if end is not None else datetime.now()
+        if start_dt > end_dt:
+            raise ValueError("start must not be after end.")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="rga-harvest") as executor:
+            slices = self._plan(executor, fetch, start_dt, end_dt, date_field, filters)
+            logger.info("Harvesting %s slice(s) on %s with filters: %s", len(slices), date_field, filters)
+
+            seen = set()
+            pending = deque()
+            remaining = iter(slices)
+            window = 2 * self.max_workers
+
+            def submit_next() -> None:
+                for slice_start, slice_end in remaining:
+                    pending.append(executor.submit(
+                        self._fetch_slice, iterate, slice_start, slice_end, date_field, filters
+                    ))
+                    return
+
+            for _ in range(window):
+                submit_next()
+
+            while pending:
+                records = pending.popleft().result()
+                submit_next()
+                for record in records:
+                    # A record modified mid-harvest can move into a later slice
+                    record_id = record.get("id")
+                    if record_id in seen:
+                        continue
+                    seen.add(record_id)
+                    yield record
+
+
+    def _plan(
+        self,
+        executor: ThreadPoolExecutor,
+        fetch: Callable[..., Any],
+        start: datetime,
+        end: datetime,
+        date_field: str,
+        filters: Dict[str, Any],
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        Splits [start, end] into date-ordered slices that each hold at most `MAX_RESULTS_PER_QUERY` records.
+
+        Each level of the split is probed in parallel with a one-record-per-page request that
+        only reads `meta.totalElements`.
+        """
+        step = DATE_FIELDS[date_field][3]
+        start, end = self._align(start, date_field), self._align(end, date_field)
+
+        accepted = []
+        level = [(start, end)]
+        while level:
+            totals = list(executor.map(
+                lambda bounds: self._count(fetch, bounds[0], bounds[1], date_field, filters), level
+            ))
+            next_level = []
+            for (slice_start, slice_end), total in zip(level, totals):
+                if total == 0:
+                    continue
+                if total <= MAX_RESULTS_PER_QUERY:
+                    accepted.append((slice_start, slice_end))
+                elif slice_end - slice_start < step:
+                    logger.warning(
+                        "%s records share %s=%s; only the first %s can be harvested.",
+                        total, date_field, slice_start, MAX_RESULTS_PER_QUERY,
+                    )
+                    accepted.append((slice_start, slice_end))
+                else:
+                    middle = self._align(slice_start + (slice_end - slice_start) / 2, date_field)
+                    next_level.append((slice_start, middle))
+                    next_level.append((middle + step, slice_end))
+            level = next_level
+
+        return sorted(accepted)
+
+
+    def _align(self, value: datetime, date_field: str) -> datetime:
+        """
+        Truncates a datetime to the granularity of the date field's filter.
+        """
+        if DATE_FIELDS[date_field][3] >= timedelta(days=1):
+            return datetime(value.year, value.month, value.day)
+        return value.replace(microsecond=0)
+
+
+    def _slice_filters(
+        self,
+        start: datetime,
+        end: datetime,
+        date_field: str,
+        filters: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        Returns the caller's filters with the date bounds of one slice.
+        """
+        ge_name, le_name, date_format, _ = DATE_FIELDS[date_field]
+        return {**filters, ge_name: start.strftime(date_format), le_name: end.strftime(date_format)}
+
+
+    def _count(
+        self,
+        fetch: Callable[..., Any],
+        start: datetime,
+        end: datetime,
+        date_field: str,
+        filters: Dict[str, Any],
+    ) -> int:
+        """
+        Returns how many records match the filters within one slice.
+
+        Raises:
+            RuntimeError: If the API returned an error dictionary.
+        """
+        with request_priority(self.priority):
+            page = fetch(pageNumber=1, pageSize=5, **self._slice_filters(start, end, date_field, filters))
+        if "error" in page:
+            raise RuntimeError(f"Regulations.gov returned an error while planning slices: {page}")
+        return page.get("meta", {}).get("totalElements", 0)
+
+
+    def _fetch_slice(
+        self,
+        iterate: Callable[..., Iterator[Dict[str, Any]]],
+        start: datetime,
+        end: datetime,
+        date_field: str,
+        filters: Dict[str, Any],
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetches every record of one slice, sorted by the slicing date.
+        """
+        slice_filters = self._slice_filters(start, end, date_field, filters)
+        with request_priority(self.priority):
+            return list(iterate(sort=date_field, **slice_filters))
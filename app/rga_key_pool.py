@@ -0,0 +1,273 @@
+"""
+rga_key_pool.py
+
+A pool of Regulations.gov API keys that multiplies the hourly request budget.
+
+Each key gets its own `RateLimitScheduler`. Every request is sent with the key that has the
+most quota left, so load spreads evenly and the pool as a whole can make roughly `len(keys)`
+times as many requests per hour as a single key. A key that answers 429 is taken out of use
+until its window resets (the `Retry-After` delay, or `exhausted_cooldown` seconds when the API
+does not send one), and the request is retried on another key straight away.
+
+The clients build a pool of one when they are given a single API key.
+
+Interactive requests (a chat turn) give up waiting on the rate limit after `max_interactive_wait`
+seconds in total and raise `RateLimitWaitError`, rather than holding the turn for minutes while
+a lone exhausted key rests. Background requests (e.g., mirror syncs) wait as long as it takes.
+
+Usage Example:
+
+    api = RegulationsGovAPI(api_key=["KEY_1", "KEY_2", "KEY_3"])
+    ...
+    print(api.key_usage())
+"""
+
+# Import necessary libraries
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional, Dict, Any, List, Mapping, Sequence, Tuple
+
+from rga_scheduler import RateLimitScheduler, Priority, current_priority
+
+
+# Create a module-specific logger
+logger = logging.getLogger(__name__)
+
+
+class RateLimitWaitError(RuntimeError):
+    """
+    Raised when an interactive request would wait on the rate limit longer than allowed.
+    """
+
+
+class ApiKeyPool:
+    """
+    Spreads requests across several API keys by remaining quota.
+
+    Attributes:
+        api_keys (List[str]): The keys in the pool.
+        max_retries (int): How many times a 429/5xx response is retried.
+        exhausted_cooldown (float): How long a key that answered 429 without `Retry-After` is rested, in seconds.
+        max_interactive_wait (Optional[float]): The longest an interactive request waits for quota
+            and retries in total, in seconds (None for no limit).
+    """
+
+    def __init__(
+        self,
+        api_keys: Sequence[str],
+        limit_per_hour: int = 1000,
+        background_reserve: float = 0.2,
+        max_retries: int = 4,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        exhausted_cooldown: float = 60.0,
+        max_interactive_wait: Optional[float] = 20.0,
+    ):
+        """
+        Initializes the pool with a full bucket for every key.
+
+        Args:
+            api_keys (Sequence[str]): The API keys to use. Duplicates are ignored.
+            limit_per_hour (int): The hourly limit assumed for each key until the API reports it.
+            background_reserve (float): The fraction of each key's bucket kept for interactive requests.
+            max_retries (int): How many times a 429/5xx response is retried.
+            backoff_base (float): The first 5xx retry delay in seconds, doubled on every attempt.
+            backoff_max (float): The longest 5xx retry delay in seconds.
+            exhausted_cooldown (float): How long a key that answered 429 without `Retry-After` is rested.
+            max_interactive_wait (Optional[float]): The longest an interactive request waits for
+                quota and retries in total, in seconds (None for no limit).
+
+        Raises:
+            ValueError: If no API key is provided.
+        """
+        self.api_keys = list(dict.fromkeys(key for key in api_keys if key))
+        if not self.api_keys:
+            raise ValueError("At least one API key is required.")
+
+        self.max_retries = max_retries
+        self.exhausted_cooldown = exhausted_cooldown
+        self.max_interactive_wait = max_interactive_wait
+        self._schedulers = {
+            key: RateLimitScheduler(
+                limit_per_hour=limit_per_hour,
+                background_reserve=background_reserve,
+                max_retries=max_retries,
+                backoff_base=backoff_base,
+                backoff_max=backoff_max,
+            )
+            for key in self.api_keys
+        }
+        self._requests = {key: 0 for key in self.api_keys}
+        self._throttled = {key: 0 for key in self.api_keys}
+        self._lock = threading.Lock()
+
+
+    def try_acquire(self, priority: Optional[Priority] = None) -> Tuple[Optional[str], float]:
+        """
+        Takes a token from the key with the most quota left.
+
+        Args:
+            priority (Optional[Priority]): The caller's priority. Defaults to the current context's.
+
+        Returns:
+            Tuple[Optional[str], float]: The key to use and 0, or None and how many seconds to wait
+            before trying again.
+        """
+        if priority is None:
+            priority = current_priority()
+
+        shortest_wait = float("inf")
+        by_remaining = sorted(self.api_keys, key=lambda key: self._schedulers[key].remaining, reverse=True)
+        for key in by_remaining:
+            delay = self._schedulers[key].try_acquire(priority)
+            if delay == 0:
+                with self._lock:
+                    self._requests[key] += 1
+                return key, 0.0
+            shortest_wait = min(shortest_wait, delay)
+        return None, shortest_wait
+
+
+    def acquire(self, priority: Optional[Priority] = None, deadline: Optional[float] = None) -> str:
+        """
+        Blocks the calling thread until one of the keys has quota.
+
+        Args:
+            priority (Optional[Priority]): The caller's priority. Defaults to the current context's.
+            deadline (Optional[float]): A `time.monotonic()` time not to wait past (see `deadline`).
+
+        Returns:
+            str: The key to send the request with.
+
+        Raises:
+            RateLimitWaitError: If no key has quota before the deadline.
+        """
+        if priority is None:
+            priority = current_priority()
+        while True:
+            key, delay = self.try_acquire(priority)
+            if key is not None:
+                return key
+            logger.debug("All API keys are at their limit; waiting %.2fs (priority %s)", delay, priority.name)
+            self.check_wait(delay, deadline)
+            time.sleep(delay)
+
+
+    async def acquire_async(self, priority: Optional[Priority] = None, deadline: Optional[float] = None) -> str:
+        """
+        Waits without blocking the event loop until one of the keys has quota.
+
+        Args:
+            priority (Optional[Priority]): The caller's priority. Defaults to the current context's.
+            deadline (Optional[float]): A `time.monotonic()` time not to wait past (see `deadline`).
+
+        Returns:
+            str: The key to send the request with.
+
+        Raises:
+            RateLimitWaitError: If no key has quota before the deadline.
+        """
+        if priority is None:
+            priority = current_priority()
+        while True:
+            key, delay = self.try_acquire(priority)
+            if key is not None:
+                return key
+            logger.debug("All API keys are at their limit; waiting %.2fs (priority %s)", delay, priority.name)
+            self.check_wait(delay, deadline)
+            await asyncio.sleep(delay)
+
+
+    def deadline(self, priority: Optional[Priority] = None) -> Optional[float]:
+        """
+        Returns the latest time a request starting now may wait until, or None for no limit.
+
+        Args:
+            priority (Optional[Priority]): The caller's priority. Defaults to the current context's.
+
+        Returns:
+            Optional[float]: A `time.monotonic()` time for interactive requests, else None.
+        """
+        if priority is None:
+            priority = current_priority()
+        if priority != Priority.INTERACTIVE or self.max_interactive_wait is None:
+            return None
+        return time.monotonic() + self.max_interactive_wait
+
+
+    def check_wait(self, delay: float, deadline: Optional[float]) -> None:
+        """
+        Raises if waiting `delay` seconds would go past the deadline.
+
+        Raises:
+            RateLimitWaitError: If the wait would end after the deadline.
+        """
+        if deadline is not None and time.monotonic() + delay > deadline:
+            raise RateLimitWaitError(
+                f"The Regulations.gov API rate limit would delay this request by {delay:.0f}s; "
+                f"please try again in a minute."
+            )
+
+
+    def update_from_headers(self, api_key: str, headers: Mapping[str, str]) -> None:
+        """
+        Corrects a key's bucket from the rate limit headers of a response sent with it.
+
+        Args:
+            api_key (str): The key the request was sent with.
+            headers (Mapping[str, str]): The response headers.
+        """
+        self._schedulers[api_key].update_from_headers(headers)
+
+
+    def retry_delay(self, api_key: str, status_code: int, retry_after: Optional[str], attempt: int) -> float:
+        """
+        Works out how long to wait before retrying a failed request.
+
+        A 429 rests the key that received it and returns 0: the retry goes to another key, or
+        waits in `acquire` until some key is usable again.
+
+        Args:
+            api_key (str): The key the failed request was sent with.
+            status_code (int): The status code of the failed response.
+            retry_after (Optional[str]): The `Retry-After` header, if any.
+            attempt (int): The number of retries already made (0 for the first).
+
+        Returns:
+            float: The delay in seconds.
+        """
+        scheduler = self._schedulers[api_key]
+        if status_code != 429:
+            return scheduler.retry_delay(status_code, retry_after, attempt)
+
+        rest = float(retry_after) if retry_after and retry_after.isdigit() else self.exhausted_cooldown
+        scheduler.pause(rest)
+        with self._lock:
+            self._throttled[api_key] += 1
+        logger.warning("API key ...%s is exhausted; resting it for %.0fs", api_key[-4:], rest)
+        return 0.0
+
+
+    def usage(self) -> List[Dict[str, Any]]:
+        """
+        Reports per-key usage. Keys are masked to their last four characters.
+
+        Returns:
+            List[Dict[str, Any]]: One entry per key with the requests sent, the 429s received,
+            the estimated remaining quota and how long the key is still resting.
+        """
+        with self._lock:
+            counts = [(key, self._requests[key], self._throttled[key]) for key in self.api_keys]
+        return [
+            {
+                "key": f"...{key[-4:]}",
+                "requests": requests_sent,
+                "throttled": throttled,
+                "limit_per_hour": self._schedulers[key].limit_per_hour,
+                "remaining": int(self._schedulers[key].remaining),
+                "resting_for": round(self._schedulers[key].paused_for, 1),
+            }
+            for key, requests_sent, throttled in counts
+        ]
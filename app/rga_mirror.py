@@ -0,0 +1,791 @@
+"""
+rga_mirror.py
+
+An incremental local mirror of Regulations.gov documents, comments and dockets.
+
+The chat agents ask about the same agencies and dockets again and again. The mirror keeps their
+records in SQLite and keeps them current with small incremental syncs. Each sync scope (an
+agency, a docket or a document's comments) has its own `lastModifiedDate` watermark, and the
+next sync only asks the API for records modified since then. Records are upserted by `id` (the
+`objectId` is stored as well), so syncing twice is harmless.
+
+The harvester returns records in `lastModifiedDate` order, so the watermark is saved after every
+batch. A sync that is interrupted (Ctrl-C, a crash, an exhausted API key) continues from its
+last batch the next time it runs.
+
+The `get_documents`, `get_comments` and `get_dockets` tools answer from the mirror when a recent
+sync covers the request's scope (see `LocalMirror.covers`). They accept the same filters, sorts
+and paging and return a response with the same shape as the API's.
+
+When SQLite has FTS5, the mirror also keeps a full-text index of titles, bodies (document and
+docket abstracts, comment text) and converted attachment markdown. A `searchTerm` is then
+answered locally as well: results are ranked with BM25 and each one carries a
+`highlightedContent` snippet, like the API's. Bodies only come with the detail endpoints, so
+`fill_details` (or `sync_docket(..., details=True)`) fetches them for the mirrored records, and
+`add_attachment_text` indexes an attachment once it has been converted. Until the details of a
+scope have been filled since its last sync, the index only holds titles, so that scope's
+`searchTerm` requests still go to the API.
+
+Usage Example:
+
+    api = RegulationsGovAPI(api_key="YOUR_API_KEY")
+    mirror = LocalMirror("rga_mirror.sqlite3", client=api)
+    mirror.sync_docket("EPA-HQ-OAR-2021-0317", details=True)
+    mirror.sync("documents", agencyId="EPA")
+    print(mirror.query("documents", {"agencyId": "EPA", "documentType": "Rule"}, sort="-postedDate"))
+    print(mirror.query("comments", {"commentOnId": "09000064849a1c71", "searchTerm": "methane leak"}))
+"""
+
+# Import necessary libraries
+import json
+import logging
+import math
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List, Tuple
+
+from rga_harvester import RegulationsGovHarvester
+from rga_wrapper import RegulationsGovAPI
+
+
+# Create a module-specific logger
+logger = logging.getLogger(__name__)
+
+# The kinds of record that can be mirrored
+KINDS = ("documents", "comments", "dockets")
+
+# The filters that can be a sync scope, for each kind
+SCOPE_FILTERS = {
+    "documents": ("agencyId", "docketId"),
+    "comments": ("agencyId", "commentOnId"),
+    "dockets": ("agencyId",),
+}
+
+# The filters whose columns list records fill, for each kind. Any other filter (e.g.,
+# `commentOnId` on comments, whose list records do not carry it) can only be answered by a sync
+# scoped to that same filter, where the column is filled from the scope.
+LIST_FILTERS = {
+    "documents": frozenset([
+        "agencyId", "docketId", "documentType", "subtype", "frDocNum", "postedDate", "postedDateGe",
+        "postedDateLe", "lastModifiedDate", "lastModifiedDateGe", "lastModifiedDateLe", "commentEndDate",
+        "withinCommentPeriod", "searchTerm",
+    ]),
+    "comments": frozenset([
+        "agencyId", "documentType", "postedDate", "postedDateGe", "postedDateLe", "lastModifiedDate",
+        "lastModifiedDateGe", "lastModifiedDateLe", "searchTerm",
+    ]),
+    "dockets": frozenset([
+        "agencyId", "docketId", "lastModifiedDate", "lastModifiedDateGe", "lastModifiedDateLe", "searchTerm",
+    ]),
+}
+
+# How far before the watermark an incremental sync starts. The `lastModifiedDate` filter is
+# interpreted in Eastern time while records carry UTC timestamps, so a day's overlap makes sure
+# nothing falls between two syncs. Re-fetched records are simply upserted again.
+WATERMARK_OVERLAP = timedelta(days=1)
+
+# Records written per transaction (and per watermark checkpoint) during a sync
+SYNC_BATCH_SIZE = 500
+
+# Sort fields accepted by the tools, mapped to mirror columns
+SORT_COLUMNS = {
+    "documentId": "id",
+    "docketId": "id",
+    "title": "title",
+    "postedDate": "posted_date",
+    "lastModifiedDate": "last_modified_date",
+    "commentEndDate": "comment_end_date",
+}
+
+# The sort used when the caller does not give one
+DEFAULT_SORTS = {
+    "documents": "-postedDate",
+    "comments": "-postedDate",
+    "dockets": "-lastModifiedDate",
+}
+
+# Equality filters, mapped to mirror columns
+EQUALITY_FILTERS = {
+    "agencyId": "agency_id",
+    "docketId": "docket_id",
+    "commentOnId": "comment_on_id",
+    "documentType": "document_type",
+    "subtype": "subtype",
+    "frDocNum": "fr_doc_num",
+}
+
+# The detail attribute that holds each kind's body text
+BODY_ATTRIBUTES = {
+    "documents": "docAbstract",
+    "comments": "comment",
+    "dockets": "dkAbstract",
+}
+
+# BM25 weights of the indexed columns: title, body, attachments
+FTS_WEIGHTS = (10.0, 4.0, 1.0)
+
+# Highlight markers and length (in tokens) of `highlightedContent` snippets
+SNIPPET_MARKERS = ("<em>", "</em>")
+SNIPPET_TOKENS = 32
+
+# Date filters: (column, operator)
+DATE_FILTERS = {
+    "postedDate": ("posted_date", "="),
+    "postedDateGe": ("posted_date", ">="),
+    "postedDateLe": ("posted_date", "<="),
+    "lastModifiedDate": ("last_modified_date", "="),
+    "lastModifiedDateGe": ("last_modified_date", ">="),
+    "lastModifiedDateLe": ("last_modified_date", "<="),
+    "commentEndDate": ("comment_end_date", "="),
+}
+
+
+def _normalize_date(value: Optional[str]) -> Optional[str]:
+    """
+    Converts an API timestamp (e.g., "2021-05-01T12:00:00Z") to "YYYY-MM-DD HH:MM:SS".
+    """
+    if not value:
+        return None
+    return str(value).replace("T", " ").rstrip("Z")[:19]
+
+
+def _match_expression(search_term: str) -> str:
+    """
+    Turns a free-text search term into an FTS5 query: every word (or "quoted phrase") must match.
+
+    Everything is quoted, so punctuation and FTS5 operators in the term cannot cause syntax errors.
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', search_term):
+        text = " ".join(re.findall(r"\w+", phrase or word))
+        if text:
+            terms.append(f'"{text}"')
+    return " ".join(terms)
+
+
+class LocalMirror:
+    """
+    A SQLite mirror of Regulations.gov records, kept current by watermark syncs.
+
+    Attributes:
+        path (str): The SQLite database path, or ":memory:".
+        client (Optional[RegulationsGovAPI]): The client used to sync. Not needed to query.
+        max_age (Optional[float]): How recent, in seconds, a scope's last completed sync must be
+            for queries to be answered locally. None accepts any completed sync.
+        fts_enabled (bool): Whether this SQLite build has FTS5, so `searchTerm` can be answered locally.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        client: Optional[RegulationsGovAPI] = None,
+        max_age: Optional[float] = 24 * 60 * 60,
+        max_workers: int = 4,
+    ):
+        """
+        Opens (or creates) the mirror database.
+
+        Args:
+            path (str): The SQLite database path. Defaults to an in-memory database.
+            client (Optional[RegulationsGovAPI]): The client used to sync.
+            max_age (Optional[float]): How recent a scope's last sync must be to answer queries, in seconds.
+            max_workers (int): The number of date slices the harvester fetches at the same time.
+        """
+        self.path = path
+        self.client = client
+        self.max_age = max_age
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS records (
+                kind TEXT NOT NULL,
+                id TEXT NOT NULL,
+                object_id TEXT,
+                agency_id TEXT,
+                docket_id TEXT,
+                comment_on_id TEXT,
+                document_type TEXT,
+                subtype TEXT,
+                fr_doc_num TEXT,
+                title TEXT,
+                posted_date TEXT,
+                last_modified_date TEXT,
+                comment_start_date TEXT,
+                comment_end_date TEXT,
+                body TEXT,
+                data TEXT NOT NULL,
+                PRIMARY KEY (kind, id)
+            );
+            CREATE INDEX IF NOT EXISTS records_object_id ON records (object_id);
+            CREATE INDEX IF NOT EXISTS records_agency ON records (kind, agency_id, posted_date);
+            CREATE INDEX IF NOT EXISTS records_docket ON records (kind, docket_id, posted_date);
+            CREATE INDEX IF NOT EXISTS records_comment_on ON records (kind, comment_on_id, posted_date);
+            CREATE INDEX IF NOT EXISTS records_modified ON records (kind, last_modified_date);
+
+            CREATE TABLE IF NOT EXISTS sync_state (
+                kind TEXT NOT NULL,
+                scope TEXT NOT NULL,
+                value TEXT NOT NULL,
+                watermark TEXT,
+                started_at REAL,
+                completed_at REAL,
+                details_at REAL,
+                records INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (kind, scope, value)
+            );
+
+            CREATE TABLE IF NOT EXISTS attachment_texts (
+                kind TEXT NOT NULL,
+                id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                markdown TEXT NOT NULL,
+                PRIMARY KEY (kind, id, url)
+            );
+            """
+        )
+        columns = [row[1] for row in self._connection.execute("PRAGMA table_info(records)")]
+        if "body" not in columns:
+            self._connection.execute("ALTER TABLE records ADD COLUMN body TEXT")
+        columns = [row[1] for row in self._connection.execute("PRAGMA table_info(sync_state)")]
+        if "details_at" not in columns:
+            self._connection.execute("ALTER TABLE sync_state ADD COLUMN details_at REAL")
+
+        try:
+            self._connection.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS records_fts "
+                "USING fts5(title_text, body_text, attachment_text, tokenize = 'porter unicode61')"
+            )
+            self.fts_enabled = True
+        except sqlite3.OperationalError:
+            logger.warning("SQLite was built without FTS5; searchTerm queries will go to the API.")
+            self.fts_enabled = False
+
+
+    ##########################################################################################
+    # Syncing
+    ##########################################################################################
+
+    def sync(self, kind: str, **scope: str) -> int:
+        """
+        Brings one scope up to date, fetching only the records modified since its watermark.
+
+        Args:
+            kind (str): "documents", "comments" or "dockets".
+            **scope: Exactly one filter from `SCOPE_FILTERS[kind]` (e.g., `agencyId="EPA"`).
+
+        Returns:
+            int: The number of records written.
+
+        Raises:
+            ValueError: If the kind or scope is not supported, or no client was given.
+        """
+        scope_name, scope_value = self._check_scope(kind, scope)
+        if self.client is None:
+            raise ValueError("A RegulationsGovAPI client is required to sync the mirror.")
+
+        state = self._sync_state(kind, scope_name, scope_value)
+        start = None
+        if state and state["watermark"]:
+            start = datetime.fromisoformat(state["watermark"]) - WATERMARK_OVERLAP
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO sync_state (kind, scope, value, started_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (kind, scope, value) DO UPDATE SET started_at = excluded.started_at",
+                (kind, scope_name, scope_value, time.time()),
+            )
+        logger.info("Syncing %s for %s=%s from %s", kind, scope_name, scope_value, start or "the beginning")
+
+        harvester = RegulationsGovHarvester(self.client, max_workers=self.max_workers)
+        harvest = {
+            "documents": harvester.harvest_documents,
+            "comments": harvester.harvest_comments,
+            "dockets": harvester.harvest_dockets,
+        }[kind]
+
+        # Comment list records do not say which document they belong to; keep it from the scope
+        extra = {"comment_on_id": scope_value} if scope_name == "commentOnId" else {}
+        written = 0
+        batch = []
+        for record in harvest(start, **{scope_name: scope_value}):
+            batch.append(record)
+            if len(batch) >= SYNC_BATCH_SIZE:
+                written += self._write_batch(kind, scope_name, scope_value, batch, extra)
+                batch = []
+        written += self._write_batch(kind, scope_name, scope_value, batch, extra)
+
+        with self._lock:
+            self._connection.execute(
+                "UPDATE sync_state SET completed_at = ? WHERE kind = ? AND scope = ? AND value = ?",
+                (time.time(), kind, scope_name, scope_value),
+            )
+        logger.info("Synced %s %s for %s=%s", written, kind, scope_name, scope_value)
+        return written
+
+
+    def sync_docket(self, docket_id: str, details: bool = False) -> int:
+        """
+        Mirrors a docket: its details, its documents and the comments on each document.
+
+        Args:
+            docket_id (str): The docket ID (e.g., "EPA-HQ-OAR-2021-0317").
+            details (bool): Whether to also fetch the details (abstracts, comment text) of records
+                that do not have them yet, so they can be found by `searchTerm`.
+
+        Returns:
+            int: The number of records written.
+
+        Raises:
+            ValueError: If the docket_id is not provided or no client was given.
+        """
+        if not docket_id:
+            raise ValueError("The 'docket_id' parameter is required and cannot be empty.")
+        if self.client is None:
+            raise ValueError("A RegulationsGovAPI client is required to sync the mirror.")
+
+        written = 0
+        docket = self.client.get_docket_details(docket_id)
+        if "data" in docket:
+            with self._lock:
+                self._connection.execute("BEGIN")
+                self._upsert("dockets", docket["data"], {})
+                self._connection.execute("COMMIT")
+            written += 1
+
+        written += self.sync("documents", docketId=docket_id)
+        with self._lock:
+            object_ids = [row[0] for row in self._connection.execute(
+                "SELECT object_id FROM records WHERE kind = 'documents' AND docket_id = ? AND object_id IS NOT NULL",
+                (docket_id,),
+            )]
+        for object_id in object_ids:
+            written += self.sync("comments", commentOnId=object_id)
+            if details:
+                self.fill_details("comments", commentOnId=object_id)
+        if details:
+            self.fill_details("documents", docketId=docket_id)
+        return written
+
+
+    def fill_details(self, kind: str, batch_size: int = 50, **scope: str) -> int:
+        """
+        Fetches the details of mirrored records that have no body yet and indexes their text.
+
+        This costs one request per record, so it is a separate step from `sync`. Requests are made
+        in parallel batches with `get_*_details_many`.
+
+        Args:
+            kind (str): "documents", "comments" or "dockets".
+            batch_size (int): The number of records fetched per batch.
+            **scope: Exactly one filter from `SCOPE_FILTERS[kind]`, or `docketId` for dockets.
+
+        Returns:
+            int: The number of records whose details were stored.
+        """
+        if kind == "dockets" and set(scope) == {"docketId"}:
+            scope_name, scope_value = "docketId", scope["docketId"]
+        else:
+            scope_name, scope_value = self._check_scope(kind, scope)
+        if self.client is None:
+            raise ValueError("A RegulationsGovAPI client is required to sync the mirror.")
+
+        fetch_many = {
+            "documents": lambda ids: self.client.get_document_details_many(ids, include_attachments=False),
+            "comments": lambda ids: self.client.get_comment_details_many(ids, include_attachments=False),
+            "dockets": self.client.get_docket_details_many,
+        }[kind]
+        with self._lock:
+            ids = [row[0] for row in self._connection.execute(
+                f"SELECT id FROM records WHERE kind = ? AND {EQUALITY_FILTERS[scope_name]} = ? AND body IS NULL",
+                (kind, scope_value),
+            )]
+
+        started = time.time()
+        stored = 0
+        for offset in range(0, len(ids), batch_size):
+            results = fetch_many(ids[offset:offset + batch_size])
+            with self._lock:
+                self._connection.execute("BEGIN")
+                try:
+                    for result in results:
+                        if "data" in result:
+                            # Keep the list record's scope columns (e.g., comment_on_id)
+                            self._upsert(kind, result["data"], {})
+                            stored += 1
+                except BaseException:
+                    self._connection.execute("ROLLBACK")
+                    raise
+                self._connection.execute("COMMIT")
+        with self._lock:
+            # Records synced while this ran may still lack bodies; they are picked up next time
+            self._connection.execute(
+                "UPDATE sync_state SET details_at = ? WHERE kind = ? AND scope = ? AND value = ?",
+                (started, kind, scope_name, scope_value),
+            )
+        logger.info("Stored details for %s of %s %s", stored, len(ids), kind)
+        return stored
+
+
+    def add_attachment_text(self, kind: str, record_id: str, url: str, markdown: str) -> None:
+        """
+        Indexes the converted text of one attachment so the record can be found by its content.
+
+        Args:
+            kind (str): "documents", "comments" or "dockets".
+            record_id (str): The ID of the record the attachment belongs to.
+            url (str): The attachment's file URL.
+            markdown (str): The attachment converted to markdown.
+        """
+        with self._lock:
+            self._connection.execute("BEGIN")
+            self._connection.execute(
+                "INSERT OR REPLACE INTO attachment_texts (kind, id, url, markdown) VALUES (?, ?, ?, ?)",
+                (kind, record_id, url, markdown),
+            )
+            self._index(kind, record_id)
+            self._connection.execute("COMMIT")
+
+
+    def _check_scope(self, kind: str, scope: Dict[str, str]) -> Tuple[str, str]:
+        """
+        Validates a sync scope and returns it as a (filter name, value) pair.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {list(KINDS)}, not '{kind}'.")
+        if len(scope) != 1 or next(iter(scope)) not in SCOPE_FILTERS[kind] or not next(iter(scope.values())):
+            raise ValueError(f"Syncing {kind} needs exactly one of {list(SCOPE_FILTERS[kind])}.")
+        return next(iter(scope.items()))
+
+
+    def _sync_state(self, kind: str, scope_name: str, scope_value: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns a scope's sync state row, or None if it was never synced.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT watermark, started_at, completed_at, records, details_at FROM sync_state "
+                "WHERE kind = ? AND scope = ? AND value = ?",
+                (kind, scope_name, scope_value),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"watermark": row[0], "started_at": row[1], "completed_at": row[2], "records": row[3], "details_at": row[4]}
+
+
+    def _write_batch(
+        self,
+        kind: str,
+        scope_name: str,
+        scope_value: str,
+        records: List[Dict[str, Any]],
+        extra: Dict[str, Any],
+    ) -> int:
+        """
+        Upserts a batch of records and moves the scope's watermark in the same transaction.
+
+        The records arrive in `lastModifiedDate` order, so everything up to the last one is stored.
+        """
+        if not records:
+            return 0
+        watermark = max(_normalize_date(record.get("attributes", {}).get("lastModifiedDate")) or "" for record in records)
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                for record in records:
+                    self._upsert(kind, record, extra)
+                self._connection.execute(
+                    "UPDATE sync_state SET records = records + ?, "
+                    "watermark = CASE WHEN watermark IS NULL OR watermark < ? THEN ? ELSE watermark END "
+                    "WHERE kind = ? AND scope = ? AND value = ?",
+                    (len(records), watermark, watermark, kind, scope_name, scope_value),
+                )
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+        return len(records)
+
+
+    def _upsert(self, kind: str, record: Dict[str, Any], extra: Dict[str, Any]) -> None:
+        """
+        Inserts or replaces one record. Must be called with the lock held, inside a transaction.
+
+        Columns filled from the sync scope (`extra`) are kept if a later record does not have them.
+        """
+        attributes = record.get("attributes", {})
+        columns = {
+            "kind": kind,
+            "id": record["id"],
+            "object_id": attributes.get("objectId"),
+            "agency_id": attributes.get("agencyId"),
+            "docket_id": record["id"] if kind == "dockets" else attributes.get("docketId"),
+            "comment_on_id": attributes.get("commentOnId"),
+            "document_type": attributes.get("documentType"),
+            "subtype": attributes.get("subtype"),
+            "fr_doc_num": attributes.get("frDocNum"),
+            "title": attributes.get("title"),
+            "posted_date": _normalize_date(attributes.get("postedDate")),
+            "last_modified_date": _normalize_date(attributes.get("lastModifiedDate")),
+            "comment_start_date": _normalize_date(attributes.get("commentStartDate")),
+            "comment_end_date": _normalize_date(attributes.get("commentEndDate")),
+            "body": attributes.get(BODY_ATTRIBUTES[kind]),
+            "data": json.dumps(record, separators=(",", ":")),
+            **extra,
+        }
+        names = ", ".join(columns)
+        updates = ", ".join(
+            f"{name} = COALESCE(excluded.{name}, {name})" for name in columns if name not in ("kind", "id")
+        )
+        self._connection.execute(
+            f"INSERT INTO records ({names}) VALUES ({', '.join('?' for _ in columns)}) "
+            f"ON CONFLICT (kind, id) DO UPDATE SET {updates}",
+            list(columns.values()),
+        )
+        self._index(kind, record["id"])
+
+
+    def _index(self, kind: str, record_id: str) -> None:
+        """
+        Rewrites a record's full-text index entry. Must be called with the lock held.
+        """
+        if not self.fts_enabled:
+            return
+        row = self._connection.execute(
+            "SELECT rowid, title, body FROM records WHERE kind = ? AND id = ?", (kind, record_id)
+        ).fetchone()
+        if row is None:
+            return
+        attachments = "\n\n".join(markdown for (markdown,) in self._connection.execute(
+            "SELECT markdown FROM attachment_texts WHERE kind = ? AND id = ? ORDER BY url", (kind, record_id)
+        ))
+        self._connection.execute("DELETE FROM records_fts WHERE rowid = ?", (row[0],))
+        self._connection.execute(
+            "INSERT INTO records_fts (rowid, title_text, body_text, attachment_text) VALUES (?, ?, ?, ?)",
+            (row[0], row[1] or "", row[2] or "", attachments),
+        )
+
+
+    ##########################################################################################
+    # Querying
+    ##########################################################################################
+
+    def covers(self, kind: str, filters: Dict[str, Any]) -> bool:
+        """
+        Tells whether a list request can be answered from the mirror.
+
+        It can when one of its filters is a scope whose last sync finished (after it last
+        started) within `max_age`, and every other filter is one the mirror can apply to the
+        records of that scope. Filters on columns that list records do not fill (see
+        `LIST_FILTERS`) are only covered by a sync scoped to that filter, and a `searchTerm` only
+        by a scope whose details were filled after its last sync, as list records have no bodies.
+
+        Args:
+            kind (str): "documents", "comments" or "dockets".
+            filters (Dict[str, Any]): The request's filters (None values are ignored).
+
+        Returns:
+            bool: True if `query` would return the same records as the API.
+        """
+        filters = {name: value for name, value in filters.items() if value is not None}
+        if kind not in KINDS:
+            return False
+        applicable = LIST_FILTERS[kind] if self.fts_enabled else LIST_FILTERS[kind] - {"searchTerm"}
+
+        for scope_name in SCOPE_FILTERS[kind]:
+            if scope_name not in filters:
+                continue
+            if any(name not in applicable for name in filters if name != scope_name):
+                continue
+            state = self._sync_state(kind, scope_name, str(filters[scope_name]))
+            if not state or not state["completed_at"] or state["completed_at"] < (state["started_at"] or 0):
+                continue  # Never finished, or running (or interrupted) since it last finished
+            if "searchTerm" in filters and (state["details_at"] or 0) < state["completed_at"]:
+                continue  # Only titles are indexed for this scope
+            if self.max_age is None or time.time() - state["completed_at"] <= self.max_age:
+                return True
+        return False
+
+
+    def query(
+        self,
+        kind: str,
+        filters: Dict[str, Any],
+        sort: Optional[str] = None,
+        page_number: int = 1,
+        page_size: int = 25,
+    ) -> Dict[str, Any]:
+        """
+        Runs a list request against the mirror.
+
+        With a `searchTerm`, records must match every word of it in their title, body or attachment
+        text. They are ranked by relevance unless a sort is given, and each one gets a
+        `highlightedContent` snippet.
+
+        Args:
+            kind (str): "documents", "comments" or "dockets".
+            filters (Dict[str, Any]): The same filters the tools accept (None values are ignored).
+            sort (Optional[str]): A sort field, prefixed with "-" for descending order.
+            page_number (int): The page number to return.
+            page_size (int): The number of records per page.
+
+        Returns:
+            Dict[str, Any]: `data` (the records, as the API returned them) and `meta` (the paging
+            fields of `FindAllResponseMetadata`).
+        """
+        search_term = filters.get("searchTerm")
+        where, params = self._where(kind, filters)
+        limit = [page_size, (page_number - 1) * page_size]
+
+        if not search_term:
+            order = self._order_by(sort or DEFAULT_SORTS[kind])
+            with self._lock:
+                total = self._connection.execute(f"SELECT COUNT(*) FROM records WHERE {where}", params).fetchone()[0]
+                rows = self._connection.execute(
+                    f"SELECT data, NULL FROM records WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?", params + limit
+                ).fetchall()
+        else:
+            match = _match_expression(str(search_term))
+            if not match:
+                return {"data": [], "meta": self._meta(0, 0, page_number, page_size)}
+            rank = f"bm25(records_fts, {', '.join(str(weight) for weight in FTS_WEIGHTS)})"
+            order = self._order_by(sort) if sort else f"{rank}, records.id ASC"
+            snippet = f"snippet(records_fts, -1, '{SNIPPET_MARKERS[0]}', '{SNIPPET_MARKERS[1]}', '...', {SNIPPET_TOKENS})"
+            # CROSS JOIN makes SQLite start from the full-text matches instead of scanning the records
+            source = f"records_fts CROSS JOIN records ON records.rowid = records_fts.rowid WHERE records_fts MATCH ? AND {where}"
+            with self._lock:
+                total = self._connection.execute(f"SELECT COUNT(*) FROM {source}", [match] + params).fetchone()[0]
+                rows = self._connection.execute(
+                    f"SELECT data, {snippet} FROM {source} ORDER BY {order} LIMIT ? OFFSET ?", [match] + params + limit
+                ).fetchall()
+
+        records = []
+        for data, highlight in rows:
+            record = json.loads(data)
+            if highlight is not None:
+                record.setdefault("attributes", {})["highlightedContent"] = highlight
+            records.append(record)
+        return {"data": records, "meta": self._meta(total, len(records), page_number, page_size)}
+
+
+    def _where(self, kind: str, filters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """
+        Builds the WHERE clause and parameters for a set of tool filters.
+        """
+        clauses, params = ["records.kind = ?"], [kind]
+        for name, value in filters.items():
+            if value is None:
+                continue
+            if name in EQUALITY_FILTERS:
+                clauses.append(f"{EQUALITY_FILTERS[name]} = ?")
+                params.append(str(value))
+            elif name in DATE_FILTERS:
+                column, operator = DATE_FILTERS[name]
+                value = str(value).strip()
+                if operator == "=" or len(value) == 10:
+                    # A bare date compares against the date part only
+                    clauses.append(f"substr({column}, 1, {len(value)}) {operator} ?")
+                else:
+                    clauses.append(f"{column} {operator} ?")
+                params.append(value)
+            elif name == "withinCommentPeriod" and value:
+                # Like the request builder, a false value means no filter, not "closed"
+                now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+                clauses.append("(comment_end_date >= ? AND COALESCE(comment_start_date, '') <= ?)")
+                params.extend([now, now])
+        return " AND ".join(clauses), params
+
+
+    def _order_by(self, sort: str) -> str:
+        """
+        Builds the ORDER BY clause for a comma-separated API sort (e.g., "-postedDate,title").
+        """
+        terms = []
+        for field in sort.split(","):
+            field = field.strip()
+            column = SORT_COLUMNS.get(field.lstrip("-"))
+            if column:
+                terms.append(f"{column} {'DESC' if field.startswith('-') else 'ASC'}")
+        terms.append("records.id ASC")
+        return ", ".join(terms)
+
+
+    def _meta(self, total: int, count: int, page_number: int, page_size: int) -> Dict[str, Any]:
+        """
+        Builds the paging metadata of a list response.
+        """
+        total_pages = math.ceil(total / page_size) if page_size else 0
+        return {
+            "hasNextPage": page_number < total_pages,
+            "hasPreviousPage": page_number > 1,
+            "numberOfElements": count,
+            "pageNumber": page_number,
+            "pageSize": page_size,
+            "totalElements": total,
+            "totalPages": total_pages,
+            "firstPage": page_number == 1,
+            "lastPage": page_number >= total_pages,
+        }
+
+
+    def sync_status(self) -> List[Dict[str, Any]]:
+        """
+        Reports every sync scope and how far it has got.
+
+        Returns:
+            List[Dict[str, Any]]: kind, scope, value, watermark, records, started_at, completed_at,
+            details_at (when `fill_details` last started for the scope) and `unfinished` (the last sync was interrupted or is still running).
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT kind, scope, value, watermark, records, started_at, completed_at, details_at FROM sync_state "
+                "ORDER BY kind, scope, value"
+            ).fetchall()
+        return [
+            {
+                "kind": kind,
+                "scope": scope,
+                "value": value,
+                "watermark": watermark,
+                "records": records,
+                "started_at": started_at,
+                "completed_at": completed_at,
+                "details_at": details_at,
+                "unfinished": completed_at is None or (started_at or 0) > completed_at,
+            }
+            for kind, scope, value, watermark, records, started_at, completed_at, details_at in rows
+        ]
+
+
+if __name__ == "__main__":
+    # Sync from the command line (e.g., from cron):
+    #   python rga_mirror.py docket EPA-HQ-OAR-2021-0317
+    #   python rga_mirror.py documents agencyId EPA
+    import argparse
+    from rga_client_instance import rga_client, rga_mirror
+
+    parser = argparse.ArgumentParser(description="Sync the local Regulations.gov mirror (RGA_MIRROR_PATH).")
+    parser.add_argument("kind", choices=["docket", *KINDS])
+    parser.add_argument("args", nargs="+", help="A docket ID, or a scope filter name and value.")
+    parser.add_argument("--details", action="store_true", help="Also fetch details (abstracts, comment text) for full-text search.")
+    arguments = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if rga_mirror is None:
+        raise SystemExit("Set RGA_MIRROR_PATH in .env to enable the mirror.")
+    rga_mirror.client = rga_client
+    if arguments.kind == "docket":
+        rga_mirror.sync_docket(arguments.args[0], details=arguments.details)
+    elif len(arguments.args) == 2:
+        rga_mirror.sync(arguments.kind, **{arguments.args[0]: arguments.args[1]})
+        if arguments.details:
+            rga_mirror.fill_details(arguments.kind, **{arguments.args[0]: arguments.args[1]})
+    else:
+        parser.error("Give a scope filter name and value (e.g., agencyId EPA).")
+    print(json.dumps(rga_mirror.sync_status(), indent=2))
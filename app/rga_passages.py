@@ -0,0 +1,202 @@
+"""
+rga_passages.py
+
+Offline passage retrieval over converted attachments.
+
+Putting a whole converted rule into the context window is slow, expensive and often does not
+fit. Instead, the text is cut into passages of a few paragraphs (each tagged with its page and
+nearest heading), and a BM25 index over them returns the few passages that answer a question.
+Everything is pure Python: no embedding service or network access is needed to build or query
+the index.
+
+`AttachmentReader.passages` caches the passages of each file next to its converted text, and
+`AttachmentReader.search_passages` keeps recently built indexes in memory.
+
+Usage Example:
+
+    passages = chunk_pages([(1, page_1_text), (2, page_2_text)], source="https://.../content.pdf")
+    index = PassageIndex(passages)
+    for hit in index.search("small business exemption", top_k=5):
+        print(hit["score"], hit["page"], hit["text"][:80])
+"""
+
+# Import necessary libraries
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Optional, Dict, Any, List, Tuple, Iterable
+
+
+# Target passage length in characters. A paragraph longer than this is split at sentence ends.
+PASSAGE_CHARS = 1200
+
+# BM25 parameters: term frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Words too common to help ranking
+STOPWORDS = frozenset(
+    """
+    a an and are as at be been but by for from has have if in into is it its of on or such that
+    the their then there these they this to was were which will with would shall may any all
+    """.split()
+)
+
+_HEADING = re.compile(r"^\s{0,3}#{1,6}\s+(.*\S)\s*$")
+_SENTENCE_END = re.compile(r"(?<=[.!?;:])\s+")
+
+
+def _stem(token: str) -> str:
+    """
+    Strips common English suffixes, so "emissions" matches "emission" and "regulated" matches "regulate".
+
+    A plural "es" is only removed after "ss", "x", "ch" and "sh", and a final "s" is kept on
+    words ending in "ss", "us" and "is", so "business" and "businesses" give the same term:
+
+    >>> _stem("business") == _stem("businesses") == "business"
+    True
+    >>> _stem("regulate") == _stem("regulated")
+    True
+    """
+    for suffix in ("ations", "ation", "ings", "ing", "ies", "ed"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 4:
+            token = token[: -len(suffix)] + ("y" if suffix == "ies" else "")
+            break
+    else:
+        if token.endswith(("sses", "xes", "ches", "shes")) and len(token) >= 5:
+            token = token[:-2]
+        elif token.endswith("s") and not token.endswith(("ss", "us", "is")) and len(token) >= 5:
+            token = token[:-1]
+    # A final silent "e" goes too, so "regulate" matches what is left of "regulated"
+    if token.endswith("e") and len(token) > 4:
+        token = token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercases and splits text into stemmed terms, dropping stopwords.
+
+    Args:
+        text (str): The text to tokenize.
+
+    Returns:
+        List[str]: The terms, in order.
+    """
+    return [_stem(token) for token in re.findall(r"[a-z0-9]+", text.lower()) if token not in STOPWORDS]
+
+
+def _split_long(paragraph: str, limit: int) -> List[str]:
+    """
+    Splits a paragraph longer than `limit` at sentence ends (or, failing that, at spaces).
+    """
+    pieces, current = [], ""
+    for sentence in _SENTENCE_END.split(paragraph):
+        while len(sentence) > limit:
+            cut = sentence.rfind(" ", 0, limit)
+            cut = cut if cut > 0 else limit
+            pieces.append((current + " " + sentence[:cut]).strip() if current else sentence[:cut])
+            current, sentence = "", sentence[cut:].strip()
+        if current and len(current) + len(sentence) + 1 > limit:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}".strip()
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_pages(
+    pages: Iterable[Tuple[Optional[int], str]],
+    source: str,
+    passage_chars: int = PASSAGE_CHARS,
+) -> List[Dict[str, Any]]:
+    """
+    Cuts page texts into passages of whole paragraphs, each within one page.
+
+    Args:
+        pages (Iterable[Tuple[Optional[int], str]]): (page number, text) pairs. Use None as the page
+            number for text that has no pages (e.g., a converted Word document).
+        source (str): Identifies the document (e.g., its URL); copied into every passage.
+        passage_chars (int): The target passage length in characters.
+
+    Returns:
+        List[Dict[str, Any]]: Passages with `source`, `page`, `section` (the nearest heading
+        above, if any) and `text`.
+    """
+    passages = []
+    section = None
+    for page, text in pages:
+        current = ""
+        for paragraph in re.split(r"\n\s*\n", text):
+            paragraph = " ".join(paragraph.split())
+            if not paragraph:
+                continue
+            heading = _HEADING.match(paragraph)
+            if heading:
+                if current:
+                    passages.append({"source": source, "page": page, "section": section, "text": current})
+                    current = ""
+                section = heading.group(1)
+            for piece in _split_long(paragraph, passage_chars):
+                if current and len(current) + len(piece) + 1 > passage_chars:
+                    passages.append({"source": source, "page": page, "section": section, "text": current})
+                    current = piece
+                else:
+                    current = f"{current}\n{piece}" if current else piece
+        if current:
+            passages.append({"source": source, "page": page, "section": section, "text": current})
+    return passages
+
+
+class PassageIndex:
+    """
+    An in-memory BM25 index over passages.
+
+    Attributes:
+        passages (List[Dict[str, Any]]): The indexed passages (see `chunk_pages`).
+    """
+
+    def __init__(self, passages: List[Dict[str, Any]]):
+        """
+        Builds the index.
+
+        Args:
+            passages (List[Dict[str, Any]]): The passages to index.
+        """
+        self.passages = passages
+        self._postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self._lengths: List[int] = []
+        for position, passage in enumerate(passages):
+            terms = tokenize(f"{passage.get('section') or ''} {passage['text']}")
+            self._lengths.append(len(terms))
+            for term, count in Counter(terms).items():
+                self._postings[term].append((position, count))
+        self._average_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+
+
+    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Returns the passages that best match a query.
+
+        Args:
+            query (str): The question or keywords.
+            top_k (int): The number of passages to return.
+
+        Returns:
+            List[Dict[str, Any]]: The best passages, highest score first, each with an added `score`.
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        total = len(self.passages)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for position, count in postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[position] / self._average_length)
+                scores[position] += idf * count * (BM25_K1 + 1) / (count + norm)
+
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+        return [{**self.passages[position], "score": round(score, 3)} for position, score in best]
@@ -0,0 +1,370 @@
+"""
+rga_results.py
+
+A per-session store for tool results too large to put in the conversation.
+
+A page of 250 documents, 40 comment details or a long converted attachment can add tens of
+thousands of tokens to the conversation, and every later turn resends them. `ResultStore.offload`
+keeps such a result on the server instead and hands the agent a handle, a one-line summary and
+the first slice. The `read_result` tool then reads further slices, filters or sorts the stored
+result without another API call.
+
+Results are stored as rows: the rows of a compacted list (see rga_compact.py), the entries of a
+batch of details, or sections of about `TEXT_SECTION_CHARS` characters of a text. They expire
+after `ttl` seconds, and the least recently used results are dropped once the store holds more
+than `max_bytes` (or a session holds more than `max_results_per_session` results).
+
+The session comes from Swarm's `context_variables["session_id"]`, which the chat loops set, so
+one user's handles are never visible to another.
+
+Usage Example:
+
+    store = ResultStore(ttl=1800, max_bytes=64 * 1024 * 1024)
+    response = store.offload("session-1", compacted_documents, "get_documents")
+    # -> {"handle": "res-1a2b3c4d", "summary": "...", "columns": [...], "rows": [first rows], ...}
+    page = store.read("session-1", response["handle"], offset=20, limit=20, sort="-posted")
+"""
+
+# Import necessary libraries
+import json
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
+
+
+# Create a module-specific logger
+logger = logging.getLogger(__name__)
+
+# Results whose JSON is longer than this are stored rather than returned whole (~3k tokens)
+DEFAULT_INLINE_CHARS = 12000
+
+# Rows returned with a handle, and by `read` unless the caller asks for another number
+DEFAULT_ROWS = 20
+
+# Text results are stored in sections of about this many characters, cut at line ends
+TEXT_SECTION_CHARS = 2000
+
+# Sections of text returned with a handle, and by `read` unless the caller asks for another number
+DEFAULT_TEXT_SECTIONS = 5
+
+# Session used when a tool is called without `context_variables`
+DEFAULT_SESSION = "default"
+
+
+def session_id(context_variables: Optional[Dict[str, Any]]) -> str:
+    """
+    Returns the session ID of a tool call from its Swarm context variables.
+    """
+    return str((context_variables or {}).get("session_id") or DEFAULT_SESSION)
+
+
+def _split_text(text: str, section_chars: int = TEXT_SECTION_CHARS) -> List[str]:
+    """
+    Cuts text into sections of about `section_chars` characters, at line ends where possible.
+    """
+    sections, current = [], ""
+    for line in text.splitlines(keepends=True):
+        while len(line) > section_chars:
+            if current:
+                sections.append(current)
+                current = ""
+            sections.append(line[:section_chars])
+            line = line[section_chars:]
+        if current and len(current) + len(line) > section_chars:
+            sections.append(current)
+            current = ""
+        current += line
+    if current:
+        sections.append(current)
+    return sections
+
+
+class _StoredResult:
+    """
+    One stored result: its shape, rows and bookkeeping.
+    """
+
+    def __init__(self, kind: str, source: str, rows: List[Any], extra: Dict[str, Any], size: int, expires_at: float):
+        self.kind = kind          # "table", "items" or "text"
+        self.source = source      # The tool that produced the result
+        self.rows = rows
+        self.extra = extra        # e.g., the columns and paging fields of a table
+        self.size = size
+        self.expires_at = expires_at
+
+
+class ResultStore:
+    """
+    A thread-safe, size-bounded store of large tool results, with expiry, per session.
+
+    Attributes:
+        ttl (float): Seconds a result is kept after it was stored or last read.
+        max_bytes (int): The largest total size of the stored results (as JSON).
+        max_results_per_session (int): The most results kept for one session.
+        inline_chars (int): Results whose JSON is at most this long are returned whole.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 30 * 60,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_results_per_session: int = 50,
+        inline_chars: int = DEFAULT_INLINE_CHARS,
+    ):
+        """
+        Initializes the store.
+
+        Args:
+            ttl (float): Seconds a result is kept after it was stored or last read.
+            max_bytes (int): The largest total size of the stored results (as JSON).
+            max_results_per_session (int): The most results kept for one session.
+            inline_chars (int): Results whose JSON is at most this long are returned whole.
+        """
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_results_per_session = max_results_per_session
+        self.inline_chars = inline_chars
+        self._results: "OrderedDict[Tuple[str, str], _StoredResult]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+
+    def offload(self, session: str, result: Any, source: str, inline_chars: Optional[int] = None) -> Any:
+        """
+        Returns a tool result as it is if it is small, or stores it and returns a handle with the first slice.
+
+        Args:
+            session (str): The session ID (see `session_id`).
+            result (Any): A compacted list ({"columns", "rows", ...}), a list of entries, or text.
+            source (str): The name of the tool that produced the result.
+            inline_chars (Optional[int]): Overrides the store's `inline_chars` for this result.
+
+        Returns:
+            Any: The result itself, or (for a table or list) a dict with `handle`, `summary` and the
+            first rows, or (for text) the first sections followed by a note with the handle.
+        """
+        budget = inline_chars or self.inline_chars
+        if isinstance(result, str):
+            if len(result) <= budget:
+                return result
+            sections = _split_text(result)
+            handle = self._put(session, "text", source, sections, {}, len(result))
+            first = sections[:self._fit(sections, len(sections), budget)]
+            shown = sum(len(section) for section in first)
+            return "".join(first) + (
+                f"\n\n*[Showing {shown:,} of {len(result):,} characters (sections 1-{len(first)} of "
+                f"{len(sections)}). The rest is stored as handle `{handle}`: call `read_result` with "
+                f"handle=\"{handle}\" and offset={len(first)} to continue, or with a filter to find text.]*"
+            )
+
+        size = len(json.dumps(result, default=str))
+        if size <= budget:
+            return result
+
+        if isinstance(result, dict) and isinstance(result.get("rows"), list) and "columns" in result:
+            extra = {key: value for key, value in result.items() if key != "rows"}
+            handle = self._put(session, "table", source, result["rows"], extra, size)
+            shown = self._fit(result["rows"], DEFAULT_ROWS, budget)
+            return {
+                "handle": handle,
+                "summary": self._summary(source, len(result["rows"]), "rows", shown),
+                **extra,
+                "rows": result["rows"][:shown],
+            }
+        if isinstance(result, list):
+            handle = self._put(session, "items", source, result, {}, size)
+            shown = self._fit(result, DEFAULT_ROWS, budget)
+            return {
+                "handle": handle,
+                "summary": self._summary(source, len(result), "entries", shown),
+                "items": result[:shown],
+            }
+        return result
+
+
+    def read(
+        self,
+        session: str,
+        handle: str,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        filter: Optional[str] = None,
+        sort: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Reads a slice of a stored result, optionally filtered and sorted.
+
+        Args:
+            session (str): The session ID (see `session_id`).
+            handle (str): The handle returned with the result.
+            offset (int): The first row (or text section) to return, counting from 0, after filtering.
+            limit (Optional[int]): The most rows (or text sections) to return. Defaults to as many
+                as fit in `inline_chars`, up to 20 rows (or 5 sections).
+            filter (Optional[str]): "column=value" keeps rows whose column contains the value;
+                any other text keeps rows (or sections) that contain it anywhere. Case-insensitive.
+            sort (Optional[str]): A column (or entry field) to sort by; prefix "-" for descending.
+
+        Returns:
+            Dict[str, Any]: `handle`, `offset`, `matched` (rows after filtering), `hasMore`, and the
+            `columns` and `rows` of a table, the `items` of a list, or the `text` of a text result.
+
+        Raises:
+            KeyError: If the handle is unknown, expired or belongs to another session.
+            ValueError: If the filter or sort column does not exist.
+        """
+        stored = self._get(session, handle)
+        rows = stored.rows
+        columns = stored.extra.get("columns") or []
+
+        if filter and filter.strip():
+            rows = [row for row in rows if self._matches(stored, columns, row, filter.strip())]
+        if sort and sort.strip() and stored.kind != "text":
+            rows = self._sorted(stored, columns, rows, sort.strip())
+
+        offset = max(int(offset or 0), 0)
+        if limit:
+            limit = max(int(limit), 1)
+        else:
+            limit = self._fit(rows[offset:], DEFAULT_TEXT_SECTIONS if stored.kind == "text" else DEFAULT_ROWS, self.inline_chars)
+        window = rows[offset:offset + limit]
+
+        result = {"handle": handle, "source": stored.source, "offset": offset, "matched": len(rows)}
+        if stored.kind == "table":
+            result.update(columns=columns, rows=window)
+        elif stored.kind == "items":
+            result["items"] = window
+        else:
+            result["text"] = "".join(window)
+        result["hasMore"] = offset + limit < len(rows)
+        return result
+
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Reports how many results are stored, for how many sessions, and their total size.
+        """
+        with self._lock:
+            self._expire(time.time())
+            return {
+                "results": len(self._results),
+                "sessions": len({session for session, _ in self._results}),
+                "bytes": self._total_bytes,
+            }
+
+
+    def _put(self, session: str, kind: str, source: str, rows: List[Any], extra: Dict[str, Any], size: int) -> str:
+        """
+        Stores a result and returns its new handle.
+        """
+        handle = f"res-{secrets.token_hex(4)}"
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            self._results[(session, handle)] = _StoredResult(kind, source, rows, extra, size, now + self.ttl)
+            self._total_bytes += size
+
+            # Keep each session, and the whole store, within bounds (least recently used first)
+            session_keys = [key for key in self._results if key[0] == session]
+            for key in session_keys[:max(len(session_keys) - self.max_results_per_session, 0)]:
+                self._drop(key)
+            while self._total_bytes > self.max_bytes and len(self._results) > 1:
+                self._drop(next(iter(self._results)))
+        logger.info("Stored %s result %s for session %s (%s rows, %s bytes)", source, handle, session, len(rows), size)
+        return handle
+
+
+    def _get(self, session: str, handle: str) -> _StoredResult:
+        """
+        Returns a stored result and extends its expiry.
+        """
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            stored = self._results.get((session, handle.strip()))
+            if stored is None:
+                raise KeyError(f"Result '{handle}' was not found or has expired. Run the original tool again.")
+            stored.expires_at = now + self.ttl
+            self._results.move_to_end((session, handle.strip()))
+            return stored
+
+
+    def _expire(self, now: float) -> None:
+        """
+        Drops expired results. Must be called with the lock held.
+        """
+        for key in [key for key, stored in self._results.items() if stored.expires_at <= now]:
+            self._drop(key)
+
+
+    def _drop(self, key: Tuple[str, str]) -> None:
+        """
+        Removes one result. Must be called with the lock held.
+        """
+        stored = self._results.pop(key)
+        self._total_bytes -= stored.size
+
+
+    def _fit(self, rows: List[Any], most: int, budget: int) -> int:
+        """
+        Returns how many of the first rows (at least one, at most `most`) fit in `budget` characters.
+        """
+        used = 0
+        for count, row in enumerate(rows[:most]):
+            used += len(row) if isinstance(row, str) else len(json.dumps(row, default=str))
+            if used > budget and count > 0:
+                return count
+        return max(min(len(rows), most), 1)
+
+
+    def _summary(self, source: str, count: int, noun: str, shown: int) -> str:
+        """
+        Describes a stored result for the agent.
+        """
+        return (
+            f"The {source} result has {count} {noun}; the first {min(shown, count)} are shown. "
+            f"Call `read_result` with this handle to read more (offset), filter or sort them."
+        )
+
+
+    def _matches(self, stored: _StoredResult, columns: List[str], row: Any, filter: str) -> bool:
+        """
+        Tells whether a row (or text section) passes a "column=value" or free-text filter.
+        """
+        if "=" in filter and stored.kind == "table":
+            column, value = (part.strip() for part in filter.split("=", 1))
+            if column not in columns:
+                raise ValueError(f"Cannot filter on '{column}'. Columns: {', '.join(columns)}.")
+            return value.lower() in str(row[columns.index(column)]).lower()
+        if "=" in filter and stored.kind == "items":
+            column, value = (part.strip() for part in filter.split("=", 1))
+            return isinstance(row, dict) and column in row and value.lower() in str(row[column]).lower()
+        text = row if isinstance(row, str) else json.dumps(row, default=str)
+        return filter.lower() in text.lower()
+
+
+    def _sorted(self, stored: _StoredResult, columns: List[str], rows: List[Any], sort: str) -> List[Any]:
+        """
+        Sorts table rows by a column, or list entries by a field. Numbers sort numerically, and
+        empty values go last.
+        """
+        descending = sort.startswith("-")
+        column = sort.lstrip("-+").strip()
+        if stored.kind == "table":
+            if column not in columns:
+                raise ValueError(f"Cannot sort by '{column}'. Columns: {', '.join(columns)}.")
+            position = columns.index(column)
+            value = lambda row: row[position]
+        else:
+            value = lambda row: row.get(column) if isinstance(row, dict) else None
+
+        def key(row: Any) -> Tuple[bool, Any]:
+            cell = value(row)
+            numeric = isinstance(cell, (int, float))
+            return (not numeric, cell if numeric else str(cell).lower())
+
+        present = [row for row in rows if value(row) is not None]
+        missing = [row for row in rows if value(row) is None]
+        return sorted(present, key=key, reverse=descending) + missing
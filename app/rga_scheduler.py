@@ -0,0 +1,253 @@
+"""
+rga_scheduler.py
+
+A rate-limit-aware request scheduler for the Regulations.gov API (v4).
+
+Regulations.gov API keys are limited to a number of requests per hour. The scheduler keeps a
+token bucket that refills at that rate and is corrected from the `X-RateLimit-Limit` and
+`X-RateLimit-Remaining` headers on every response, so requests are delayed before the limit is
+hit rather than failing once it has been. Responses with status 429, 502, 503 or 504 are
+retried with jittered exponential backoff; a 429 (or a `Retry-After` header) pauses every caller
+sharing the scheduler, not just the one that received it.
+
+Callers have a priority. Interactive chat calls (the default) may use the whole bucket, while
+background work such as bulk harvesting leaves a reserve untouched, so a long harvest never
+starves the chat of requests:
+
+    with request_priority(Priority.BACKGROUND):
+        for comment in harvester.harvest_comments(commentOnId=object_id):
+            ...
+
+The priority is stored in a context variable, so it follows asyncio tasks automatically. Code
+that hands work to other threads must copy the context (see `RegulationsGovAPI._iter_pages`).
+"""
+
+# Import necessary libraries
+import asyncio
+import contextvars
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Optional, Mapping, Iterator
+
+
+# Create a module-specific logger
+logger = logging.getLogger(__name__)
+
+# Status codes that are retried before the response is handed back to the caller. A 500 is
+# returned straight away as the wrappers' "Server error" result, as it always was.
+RETRY_STATUS_CODES = {429, 502, 503, 504}
+
+
+class Priority(IntEnum):
+    """
+    Request priority. Lower values go first.
+    """
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+_current_priority: contextvars.ContextVar = contextvars.ContextVar("rga_request_priority", default=Priority.INTERACTIVE)
+
+
+def current_priority() -> Priority:
+    """
+    Returns the priority of requests made from the current context.
+    """
+    return _current_priority.get()
+
+
+@contextmanager
+def request_priority(priority: Priority) -> Iterator[None]:
+    """
+    Runs the enclosed requests at the given priority.
+
+    Args:
+        priority (Priority): The priority to use inside the `with` block.
+    """
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class RateLimitScheduler:
+    """
+    A thread-safe token bucket shared by every request of a client.
+
+    Attributes:
+        limit_per_hour (int): The number of requests allowed per hour.
+        background_reserve (float): The fraction of the bucket that background requests may not use.
+        max_retries (int): How many times a 429/5xx response is retried.
+        backoff_base (float): The first retry delay in seconds, doubled on every attempt.
+        backoff_max (float): The longest retry delay in seconds.
+    """
+
+    def __init__(
+        self,
+        limit_per_hour: int = 1000,
+        background_reserve: float = 0.2,
+        max_retries: int = 4,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+    ):
+        """
+        Initializes the scheduler with a full bucket.
+
+        Args:
+            limit_per_hour (int): The number of requests allowed per hour. Replaced by the
+                `X-RateLimit-Limit` header once a response has been seen.
+            background_reserve (float): The fraction of the bucket kept for interactive requests.
+            max_retries (int): How many times a 429/5xx response is retried.
+            backoff_base (float): The first retry delay in seconds, doubled on every attempt.
+            backoff_max (float): The longest retry delay in seconds.
+        """
+        self.limit_per_hour = limit_per_hour
+        self.background_reserve = background_reserve
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._tokens = float(limit_per_hour)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+
+    def _refill(self, now: float) -> None:
+        """
+        Adds the tokens earned since the last update. Must be called with the lock held.
+        """
+        rate = self.limit_per_hour / 3600.0
+        self._tokens = min(float(self.limit_per_hour), self._tokens + (now - self._updated_at) * rate)
+        self._updated_at = now
+
+
+    @property
+    def remaining(self) -> float:
+        """
+        The estimated number of requests left in the current window.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+    @property
+    def paused_for(self) -> float:
+        """
+        The number of seconds until the scheduler accepts requests again (0 if it is not paused).
+        """
+        return max(0.0, self._paused_until - time.monotonic())
+
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stops handing out tokens for the given number of seconds.
+
+        Args:
+            seconds (float): How long to pause for.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+    def try_acquire(self, priority: Optional[Priority] = None) -> float:
+        """
+        Takes a token if one is available to the given priority.
+
+        Args:
+            priority (Optional[Priority]): The caller's priority. Defaults to the current context's.
+
+        Returns:
+            float: 0 if a token was taken, otherwise how many seconds to wait before trying again.
+        """
+        if priority is None:
+            priority = current_priority()
+
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+
+            self._refill(now)
+            floor = self.background_reserve * self.limit_per_hour if priority > Priority.INTERACTIVE else 0.0
+            if self._tokens - 1 >= floor:
+                self._tokens -= 1
+                return 0.0
+            return (floor + 1 - self._tokens) * 3600.0 / self.limit_per_hour
+
+
+    def acquire(self, priority: Optional[Priority] = None) -> None:
+        """
+        Blocks the calling thread until a token is available.
+
+        Args:
+            priority (Optional[Priority]): The caller's priority. Defaults to the current context's.
+        """
+        if priority is None:
+            priority = current_priority()
+        while (delay := self.try_acquire(priority)) > 0:
+            logger.debug("Rate limit reached; waiting %.2fs (priority %s)", delay, priority.name)
+            time.sleep(delay)
+
+
+    async def acquire_async(self, priority: Optional[Priority] = None) -> None:
+        """
+        Waits without blocking the event loop until a token is available.
+
+        Args:
+            priority (Optional[Priority]): The caller's priority. Defaults to the current context's.
+        """
+        if priority is None:
+            priority = current_priority()
+        while (delay := self.try_acquire(priority)) > 0:
+            logger.debug("Rate limit reached; waiting %.2fs (priority %s)", delay, priority.name)
+            await asyncio.sleep(delay)
+
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        Corrects the bucket from the rate limit headers of a response.
+
+        Args:
+            headers (Mapping[str, str]): The response headers (case-insensitive).
+        """
+        limit = headers.get("X-RateLimit-Limit")
+        remaining = headers.get("X-RateLimit-Remaining")
+        with self._lock:
+            self._refill(time.monotonic())
+            if limit and limit.isdigit() and int(limit) > 0:
+                self.limit_per_hour = int(limit)
+            if remaining and remaining.isdigit():
+                # The server's count is the truth; it also restores the bucket when the window resets
+                self._tokens = min(float(self.limit_per_hour), float(remaining))
+
+
+    def retry_delay(self, status_code: int, retry_after: Optional[str], attempt: int) -> float:
+        """
+        Works out how long to wait before retrying a failed request.
+
+        A 429 pauses every caller until the delay has passed.
+
+        Args:
+            status_code (int): The status code of the failed response.
+            retry_after (Optional[str]): The `Retry-After` header, if any.
+            attempt (int): The number of retries already made (0 for the first).
+
+        Returns:
+            float: The delay in seconds.
+        """
+        if retry_after and retry_after.isdigit():
+            delay = float(retry_after)
+        else:
+            ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+            delay = ceiling / 2 + random.uniform(0, ceiling / 2)
+
+        if status_code == 429:
+            self.pause(delay)
+        return delay
@@ -23,11 +23,25 @@
 #    - Retrieving details for a single document
 #    - Searching and retrieving dockets
 #    - Retrieving details for a single docket
+#    - Retrieving details for many documents, comments or dockets in one call
 #
-# 2. Graceful error handling:
+# 2. Local mirror:
+#    - The list tools answer from the local mirror (`rga_mirror.py`) when a recent sync
+#      covers the request, so they do not spend the API's rate limit. With FTS5, requests
+#      with a `searchTerm` are answered from its full-text index too.
+#
+# 3. Compact results:
+#    - Responses are projected to a few short-keyed fields, and list results are sent as a
+#      table (`rga_compact.py`), so each tool call adds far fewer tokens to the conversation.
+#
+# 4. Result handles:
+#    - Pages and batches too large for the conversation are kept in a per-session result
+#      store (`rga_results.py`); the agent reads further rows with the `read_result` tool.
+#
+# 5. Graceful error handling:
 #    - Returns user-friendly error messages in case of API failures.
 #
-# 3. Extensible:
+# 6. Extensible:
 #    - New tools can be added easily by following the same pattern.
 #
 # ----------------------------------------
@@ -42,12 +56,33 @@
 #
 ##########################################################################################
 
-from typing import Optional, Any
-from rga_client_instance import rga_client  # Import the shared rga_client instance
+from typing import Optional, Any, List
+from rga_client_instance import rga_client, rga_mirror, result_compactor, result_store  # Shared client, (optional) mirror, compactor and result store
+from rga_results import session_id
 import json
 from markitdown import MarkItDown
 
 
+##########################################################################################
+# Helper: _split_ids
+#
+# The batch tools take their IDs as one comma-separated string, which every model can
+# fill in reliably, rather than as a JSON array.
+##########################################################################################
+
+def _split_ids(ids: str, parameter: str) -> List[str]:
+    """
+    Splits a comma-separated list of IDs, dropping blanks.
+
+    Raises:
+        ValueError: If no ID is provided.
+    """
+    id_list = [resource_id.strip() for resource_id in str(ids or "").split(",") if resource_id.strip()]
+    if not id_list:
+        raise ValueError(f"The '{parameter}' parameter is required and must list at least one ID.")
+    return id_list
+
+
 ##########################################################################################
 # Tool: get_documents
 #
@@ -74,6 +109,7 @@ def get_documents(
     sort: Optional[str] = None,
     pageNumber: Optional[int] = 1,
     pageSize: Optional[int] = 5,
+    context_variables: Optional[dict] = None,
 ) -> Any:
     """
     Tool: `get_documents`
@@ -90,7 +126,9 @@ def get_documents(
     in `docs/tools/get_documents.md`.
 
     Returns:
-        Any: The JSON response from the API.
+        Any: The JSON response from the API, compacted by `result_compactor` (see `rga_compact.py`).
+        A page too large for the conversation is kept in `result_store` (see `rga_results.py`),
+        and the first rows are returned with a handle for the `read_result` tool.
     """
 
     # Convert pageNumber and pageSize to integers
@@ -116,7 +154,7 @@ def get_documents(
         if sort not in ['documentId', '-documentId', 'title', '-title', 'postedDate', '-postedDate', 'lastModifiedDate', '-lastModifiedDate','commentEndDate', '-commentEndDate']:
             sort = '-postedDate'
 
-    return rga_client.get_documents(
+    filters = dict(
         agencyId=agencyId,
         commentEndDate=commentEndDate,
         docketId=docketId,
@@ -131,11 +169,18 @@ def get_documents(
         lastModifiedDateLe=lastModifiedDateLe,
         subtype=subtype,
         withinCommentPeriod=withinCommentPeriod,
-        sort=sort,
-        pageNumber=pageNumber,
-        pageSize=pageSize,
     )
 
+    # Answer from the local mirror when a recent sync covers the request
+    if rga_mirror is not None and rga_mirror.covers("documents", filters):
+        response = rga_mirror.query("documents", filters, sort, pageNumber, pageSize)
+    else:
+        response = rga_client.get_documents(**filters, sort=sort, pageNumber=pageNumber, pageSize=pageSize)
+
+    # Large pages stay on the server; the agent gets a handle and the first rows
+    compact = result_compactor.compact_list("documents", response)
+    return result_store.offload(session_id(context_variables), compact, "get_documents")
+
 ##########################################################################################
 # Tool: get_document_details
 ##########################################################################################
@@ -148,9 +193,40 @@ def get_document_details(document_id: str, include_attachments: Optional[bool] =
     refer to the documentation in `docs/tools/get_document_details.md`.
 
     Returns:
-        Any: The JSON response from the API.
+        Any: The JSON response from the API, compacted by `result_compactor` (see `rga_compact.py`).
     """
-    return rga_client.get_document_details(document_id, include_attachments)
+    response = rga_client.get_document_details(document_id, include_attachments)
+    return result_compactor.compact_details("documents", response)
+
+##########################################################################################
+# Tool: get_document_details_many
+#
+# Fetches several documents in parallel, so a batch takes about as long as one lookup.
+##########################################################################################
+
+def get_document_details_many(
+    document_ids: str,
+    include_attachments: Optional[bool] = True,
+    context_variables: Optional[dict] = None,
+) -> Any:
+    """
+    Tool: `get_document_details_many`
+
+    Retrieves detailed information for several documents at once.
+
+    Args:
+        document_ids (str): Comma-separated document IDs (e.g., "EPA-HQ-OAR-2021-0317-0001,EPA-HQ-OAR-2021-0317-0002").
+        include_attachments (Optional[bool]): Whether to include attachment information.
+        context_variables (Optional[dict]): Set by Swarm; its `session_id` scopes stored results.
+
+    Returns:
+        Any: A list with one entry per ID, in the order given. Each entry holds the ID and either
+        the compacted JSON response from the API or an error for that ID only. A batch too large
+        for the conversation is returned as a handle with the first entries (see `read_result`).
+    """
+    results = rga_client.get_document_details_many(_split_ids(document_ids, "document_ids"), include_attachments)
+    results = result_compactor.compact_details_many("documents", results)
+    return result_store.offload(session_id(context_variables), results, "get_document_details_many")
 
 ##########################################################################################
 # Tool: get_comments
@@ -173,6 +249,7 @@ def get_comments(
     sort: Optional[str] = None,
     pageNumber: Optional[int] = 1,
     pageSize: Optional[int] = 5,
+    context_variables: Optional[dict] = None,
 ) -> Any:
     """
     Tool: `get_comments`
@@ -184,7 +261,9 @@ def get_comments(
     in `docs/tools/get_comments.md`.
 
     Returns:
-        Any: The JSON response from the API.
+        Any: The JSON response from the API, compacted by `result_compactor` (see `rga_compact.py`).
+        A page too large for the conversation is kept in `result_store` (see `rga_results.py`),
+        and the first rows are returned with a handle for the `read_result` tool.
     """
     # Convert pageNumber and pageSize to integers
     try:
@@ -206,7 +285,7 @@ def get_comments(
         if sort not in ['postedDate', '-postedDate', 'lastModifiedDate', '-lastModifiedDate']:
             sort = '-postedDate'
 
-    return rga_client.get_comments(
+    filters = dict(
         agencyId=agencyId,
         searchTerm=searchTerm,
         postedDate=postedDate,
@@ -216,11 +295,18 @@ def get_comments(
         lastModifiedDateGe=lastModifiedDateGe,
         lastModifiedDateLe=lastModifiedDateLe,
         commentOnId=commentOnId,
-        sort=sort,
-        pageNumber=pageNumber,
-        pageSize=pageSize,
     )
 
+    # Answer from the local mirror when a recent sync covers the request
+    if rga_mirror is not None and rga_mirror.covers("comments", filters):
+        response = rga_mirror.query("comments", filters, sort, pageNumber, pageSize)
+    else:
+        response = rga_client.get_comments(**filters, sort=sort, pageNumber=pageNumber, pageSize=pageSize)
+
+    # Large pages stay on the server; the agent gets a handle and the first rows
+    compact = result_compactor.compact_list("comments", response)
+    return result_store.offload(session_id(context_variables), compact, "get_comments")
+
 
 ##########################################################################################
 # Tool: get_comment_details
@@ -242,15 +328,47 @@ def get_comment_details(
     in `docs/tools/get_comment_details.md`.
 
     Returns:
-        Any: The JSON response from the API.
+        Any: The JSON response from the API, compacted by `result_compactor` (see `rga_compact.py`).
     """
     if not comment_id:
         raise ValueError("The 'comment_id' parameter is required and cannot be empty.")
 
-    return rga_client.get_comment_details(
+    response = rga_client.get_comment_details(
         comment_id=comment_id,
         include_attachments=include_attachments,
     )
+    return result_compactor.compact_details("comments", response)
+
+
+##########################################################################################
+# Tool: get_comment_details_many
+#
+# Fetches several comments in parallel, so a batch takes about as long as one lookup.
+##########################################################################################
+
+def get_comment_details_many(
+    comment_ids: str,
+    include_attachments: Optional[bool] = False,
+    context_variables: Optional[dict] = None,
+) -> Any:
+    """
+    Tool: `get_comment_details_many`
+
+    Retrieves detailed information for several comments at once.
+
+    Args:
+        comment_ids (str): Comma-separated comment IDs (e.g., "EPA-HQ-OAR-2021-0317-0105,EPA-HQ-OAR-2021-0317-0106").
+        include_attachments (Optional[bool]): Whether to include attachment information.
+        context_variables (Optional[dict]): Set by Swarm; its `session_id` scopes stored results.
+
+    Returns:
+        Any: A list with one entry per ID, in the order given. Each entry holds the ID and either
+        the compacted JSON response from the API or an error for that ID only. A batch too large
+        for the conversation is returned as a handle with the first entries (see `read_result`).
+    """
+    results = rga_client.get_comment_details_many(_split_ids(comment_ids, "comment_ids"), include_attachments)
+    results = result_compactor.compact_details_many("comments", results)
+    return result_store.offload(session_id(context_variables), results, "get_comment_details_many")
 
 ##########################################################################################
 # Tool: get_dockets
@@ -265,6 +383,7 @@ def get_dockets(
     sort: Optional[str] = None,
     pageNumber: Optional[int] = 1,
     pageSize: Optional[int] = 5,
+    context_variables: Optional[dict] = None,
 ) -> Any:
     """
     Tool: `get_dockets`
@@ -276,7 +395,9 @@ def get_dockets(
     in `docs/tools/get_dockets.md`.
 
     Returns:
-        Any: The JSON response from the API.
+        Any: The JSON response from the API, compacted by `result_compactor` (see `rga_compact.py`).
+        A page too large for the conversation is kept in `result_store` (see `rga_results.py`),
+        and the first rows are returned with a handle for the `read_result` tool.
     """
     # Convert pageNumber and pageSize to integers
     try:
@@ -298,17 +419,24 @@ def get_dockets(
         if sort not in ['docketId', '-docketId', 'title', '-title', 'lastModifiedDate', '-lastModifiedDate']:
             sort = '-lastModifiedDate'
 
-    return rga_client.get_dockets(
+    filters = dict(
         agencyId=agencyId,
         searchTerm=searchTerm,
         lastModifiedDate=lastModifiedDate,
         lastModifiedDateGe=lastModifiedDateGe,
         lastModifiedDateLe=lastModifiedDateLe,
-        sort=sort,
-        pageNumber=pageNumber,
-        pageSize=pageSize,
     )
 
+    # Answer from the local mirror when a recent sync covers the request
+    if rga_mirror is not None and rga_mirror.covers("dockets", filters):
+        response = rga_mirror.query("dockets", filters, sort, pageNumber, pageSize)
+    else:
+        response = rga_client.get_dockets(**filters, sort=sort, pageNumber=pageNumber, pageSize=pageSize)
+
+    # Large pages stay on the server; the agent gets a handle and the first rows
+    compact = result_compactor.compact_list("dockets", response)
+    return result_store.offload(session_id(context_variables), compact, "get_dockets")
+
 
 ##########################################################################################
 # Tool: get_docket_details
@@ -324,9 +452,36 @@ def get_docket_details(docketId: str) -> Any:
     refer to the documentation in `docs/tools/get_docket_details.md`.
 
     Returns:
-        Any: The JSON response from the API.
+        Any: The JSON response from the API, compacted by `result_compactor` (see `rga_compact.py`).
     """
     if not docketId:
         raise ValueError("The 'docketId' parameter is required and cannot be empty.")
 
-    return rga_client.get_docket_details(docketId)
+    response = rga_client.get_docket_details(docketId)
+    return result_compactor.compact_details("dockets", response)
+
+
+##########################################################################################
+# Tool: get_docket_details_many
+#
+# Fetches several dockets in parallel, so a batch takes about as long as one lookup.
+##########################################################################################
+
+def get_docket_details_many(docketIds: str, context_variables: Optional[dict] = None) -> Any:
+    """
+    Tool: `get_docket_details_many`
+
+    Retrieves detailed information for several dockets at once.
+
+    Args:
+        docketIds (str): Comma-separated docket IDs (e.g., "EPA-HQ-OAR-2021-0317,EPA-HQ-OAR-2003-0129").
+        context_variables (Optional[dict]): Set by Swarm; its `session_id` scopes stored results.
+
+    Returns:
+        Any: A list with one entry per ID, in the order given. Each entry holds the ID and either
+        the compacted JSON response from the API or an error for that ID only. A batch too large
+        for the conversation is returned as a handle with the first entries (see `read_result`).
+    """
+    results = rga_client.get_docket_details_many(_split_ids(docketIds, "docketIds"))
+    results = result_compactor.compact_details_many("dockets", results)
+    return result_store.offload(session_id(context_variables), results, "get_docket_details_many")
@@ -2,51 +2,118 @@
 rga_wrapper.py
 
 A Python wrapper for the Regulations.gov API (v4). This wrapper provides methods to interact with the API endpoints
-for documents, comments, and dockets. It includes robust error handling, logging, and clear documentation for 
+for documents, comments, and dockets. It includes robust error handling, logging, and clear documentation for
 ease of use by developers of all levels.
+
+The request building and response handling live in `RegulationsGovBase` so that the blocking
+`RegulationsGovAPI` client and the asyncio client in `rga_async_wrapper.py` behave identically.
+Every request is paced by an `ApiKeyPool` (see `rga_key_pool.py` and `rga_scheduler.py`), which
+picks the API key with the most quota left and retries 429 and 5xx responses. An optional
+`ResponseCache` (see `rga_cache.py`) answers repeated requests without going to the network, and
+identical requests that are in flight at the same time share one network call (see `rga_coalesce.py`).
 """
 
 # Import necessary libraries
+import contextvars
 import logging
+import threading
+import time
 import requests
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, Any, List, Tuple, Union, Callable, Iterator, Sequence
+
+from rga_cache import ResponseCache, make_cache_key
+from rga_coalesce import SingleFlight
+from rga_key_pool import ApiKeyPool
+from rga_scheduler import RETRY_STATUS_CODES
 
 
 # Create a module-specific logger
 logger = logging.getLogger(__name__)
 
-class RegulationsGovAPI:
+# Default (connect, read) timeouts in seconds. Without a timeout a single hung request
+# would block the chat turn that issued it indefinitely.
+DEFAULT_TIMEOUT = (5.0, 30.0)
+
+# Paging limits of the findAll endpoints (see `FindAllResponseMetadata` in rga_types.py)
+MAX_PAGE_SIZE = 250
+MAX_PAGE_NUMBER = 20
+
+
+class RegulationsGovBase:
     """
-    A wrapper for the Regulations.gov API (v4).
+    Transport-independent base for the Regulations.gov API (v4) clients.
+
+    Builds the URL and query parameters for every endpoint and interprets the HTTP responses.
+    Subclasses only decide how the request is sent.
 
     Attributes:
-        api_key (str): The API key for authenticating requests.
+        api_key (str): The first API key of the pool.
         base_url (str): The base URL for the Regulations.gov API.
+        timeout (Union[float, Tuple[float, float]]): A single timeout or a (connect, read) pair in seconds.
+        key_pool (ApiKeyPool): Picks the key for each request, paces requests against each key's
+            hourly limit and decides how 429/5xx responses are retried.
+        cache (Optional[ResponseCache]): The response cache, or None to always go to the network.
     """
 
-    def __init__(self, api_key: str, base_url: str = "https://api.regulations.gov/v4"):
+    def __init__(
+        self,
+        api_key: Union[str, Sequence[str]],
+        base_url: str = "https://api.regulations.gov/v4",
+        timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+        key_pool: Optional[ApiKeyPool] = None,
+        cache: Optional[ResponseCache] = None,
+    ):
         """
-        Initializes the RegulationsGovAPI instance.
+        Initializes the shared client state.
 
         Args:
-            api_key (str): The API key for authenticating requests.
+            api_key (Union[str, Sequence[str]]): The API key, or several keys to spread requests across.
             base_url (str): The base URL for the Regulations.gov API. Defaults to the production endpoint.
+            timeout (Union[float, Tuple[float, float]]): A single timeout or a (connect, read) pair in seconds.
+            key_pool (Optional[ApiKeyPool]): The pool to take keys from. Pass the same instance to several
+                clients so they share one budget; `api_key` is then ignored. Defaults to a new pool of
+                the given key(s).
+            cache (Optional[ResponseCache]): A response cache to read from and write to. Defaults to none.
         """
-        self.api_key = api_key
+        if key_pool is None:
+            key_pool = ApiKeyPool([api_key] if isinstance(api_key, str) else api_key)
+        self.key_pool = key_pool
+        self.api_key = key_pool.api_keys[0]
         self.base_url = base_url
+        self.timeout = timeout
+        self.cache = cache
         self.headers = {
             "X-Api-Key": self.api_key,
-            "Content-Type": "application/vnd.api+json"
+            "Content-Type": "application/vnd.api+json",
+            "Accept-Encoding": "gzip, deflate",
         }
-        logger.info("RegulationsGovAPI initialized with base URL: %s", self.base_url)
 
 
-    def _handle_response(self, response: requests.Response) -> Any:
+    def _headers_for(self, api_key: str) -> Dict[str, str]:
+        """
+        Returns the request headers authenticated with the given key.
+        """
+        return {**self.headers, "X-Api-Key": api_key}
+
+
+    def key_usage(self) -> List[Dict[str, Any]]:
+        """
+        Reports per-key usage (requests sent, 429s received, estimated remaining quota).
+
+        Returns:
+            List[Dict[str, Any]]: One entry per API key, masked to its last four characters.
+        """
+        return self.key_pool.usage()
+
+
+    def _handle_response(self, response: Any) -> Any:
         """
         Handles the HTTP response, checking for errors and returning the JSON data if successful.
 
         Args:
-            response (requests.Response): The HTTP response object.
+            response (Any): The HTTP response object (`requests.Response` or `httpx.Response`).
 
         Returns:
             Any: The JSON data from the response or error details.
@@ -55,27 +122,63 @@ class RegulationsGovAPI:
             - For HTTP errors (e.g., 404, 500), this method returns a dictionary with error details
               instead of raising exceptions. This design choice ensures that the calling code can
               handle errors gracefully without needing to catch exceptions.
+            - Any other HTTP error is raised by the response's own `raise_for_status()`.
         """
-        try:
+        if response.status_code == 404:
+            logger.warning("Resource not found: %s", response.url)
+            return {"error": "Resource not found", "status_code": 404}
+        elif response.status_code == 500:
+            logger.error("Server error: %s", response.url)
+            return {"error": "Server error", "status_code": 500}
+        elif response.status_code >= 400:
+            logger.error("HTTP error occurred: %s - %s", response.status_code, response.text)
             response.raise_for_status()
-            logger.debug("Request successful: %s", response.url)
-            return response.json()
-        except requests.exceptions.HTTPError as http_err:
-            if response.status_code == 404:
-                logger.warning("Resource not found: %s", response.url)
-                return {"error": "Resource not found", "status_code": 404}
-            elif response.status_code == 500:
-                logger.error("Server error: %s", response.url)
-                return {"error": "Server error", "status_code": 500}
-            else:
-                logger.error("HTTP error occurred: %s - %s", response.status_code, response.text)
-                raise http_err
+
+        try:
+            data = response.json()
         except Exception as err:
             logger.exception("An unexpected error occurred: %s", err)
             raise err
 
+        logger.debug("Request successful: %s", response.url)
+        return data
 
-    def get_documents(
+
+    def _cache_lookup(self, key: str) -> Tuple[bool, Any]:
+        """
+        Looks a request up in the response cache.
+
+        Args:
+            key (str): The request key built by `make_cache_key`.
+
+        Returns:
+            Tuple[bool, Any]: Whether it was a hit, and the cached response.
+        """
+        if self.cache is None:
+            return False, None
+        return self.cache.get(key)
+
+
+    def _cache_store(self, key: str, url: str, data: Any) -> None:
+        """
+        Stores a handled response in the cache under the TTL of its kind.
+
+        404 dictionaries are cached as "not_found"; server errors are never cached. Requests for a
+        single resource (`/documents/{id}`, ...) are "details" and everything else is a "list".
+        """
+        if self.cache is None:
+            return
+        if isinstance(data, dict) and "error" in data:
+            if data.get("status_code") != 404:
+                return
+            kind = "not_found"
+        else:
+            path = url[len(self.base_url):].strip("/")
+            kind = "details" if "/" in path else "list"
+        self.cache.set(key, data, kind)
+
+
+    def _documents_request(
         self,
         agencyId: Optional[str] = None,
         commentEndDate: Optional[str] = None,
@@ -94,17 +197,12 @@ class RegulationsGovAPI:
         sort: Optional[str] = None,
         pageNumber: Optional[int] = 1,
         pageSize: Optional[int] = 5,
-    ) -> Any:
+    ) -> Tuple[str, Dict[str, Any]]:
         """
-        Retrieves a list of documents based on the provided filters.
-
-        For detailed information about the input parameters and usage examples
-        refer to https://open.gsa.gov/api/regulationsgov/.
-
-        The instructions for the documents agent are in the instructions folder.
+        Builds the URL and query parameters for the documents endpoint.
 
         Returns:
-            Any: The JSON response from the API.
+            Tuple[str, Dict[str, Any]]: The request URL and its query parameters.
         """
         url = f"{self.base_url}/documents"
         params = {}
@@ -140,19 +238,549 @@ class RegulationsGovAPI:
             params["filter[withinCommentPeriod]"] = str(withinCommentPeriod).lower()
         if sort:
             params["sort"] = sort
-            
+
         # Add pagination parameters
         params["page[number]"] = pageNumber
         params["page[size]"] = pageSize
 
-        logger.info("Fetching documents with parameters: %s", params)
-        response = requests.get(url, headers=self.headers, params=params)
+        return url, params
+
+
+    def _document_details_request(
+        self,
+        document_id: str,
+        include_attachments: Optional[bool] = True,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Builds the URL and query parameters for the document details endpoint.
+
+        Returns:
+            Tuple[str, Dict[str, Any]]: The request URL and its query parameters.
+
+        Raises:
+            ValueError: If the document_id is not provided or is empty.
+        """
+        if not document_id:
+            raise ValueError("The 'document_id' parameter is required and cannot be empty.")
+
+        # Construct the URL for the document details endpoint
+        url = f"{self.base_url}/documents/{document_id}"
+
+        # Query parameters
+        params = {}
+        if include_attachments:
+            params["include"] = "attachments"
+
+        return url, params
+
+
+    def _comments_request(
+        self,
+        agencyId: Optional[str] = None,
+        searchTerm: Optional[str] = None,
+        postedDate: Optional[str] = None,
+        postedDateGe: Optional[str] = None,
+        postedDateLe: Optional[str] = None,
+        lastModifiedDate: Optional[str] = None,
+        lastModifiedDateGe: Optional[str] = None,
+        lastModifiedDateLe: Optional[str] = None,
+        commentOnId: Optional[str] = None,
+        sort: Optional[str] = None,
+        pageNumber: Optional[int] = 1,
+        pageSize: Optional[int] = 5,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Builds the URL and query parameters for the comments endpoint.
+
+        Returns:
+            Tuple[str, Dict[str, Any]]: The request URL and its query parameters.
+        """
+        # Construct the URL for the comments endpoint
+        url = f"{self.base_url}/comments"
+
+        # Query parameters
+        params = {}
+        if agencyId:
+            params["filter[agencyId]"] = agencyId
+        if searchTerm:
+            params["filter[searchTerm]"] = searchTerm
+        if postedDate:
+            params["filter[postedDate]"] = postedDate
+        if postedDateGe:
+            params["filter[postedDate][ge]"] = postedDateGe
+        if postedDateLe:
+            params["filter[postedDate][le]"] = postedDateLe
+        if lastModifiedDate:
+            params["filter[lastModifiedDate]"] = lastModifiedDate
+        if lastModifiedDateGe:
+            params["filter[lastModifiedDate][ge]"] = lastModifiedDateGe
+        if lastModifiedDateLe:
+            params["filter[lastModifiedDate][le]"] = lastModifiedDateLe
+        if commentOnId:
+            params["filter[commentOnId]"] = commentOnId
+        if sort:
+            params["sort"] = sort
+        if pageNumber:
+            params["page[number]"] = pageNumber
+        if pageSize:
+            params["page[size]"] = pageSize
+
+        return url, params
 
 
-        # Handle the response
+    def _comment_details_request(
+        self,
+        comment_id: str,
+        include_attachments: Optional[bool] = True,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Builds the URL and query parameters for the comment details endpoint.
+
+        Returns:
+            Tuple[str, Dict[str, Any]]: The request URL and its query parameters.
+
+        Raises:
+            ValueError: If the comment_id is not provided or is empty.
+        """
+        if not comment_id:
+            raise ValueError("The 'comment_id' parameter is required and cannot be empty.")
+
+        # Construct the URL for the comment details endpoint
+        url = f"{self.base_url}/comments/{comment_id}"
+
+        # Query parameters
+        params = {}
+        if include_attachments:
+            params["include"] = "attachments"
+
+        return url, params
+
+
+    def _dockets_request(
+        self,
+        agencyId: Optional[str] = None,
+        searchTerm: Optional[str] = None,
+        lastModifiedDate: Optional[str] = None,
+        lastModifiedDateGe: Optional[str] = None,
+        lastModifiedDateLe: Optional[str] = None,
+        sort: Optional[str] = None,
+        pageNumber: Optional[int] = None,
+        pageSize: Optional[int] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Builds the URL and query parameters for the dockets endpoint.
+
+        Returns:
+            Tuple[str, Dict[str, Any]]: The request URL and its query parameters.
+        """
+        url = f"{self.base_url}/dockets"
+        params = {}
+
+        # Map arguments to API parameters
+        if agencyId:
+            params["filter[agencyId]"] = agencyId
+        if searchTerm:
+            params["filter[searchTerm]"] = searchTerm
+        if lastModifiedDate:
+            params["filter[lastModifiedDate]"] = lastModifiedDate
+        if lastModifiedDateGe:
+            params["filter[lastModifiedDate][ge]"] = lastModifiedDateGe
+        if lastModifiedDateLe:
+            params["filter[lastModifiedDate][le]"] = lastModifiedDateLe
+        if sort:
+            params["sort"] = sort
+        if pageNumber:
+            params["page[number]"] = pageNumber
+        if pageSize:
+            params["page[size]"] = pageSize
+
+        return url, params
+
+
+    def _docket_details_request(self, docket_id: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Builds the URL and query parameters for the docket details endpoint.
+
+        Returns:
+            Tuple[str, Dict[str, Any]]: The request URL and its (empty) query parameters.
+
+        Raises:
+            ValueError: If the docket_id is not provided or is empty.
+        """
+        if not docket_id:
+            raise ValueError("The 'docket_id' parameter is required and cannot be empty.")
+
+        # Construct the URL for the docket details endpoint
+        url = f"{self.base_url}/dockets/{docket_id}"
+
+        return url, {}
+
+
+    def _unique_ids(self, ids: Sequence[str]) -> List[str]:
+        """
+        Strips the IDs and removes blanks and duplicates, keeping the first occurrence's position.
+        """
+        return list(dict.fromkeys(str(resource_id).strip() for resource_id in ids if str(resource_id).strip()))
+
+
+    def _detail_result(self, resource_id: str, response: Any = None, error: Optional[BaseException] = None) -> Dict[str, Any]:
+        """
+        Builds one entry of a `get_*_details_many` result.
+
+        Returns:
+            Dict[str, Any]: `{"id": ..., **response}` on success, the 404/500 dictionary with its
+            `id` for an API error, or `{"id": ..., "error": "<message>"}` if the request raised.
+        """
+        if error is not None:
+            return {"id": resource_id, "error": f"{type(error).__name__}: {error}"}
+        return {"id": resource_id, **response}
+
+
+    def _next_page_number(self, page: Any, page_number: int) -> Optional[int]:
+        """
+        Checks a page returned while iterating and works out which page to fetch next.
+
+        Args:
+            page (Any): The JSON response for `page_number`.
+            page_number (int): The page that was just fetched.
+
+        Returns:
+            Optional[int]: The next page number, or None when iteration should stop.
+
+        Raises:
+            RuntimeError: If the API returned an error dictionary instead of a page.
+        """
+        if "error" in page:
+            raise RuntimeError(f"Regulations.gov returned an error on page {page_number}: {page}")
+
+        meta = page.get("meta", {})
+        if meta.get("lastPage", True):
+            return None
+        if page_number >= MAX_PAGE_NUMBER:
+            logger.warning(
+                "Stopped after the API limit of %s pages (%s results available); narrow the filters to see the rest.",
+                MAX_PAGE_NUMBER,
+                meta.get("totalElements"),
+            )
+            return None
+        return page_number + 1
+
+
+    def _log_request(self, method: str, url: str, params: Optional[Dict[str, Any]] = None):
+        """
+        Logs the details of an API request.
+
+        Args:
+            method (str): The HTTP method (e.g., GET, POST).
+            url (str): The request URL.
+            params (Optional[Dict[str, Any]]): The query parameters.
+
+        Notes:
+            - This method is used for debugging and monitoring API requests.
+            - It logs the HTTP method, URL, and query parameters being sent to the API.
+        """
+        logger.info("API Request - Method: %s, URL: %s, Params: %s", method, url, params)
+
+
+class RegulationsGovAPI(RegulationsGovBase):
+    """
+    A wrapper for the Regulations.gov API (v4).
+
+    All requests go through a single pooled `requests.Session`, so connections to the API
+    are kept alive and reused instead of paying a new TCP+TLS handshake on every call.
+
+    Attributes:
+        api_key (str): The API key for authenticating requests.
+        base_url (str): The base URL for the Regulations.gov API.
+        timeout (Tuple[float, float]): The (connect, read) timeouts in seconds.
+    """
+
+    def __init__(
+        self,
+        api_key: Union[str, Sequence[str]],
+        base_url: str = "https://api.regulations.gov/v4",
+        timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+        pool_connections: int = 4,
+        pool_maxsize: int = 32,
+        key_pool: Optional[ApiKeyPool] = None,
+        cache: Optional[ResponseCache] = None,
+    ):
+        """
+        Initializes the RegulationsGovAPI instance.
+
+        Args:
+            api_key (Union[str, Sequence[str]]): The API key, or several keys to spread requests across.
+            base_url (str): The base URL for the Regulations.gov API. Defaults to the production endpoint.
+            timeout (Union[float, Tuple[float, float]]): A single timeout or a (connect, read) pair in seconds.
+            pool_connections (int): The number of distinct hosts to keep connection pools for.
+            pool_maxsize (int): The maximum number of keep-alive connections kept per host. This bounds
+                how many requests can share warm connections when many sessions call the client at once.
+            key_pool (Optional[ApiKeyPool]): A pool shared with other clients. Defaults to a new pool.
+            cache (Optional[ResponseCache]): A response cache to read from and write to. Defaults to none.
+        """
+        super().__init__(api_key, base_url=base_url, timeout=timeout, key_pool=key_pool, cache=cache)
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+
+        # The session is created lazily and shared by every thread using this client
+        self._session: Optional[requests.Session] = None
+        self._session_lock = threading.Lock()
+        self._in_flight = SingleFlight()
+        logger.info("RegulationsGovAPI initialized with base URL: %s", self.base_url)
+
+
+    def _get_session(self) -> requests.Session:
+        """
+        Returns the shared pooled session, creating it on first use.
+
+        Notes:
+            - The session only ever issues GET requests with per-request headers and is never
+              mutated after creation, so sharing it across threads is safe. The underlying
+              urllib3 connection pool is thread-safe.
+            - `pool_block=False` means a burst beyond `pool_maxsize` still goes through on a
+              short-lived extra connection rather than waiting for a free one.
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=self.pool_connections,
+                        pool_maxsize=self.pool_maxsize,
+                        pool_block=False,
+                    )
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
+
+    def _get(self, url: str, params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        """
+        Issues a GET request on the pooled session with the client's headers and timeouts.
+
+        The request waits for a key with quota first, and 429/502/503/504 responses are retried (on
+        another key for a 429, with backoff for the others) up to `key_pool.max_retries` times
+        before the last response is returned. Interactive requests stop waiting after
+        `key_pool.max_interactive_wait` seconds in total.
+
+        Args:
+            url (str): The request URL.
+            params (Optional[Dict[str, Any]]): The query parameters.
+
+        Returns:
+            requests.Response: The raw HTTP response.
+
+        Raises:
+            requests.exceptions.Timeout: If the connect or read timeout is exceeded.
+            RateLimitWaitError: If an interactive request would wait on the rate limit too long.
+        """
+        attempt = 0
+        deadline = self.key_pool.deadline()
+        while True:
+            api_key = self.key_pool.acquire(deadline=deadline)
+            response = self._get_session().get(
+                url, headers=self._headers_for(api_key), params=params, timeout=self.timeout
+            )
+            self.key_pool.update_from_headers(api_key, response.headers)
+
+            if response.status_code not in RETRY_STATUS_CODES or attempt >= self.key_pool.max_retries:
+                return response
+
+            delay = self.key_pool.retry_delay(
+                api_key, response.status_code, response.headers.get("Retry-After"), attempt
+            )
+            logger.warning("HTTP %s from %s; retrying in %.1fs", response.status_code, url, delay)
+            self.key_pool.check_wait(delay, deadline)
+            time.sleep(delay)
+            attempt += 1
+
+
+    def _fetch(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Returns the handled response for a GET request, from the cache when possible.
+
+        On a cache miss, threads asking for the same request at the same time share a single
+        network call.
+
+        Args:
+            url (str): The request URL.
+            params (Optional[Dict[str, Any]]): The query parameters.
+
+        Returns:
+            Any: The JSON data from the response or error details (see `_handle_response`).
+        """
+        key = make_cache_key("GET", url, params)
+        hit, value = self._cache_lookup(key)
+        if hit:
+            return value
+        return self._in_flight.do(key, self._fetch_from_api, key, url, params)
+
+
+    def _fetch_from_api(self, key: str, url: str, params: Optional[Dict[str, Any]]) -> Any:
+        """
+        Sends the request, handles the response and caches the result.
+        """
+        data = self._handle_response(self._get(url, params))
+        self._cache_store(key, url, data)
+        return data
+
+
+    def close(self) -> None:
+        """
+        Closes the pooled session and releases its connections.
+        """
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+    def __enter__(self) -> "RegulationsGovAPI":
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+    def _iter_pages(
+        self,
+        fetch: Callable[..., Any],
+        filters: Dict[str, Any],
+        page_size: int,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Walks the pages of a findAll endpoint and yields one record at a time.
+
+        The next page is requested on a background thread while the records of the current
+        page are being consumed, so network time overlaps with the caller's processing and
+        at most two pages are held in memory. The prefetch runs in a copy of the caller's
+        context so it keeps the caller's request priority.
+
+        Args:
+            fetch (Callable[..., Any]): The endpoint method (e.g., `self.get_documents`).
+            filters (Dict[str, Any]): The filters passed to every page request.
+            page_size (int): The number of records per page.
+
+        Yields:
+            Dict[str, Any]: Each record of the `data` array, in API order.
+        """
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="rga-prefetch") as executor:
+            page_number = 1
+            context = contextvars.copy_context()
+            future = executor.submit(context.run, fetch, pageNumber=page_number, pageSize=page_size, **filters)
+            while future is not None:
+                page = future.result()
+                next_page_number = self._next_page_number(page, page_number)
+
+                # Start fetching the next page before handing out this one
+                future = None
+                if next_page_number is not None:
+                    page_number = next_page_number
+                    future = executor.submit(context.run, fetch, pageNumber=page_number, pageSize=page_size, **filters)
+
+                yield from page.get("data", [])
+
+
+    def iter_documents(self, page_size: int = MAX_PAGE_SIZE, **filters: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Iterates over every document matching the filters, following pages automatically.
+
+        Args:
+            page_size (int): The number of records fetched per request. Defaults to the API maximum.
+            **filters: Any filter or `sort` accepted by `get_documents`.
+
+        Yields:
+            Dict[str, Any]: One document record at a time.
+        """
+        return self._iter_pages(self.get_documents, filters, page_size)
+
+
+    def iter_comments(self, page_size: int = MAX_PAGE_SIZE, **filters: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Iterates over every comment matching the filters, following pages automatically.
+
+        Args:
+            page_size (int): The number of records fetched per request. Defaults to the API maximum.
+            **filters: Any filter or `sort` accepted by `get_comments`.
+
+        Yields:
+            Dict[str, Any]: One comment record at a time.
+        """
+        return self._iter_pages(self.get_comments, filters, page_size)
+
+
+    def iter_dockets(self, page_size: int = MAX_PAGE_SIZE, **filters: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Iterates over every docket matching the filters, following pages automatically.
+
+        Args:
+            page_size (int): The number of records fetched per request. Defaults to the API maximum.
+            **filters: Any filter or `sort` accepted by `get_dockets`.
+
+        Yields:
+            Dict[str, Any]: One docket record at a time.
+        """
+        return self._iter_pages(self.get_dockets, filters, page_size)
+
+
+    def get_documents(
+        self,
+        agencyId: Optional[str] = None,
+        commentEndDate: Optional[str] = None,
+        docketId: Optional[str] = None,
+        documentType: Optional[str] = None,
+        frDocNum: Optional[str] = None,
+        searchTerm: Optional[str] = None,
+        postedDate: Optional[str] = None,
+        postedDateGe: Optional[str] = None,
+        postedDateLe: Optional[str] = None,
+        lastModifiedDate: Optional[str] = None,
+        lastModifiedDateGe: Optional[str] = None,
+        lastModifiedDateLe: Optional[str] = None,
+        subtype: Optional[str] = None,
+        withinCommentPeriod: Optional[bool] = None,
+        sort: Optional[str] = None,
+        pageNumber: Optional[int] = 1,
+        pageSize: Optional[int] = 5,
+    ) -> Any:
+        """
+        Retrieves a list of documents based on the provided filters.
+
+        For detailed information about the input parameters and usage examples
+        refer to https://open.gsa.gov/api/regulationsgov/.
+
+        The instructions for the documents agent are in the instructions folder.
+
+        Returns:
+            Any: The JSON response from the API.
+        """
+        url, params = self._documents_request(
+            agencyId=agencyId,
+            commentEndDate=commentEndDate,
+            docketId=docketId,
+            documentType=documentType,
+            frDocNum=frDocNum,
+            searchTerm=searchTerm,
+            postedDate=postedDate,
+            postedDateGe=postedDateGe,
+            postedDateLe=postedDateLe,
+            lastModifiedDate=lastModifiedDate,
+            lastModifiedDateGe=lastModifiedDateGe,
+            lastModifiedDateLe=lastModifiedDateLe,
+            subtype=subtype,
+            withinCommentPeriod=withinCommentPeriod,
+            sort=sort,
+            pageNumber=pageNumber,
+            pageSize=pageSize,
+        )
+
+        logger.info("Fetching documents with parameters: %s", params)
+
+        # Make the request (or serve it from the cache) and return the result
         try:
-            # Handle the response and return the result
-            return self._handle_response(response)
+            return self._fetch(url, params)
         except Exception as e:
             logger.error("Error handling response: %s", e)
             raise
@@ -181,26 +809,14 @@ class RegulationsGovAPI:
         Raises:
             ValueError: If the document_id is not provided or is empty.
         """
-        if not document_id:
-            raise ValueError("The 'document_id' parameter is required and cannot be empty.")
-
-        # Construct the URL for the document details endpoint
-        url = f"{self.base_url}/documents/{document_id}"
-
-        # Query parameters
-        params = {}
-        if include_attachments:
-            params["include"] = "attachments"
+        url, params = self._document_details_request(document_id, include_attachments)
 
         # Log the request details
         self._log_request("GET", url, params)
 
-        # Make the GET request to the API
-        response = requests.get(url, headers=self.headers, params=params)
-
-        # Handle the response
+        # Make the GET request to the API (or serve it from the cache) and handle the response
         try:
-            return self._handle_response(response)
+            return self._fetch(url, params)
         except Exception as e:
             logger.error("Error handling response for document ID %s: %s", document_id, e)
             raise
@@ -241,49 +857,31 @@ class RegulationsGovAPI:
         Returns:
             Any: The JSON response from the API.
         """
-        # Construct the URL for the comments endpoint
-        url = f"{self.base_url}/comments"
-
-        # Query parameters
-        params = {}
-        if agencyId:
-            params["filter[agencyId]"] = agencyId
-        if searchTerm:
-            params["filter[searchTerm]"] = searchTerm
-        if postedDate:
-            params["filter[postedDate]"] = postedDate
-        if postedDateGe:
-            params["filter[postedDate][ge]"] = postedDateGe
-        if postedDateLe:
-            params["filter[postedDate][le]"] = postedDateLe
-        if lastModifiedDate:
-            params["filter[lastModifiedDate]"] = lastModifiedDate
-        if lastModifiedDateGe:
-            params["filter[lastModifiedDate][ge]"] = lastModifiedDateGe
-        if lastModifiedDateLe:
-            params["filter[lastModifiedDate][le]"] = lastModifiedDateLe
-        if commentOnId:
-            params["filter[commentOnId]"] = commentOnId
-        if sort:
-            params["sort"] = sort
-        if pageNumber:
-            params["page[number]"] = pageNumber
-        if pageSize:
-            params["page[size]"] = pageSize
+        url, params = self._comments_request(
+            agencyId=agencyId,
+            searchTerm=searchTerm,
+            postedDate=postedDate,
+            postedDateGe=postedDateGe,
+            postedDateLe=postedDateLe,
+            lastModifiedDate=lastModifiedDate,
+            lastModifiedDateGe=lastModifiedDateGe,
+            lastModifiedDateLe=lastModifiedDateLe,
+            commentOnId=commentOnId,
+            sort=sort,
+            pageNumber=pageNumber,
+            pageSize=pageSize,
+        )
 
         # Log the request details
         self._log_request("GET", url, params)
 
-        # Make the GET request to the API
-        response = requests.get(url, headers=self.headers, params=params)
-
-        # Handle the response
+        # Make the GET request to the API (or serve it from the cache) and handle the response
         try:
-            return self._handle_response(response)
+            return self._fetch(url, params)
         except Exception as e:
             logger.error("Error handling response for comments: %s", e)
             raise
-    
+
 
     def get_comment_details(
         self,
@@ -303,26 +901,14 @@ class RegulationsGovAPI:
         Raises:
             ValueError: If the comment_id is not provided or is empty.
         """
-        if not comment_id:
-            raise ValueError("The 'comment_id' parameter is required and cannot be empty.")
-
-        # Construct the URL for the comment details endpoint
-        url = f"{self.base_url}/comments/{comment_id}"
-
-        # Query parameters
-        params = {}
-        if include_attachments:
-            params["include"] = "attachments"
+        url, params = self._comment_details_request(comment_id, include_attachments)
 
         # Log the request details
         self._log_request("GET", url, params)
 
-        # Make the GET request to the API
-        response = requests.get(url, headers=self.headers, params=params)
-
-        # Handle the response
+        # Make the GET request to the API (or serve it from the cache) and handle the response
         try:
-            return self._handle_response(response)
+            return self._fetch(url, params)
         except Exception as e:
             logger.error("Error handling response for comment ID %s: %s", comment_id, e)
             raise
@@ -358,36 +944,23 @@ class RegulationsGovAPI:
         Raises:
             ValueError: If invalid parameters are provided.
         """
-        url = f"{self.base_url}/dockets"
-        params = {}
-
-        # Map arguments to API parameters
-        if agencyId:
-            params["filter[agencyId]"] = agencyId
-        if searchTerm:
-            params["filter[searchTerm]"] = searchTerm
-        if lastModifiedDate:
-            params["filter[lastModifiedDate]"] = lastModifiedDate
-        if lastModifiedDateGe:
-            params["filter[lastModifiedDate][ge]"] = lastModifiedDateGe
-        if lastModifiedDateLe:
-            params["filter[lastModifiedDate][le]"] = lastModifiedDateLe
-        if sort:
-            params["sort"] = sort
-        if pageNumber:
-            params["page[number]"] = pageNumber
-        if pageSize:
-            params["page[size]"] = pageSize
+        url, params = self._dockets_request(
+            agencyId=agencyId,
+            searchTerm=searchTerm,
+            lastModifiedDate=lastModifiedDate,
+            lastModifiedDateGe=lastModifiedDateGe,
+            lastModifiedDateLe=lastModifiedDateLe,
+            sort=sort,
+            pageNumber=pageNumber,
+            pageSize=pageSize,
+        )
 
         # Log the request details
         self._log_request("GET", url, params)
 
-        # Make the GET request to the API
-        response = requests.get(url, headers=self.headers, params=params)
-
-        # Handle the response
+        # Make the GET request to the API (or serve it from the cache) and handle the response
         try:
-            return self._handle_response(response)
+            return self._fetch(url, params)
         except Exception as e:
             logger.error("Error handling response for dockets: %s", e)
             raise
@@ -406,38 +979,118 @@ class RegulationsGovAPI:
         Raises:
             ValueError: If the docket_id is not provided or is empty.
         """
-        if not docket_id:
-            raise ValueError("The 'docket_id' parameter is required and cannot be empty.")
-
-        # Construct the URL for the docket details endpoint
-        url = f"{self.base_url}/dockets/{docket_id}"
+        url, _ = self._docket_details_request(docket_id)
 
         # Log the request details
         self._log_request("GET", url)
 
-        # Make the GET request to the API
-        response = requests.get(url, headers=self.headers)
-
-        # Handle the response
+        # Make the GET request to the API (or serve it from the cache) and handle the response
         try:
-            return self._handle_response(response)
+            return self._fetch(url)
         except Exception as e:
             logger.error("Error handling response for docket ID %s: %s", docket_id, e)
             raise
-    
 
-    def _log_request(self, method: str, url: str, params: Optional[Dict[str, Any]] = None):
+
+    def _details_many(
+        self,
+        fetch: Callable[..., Any],
+        ids: Sequence[str],
+        max_workers: int,
+        **kwargs: Any,
+    ) -> List[Dict[str, Any]]:
         """
-        Logs the details of an API request.
+        Fetches the details of several resources on a bounded thread pool.
+
+        Every request still goes through the key pool, cache and coalescing, and runs with the
+        caller's request priority. A failure is reported in that ID's entry and never fails the
+        whole batch.
 
         Args:
-            method (str): The HTTP method (e.g., GET, POST).
-            url (str): The request URL.
-            params (Optional[Dict[str, Any]]): The query parameters.
+            fetch (Callable[..., Any]): The single-resource method (e.g., `self.get_document_details`).
+            ids (Sequence[str]): The resource IDs. Blanks and duplicates are dropped.
+            max_workers (int): The number of requests in flight at once.
+            **kwargs: Extra arguments for `fetch`.
 
-        Notes:
-            - This method is used for debugging and monitoring API requests.
-            - It logs the HTTP method, URL, and query parameters being sent to the API.
+        Returns:
+            List[Dict[str, Any]]: One entry per unique ID, in input order (see `_detail_result`).
         """
-        logger.info("API Request - Method: %s, URL: %s, Params: %s", method, url, params)
+        unique_ids = self._unique_ids(ids)
+
+        def fetch_one(resource_id: str) -> Dict[str, Any]:
+            try:
+                return self._detail_result(resource_id, fetch(resource_id, **kwargs))
+            except Exception as err:
+                logger.error("Error fetching details for ID %s: %s", resource_id, err)
+                return self._detail_result(resource_id, error=err)
 
+        if not unique_ids:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_ids)), thread_name_prefix="rga-details") as executor:
+            futures = [executor.submit(contextvars.copy_context().run, fetch_one, resource_id) for resource_id in unique_ids]
+            return [future.result() for future in futures]
+
+
+    def get_document_details_many(
+        self,
+        document_ids: Sequence[str],
+        include_attachments: Optional[bool] = True,
+        max_workers: int = 8,
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieves detailed information for several documents at once.
+
+        Args:
+            document_ids (Sequence[str]): The document IDs to retrieve.
+            include_attachments (Optional[bool]): Whether to include attachments in each response.
+            max_workers (int): The number of requests in flight at once.
+
+        Returns:
+            List[Dict[str, Any]]: One entry per unique ID, in input order. Each entry is the JSON
+            response with an added `id`, or `{"id": ..., "error": ...}` if that lookup failed.
+        """
+        return self._details_many(
+            self.get_document_details, document_ids, max_workers, include_attachments=include_attachments
+        )
+
+
+    def get_comment_details_many(
+        self,
+        comment_ids: Sequence[str],
+        include_attachments: Optional[bool] = True,
+        max_workers: int = 8,
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieves detailed information for several comments at once.
+
+        Args:
+            comment_ids (Sequence[str]): The comment IDs to retrieve.
+            include_attachments (Optional[bool]): Whether to include attachments in each response.
+            max_workers (int): The number of requests in flight at once.
+
+        Returns:
+            List[Dict[str, Any]]: One entry per unique ID, in input order. Each entry is the JSON
+            response with an added `id`, or `{"id": ..., "error": ...}` if that lookup failed.
+        """
+        return self._details_many(
+            self.get_comment_details, comment_ids, max_workers, include_attachments=include_attachments
+        )
+
+
+    def get_docket_details_many(
+        self,
+        docket_ids: Sequence[str],
+        max_workers: int = 8,
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieves detailed information for several dockets at once.
+
+        Args:
+            docket_ids (Sequence[str]): The docket IDs to retrieve.
+            max_workers (int): The number of requests in flight at once.
+
+        Returns:
+            List[Dict[str, Any]]: One entry per unique ID, in input order. Each entry is the JSON
+            response with an added `id`, or `{"id": ..., "error": ...}` if that lookup failed.
+        """
+        return self._details_many(self.get_docket_details, docket_ids, max_workers)
@@ -8,17 +8,22 @@ chatbot logic as the console and Gradio examples, now with streaming support.
 """
 import os
 import sys
+import time
+import uuid
 
 
 # Add the parent directory of 'app' and 'swarm' to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import streamlit as st
-from swarm import Swarm
 import dotenv
 
 # Import the main agent
 from agents import triage_agent, documents_agent, comments_agent, dockets_agent
+from context_budget import ContextBudget
+from parallel_swarm import ParallelSwarm
+from query_router import QueryRouter
+from fan_out import FanOutCoordinator
 
 # Import for Azure OpenAI
 from openai import AzureOpenAI
@@ -36,7 +41,7 @@ aoai_client = AzureOpenAI(
     azure_endpoint=os.getenv("AOAI_ENDPOINT")
 )
 
-swarm_client = Swarm(client=aoai_client)
+swarm_client = ParallelSwarm(client=aoai_client, max_workers=int(os.getenv("SWARM_TOOL_WORKERS", "8")))
 
 # Map agent names to agent objects
 agent_map = {
@@ -46,6 +51,110 @@ agent_map = {
     "Dockets Agent": dockets_agent,
 }
 
+# Build every agent's tool schemas once, up front
+swarm_client.precompute_tool_schemas(*agent_map.values())
+
+# Map router labels to the specialist agents
+specialists = {"documents": documents_agent, "comments": comments_agent, "dockets": dockets_agent}
+
+# Clear queries skip the Triage Agent's LLM call and go straight to the specialist. One router
+# serves every session and the fan-out, as in the console app.
+query_router = QueryRouter(
+    threshold=float(os.getenv("QUERY_ROUTER_THRESHOLD", "0.8")),
+    enabled=os.getenv("QUERY_ROUTER_ENABLED", "true").lower() == "true",
+)
+
+# Compound questions run the specialists concurrently instead of transferring between them
+fan_out = FanOutCoordinator(
+    swarm_client,
+    specialists,
+    model=triage_agent.model,
+    router=query_router,
+    enabled=os.getenv("CHAT_FAN_OUT_ENABLED", "true").lower() == "true",
+)
+
+
+class StreamRenderer:
+    """
+    Draws a streamed answer at a steady cadence instead of on every token.
+
+    Redrawing the whole growing message for each token is quadratic work and sends a websocket
+    update per token. The renderer buffers the chunks in a list and redraws when `interval`
+    seconds have passed or `flush_chars` characters are waiting, so the number of redraws grows
+    with the answer's duration rather than its token count. Tool-call status goes to its own
+    container and is only redrawn when it changes.
+    """
+
+    def __init__(self, container, status_container, interval: float = 0.1, flush_chars: int = 400):
+        """
+        Initializes the renderer.
+
+        Args:
+            container: The Streamlit placeholder for the answer text.
+            status_container: The Streamlit placeholder for the tool-call status.
+            interval (float): Seconds between redraws while text is arriving.
+            flush_chars (int): Buffered characters that force a redraw sooner.
+        """
+        self.container = container
+        self.status_container = status_container
+        self.interval = interval
+        self.flush_chars = flush_chars
+        self._text = ""
+        self._pending = []
+        self._pending_chars = 0
+        self._last_flush = time.monotonic()
+        self._status = None
+
+
+    def has_content(self) -> bool:
+        """
+        Tells whether the current message has any text yet.
+        """
+        return bool(self._text or self._pending)
+
+
+    def add(self, text: str) -> None:
+        """
+        Buffers a chunk of text and redraws if the cadence allows.
+        """
+        self._pending.append(text)
+        self._pending_chars += len(text)
+        if self._pending_chars >= self.flush_chars or time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+
+
+    def flush(self) -> None:
+        """
+        Redraws the answer with everything buffered so far.
+        """
+        if self._pending:
+            self._text += "".join(self._pending)
+            self._pending = []
+            self._pending_chars = 0
+            self.container.markdown(self._text)
+        self._last_flush = time.monotonic()
+
+
+    def status(self, text: str) -> None:
+        """
+        Shows the tool-call status, if it changed.
+        """
+        if text != self._status:
+            self._status = text
+            self.status_container.caption(text)
+
+
+    def finish(self) -> str:
+        """
+        Draws the rest of the current message and starts a new one.
+
+        Returns:
+            str: The full text of the message that ended.
+        """
+        self.flush()
+        text, self._text = self._text, ""
+        return text
+
 
 def main():
     st.set_page_config(page_title="Agentic Chat with the Regulations.gov", layout="wide")
@@ -72,6 +181,11 @@ def display_chat_interface():
         st.session_state["internal_chatter"] = []
     if "agent_name" not in st.session_state:
         st.session_state["agent_name"] = "Triage Agent"
+    if "session_id" not in st.session_state:
+        st.session_state["session_id"] = uuid.uuid4().hex  # Scopes the tools' stored results to this browser session
+    if "context_budget" not in st.session_state:
+        # Only the part of the history that fits the agent's token budget is sent each turn
+        st.session_state["context_budget"] = ContextBudget(max_tokens=int(os.getenv("CHAT_CONTEXT_MAX_TOKENS", "12000")))
 
     # Set the chat mode configuration
     streaming = True
@@ -95,26 +209,54 @@ def display_chat_interface():
         # Get the current agent
         agent = agent_map.get(st.session_state["agent_name"], triage_agent)
 
+        # Compound questions are answered by the specialists running concurrently
+        if agent is triage_agent:
+            with st.spinner("Working..."):
+                result = fan_out.run(
+                    user_input,
+                    context_variables={"session_id": st.session_state["session_id"]},
+                    history=st.session_state["messages"][:-1],
+                )
+            if result:
+                with st.chat_message("assistant"):
+                    st.markdown(result["answer"])
+                st.session_state["messages"].extend(result["messages"])
+                st.session_state["fan_out"] = result
+                if capture_tools_called:
+                    st.session_state["tools_called"].extend(result["tools_called"])
+                if capture_internal_chatter:
+                    st.session_state["internal_chatter"].extend(result["internal_chatter"])
+                with st.expander("Debug Information"):
+                    display_debug_info()
+                return
+
+        decision = None
+        if agent is triage_agent:
+            decision = query_router.route(user_input)
+            if decision["label"]:
+                agent = specialists[decision["label"]]
+
         # Display assistant response (streaming)
         with st.chat_message("assistant"):
 
             # Call the Swarm API with streaming enabled
             response = swarm_client.run(
                 agent=agent,
-                messages=st.session_state["messages"],
-                context_variables={},
+                messages=st.session_state["context_budget"].prepare(st.session_state["messages"], agent.name),
+                context_variables={"session_id": st.session_state["session_id"]},
                 stream=streaming,  # Enable streaming
                 debug=False,
                 capture_tools_called=capture_tools_called,
                 capture_internal_chatter=capture_internal_chatter,
             )
 
-            # Create a container for the streaming response
+            # Create containers for the streaming response and the tool-call status
+            status_container = st.empty()
             response_container = st.empty()
 
             # Handle streaming response
             if streaming:
-                content = ""
+                renderer = StreamRenderer(response_container, status_container)
                 last_sender = ""
 
                 # Process the streaming response
@@ -127,12 +269,10 @@ def display_chat_interface():
                     # Process the content
                     if "content" in chunk and chunk["content"] is not None:
                         # If the content is empty and there is a last sender, clear the last sender
-                        if not content and last_sender:
+                        if not renderer.has_content() and last_sender:
                             last_sender = ""
-                        # Append the content to the content variable
-                        content += chunk["content"]
-                        # Update the response container with the content
-                        response_container.markdown(content)
+                        # Buffer the content; the renderer redraws on its own cadence
+                        renderer.add(chunk["content"])
 
                     # If the tool calls show the status of them being called.
                     if "tool_calls" in chunk and chunk["tool_calls"] is not None:
@@ -141,22 +281,32 @@ def display_chat_interface():
                             name = f["name"]
                             if not name:
                                 continue
-                            response_container.markdown(f"{last_sender}: {name}")
+                            renderer.status(f"{last_sender}: {name}" if last_sender else f"Calling {name}")
 
                     # If the delimiter is end and the content is not empty, add the content to the session state
-                    if "delim" in chunk and chunk["delim"] == "end" and content:
-                        st.session_state["messages"].append({"role": "assistant", "content": content})
-                        content = ""
+                    if "delim" in chunk and chunk["delim"] == "end":
+                        content = renderer.finish()
+                        if content:
+                            st.session_state["messages"].append({"role": "assistant", "content": content})
 
                     # If the response is in the chunk, hold it for later processing
                     if "response" in chunk:
                         tool_and_chatter_holder = chunk["response"]
 
+                renderer.finish()
+                status_container.empty()
+
             else:
                 # If not streaming handle another way
                 st.markdown(response.messages[-1]["content"])  
                 st.session_state["messages"].extend(response.messages)
 
+        # Record the Triage Agent's choice, so the router's threshold can be tuned
+        final_response = tool_and_chatter_holder if streaming else response
+        if decision and not decision["label"] and final_response is not None:
+            actual = next((label for label, specialist in specialists.items() if specialist.name == final_response.agent.name), "other")
+            query_router.observe(decision, actual)
+
         # Process tools_called and internal_chatter after streaming is complete
         if capture_tools_called:
             st.session_state["tools_called"].extend(tool_and_chatter_holder.tools_called)
@@ -179,6 +329,30 @@ def display_debug_info():
     else:
         st.write("No tools called yet.")
 
+    st.subheader("Context Budget")
+    context_budget = st.session_state.get("context_budget")
+    if context_budget and context_budget.last_metrics:
+        metrics = context_budget.last_metrics
+        st.write(
+            f"- **Last turn**: {metrics['tokens_before']:,} -> {metrics['tokens_after']:,} tokens "
+            f"(saved {metrics['tokens_saved']:,}, budget {metrics['budget']:,})"
+        )
+        st.write(f"- **Session**: {context_budget.stats()}")
+    else:
+        st.write("No turns yet.")
+
+    st.subheader("Fan-Out")
+    if st.session_state.get("fan_out"):
+        result = st.session_state["fan_out"]
+        st.write(f"- **Last fan-out**: {result['seconds']}s")
+        for task in result["tasks"]:
+            st.write(f"- **{task['agent']}** ({task['seconds']}s): {task['task']}")
+    else:
+        st.write("No fan-out yet.")
+
+    st.subheader("Query Router")
+    st.write(query_router.stats())
+
     st.subheader("Internal Chatter")
     if st.session_state.get("internal_chatter"):
         for message in st.session_state["internal_chatter"]:
@@ -7,7 +7,8 @@
 #
 # Tools:
 #   1. **Transfer Functions**: Functions to transfer queries to specialized agents.
-#   2. **Utility Functions**: Functions to get agency ID and PDF content.
+#   2. **Utility Functions**: Functions to get agency ID, PDF content and the PDF passages
+#      that answer a question, and to read large results stored by handle.
 #
 # Usage:
 #   - Import the desired tools into the agents or chatbot scripts as needed.
@@ -16,10 +17,14 @@
 ##########################################################################################
 
 # Import necessary libraries
-import json
-import os
-import requests
-from markitdown import MarkItDown
+from typing import Optional
+from rga_agencies import AgencyIndex
+from rga_attachments import DEFAULT_MAX_CHARS, format_page_ranges
+from rga_client_instance import attachment_reader, result_store  # Shared attachment reader and result store
+from rga_results import session_id
+
+# Agency list, loaded and indexed once on first use
+agency_index = AgencyIndex('data/agency.json')
 
 ##########################################################################################
 # Transfer Functions
@@ -61,49 +66,178 @@ def transfer_back_to_triage():
 ##########################################################################################
 
 
-def get_agency_id():
+def get_agency_id(agency: str = "", top_k: int = 5):
     """
-    Retrieves a json array with each agencyID (ID) and the agency.
+    Finds the agency ID (e.g., "DOS") for an agency name, alias or acronym (e.g., "State Department").
 
-    Use this tool when you need to get the agency ID for filtering documents.
-    """
-    with open('data/agency.json', 'r', encoding='utf-8') as file:
-        agency_list = json.load(file)
-    return agency_list
+    Use this tool when you need to get the agency ID for filtering documents. It returns only the
+    best few matches with a score: 1.0 for an exact ID, about 0.97 for an exact name or common
+    alias, and lower for partial or misspelled names.
 
+    Args:
+        agency (str): What the user called the agency. Leave empty only to list every agency.
+        top_k (int): The most candidates to return (default 5).
 
-def get_pdf_content(pdf_url: str) -> str:
+    Returns:
+        list: Matching agencies as objects with `ID`, `Agency` and `score`, best first.
+    """
+    if not agency or not agency.strip():
+        return agency_index.all()
+    return agency_index.lookup(agency, top_k=min(max(int(top_k), 1), 20))
+
+
+def get_pdf_content(
+    pdf_url: str,
+    size: Optional[int] = None,
+    pages: Optional[str] = None,
+    max_chars: Optional[int] = None,
+    page_offset: Optional[int] = None,
+    context_variables: Optional[dict] = None,
+) -> str:
     """
     Retrieves the content of a PDF file from a given URL, converts it to Markdown using the MarkItDown library,
     and returns the Markdown content.
 
+    PDFs are read by page: the result starts with the table of contents (when no pages are
+    requested), followed by as many of the requested pages as fit in `max_chars`, and says which
+    page (and, for a page too long to fit, which `page_offset`) to request next. Other formats are converted whole and cut at `max_chars`.
+
     Args:
         pdf_url (str): The URL of the PDF file to be converted.
+        size (Optional[int]): The file size in bytes from the attachment's `files` entry, if known.
+            Files over the download limit are refused before they are downloaded.
+        pages (Optional[str]): The pages to read, e.g. "1-5", "8, 12-14" or "20-". Defaults to the
+            whole document, from the first page.
+        max_chars (Optional[int]): The most characters of text to return (default 40,000).
+        page_offset (Optional[int]): The character of the first requested page to start from, to
+            continue a page that was cut. Defaults to the start of the page.
+        context_variables (Optional[dict]): Set by Swarm; its `session_id` scopes stored results.
 
     Returns:
-        str: The Markdown content of the PDF file.
+        str: The Markdown content of the requested pages.
     """
-    # Step 1: Download the PDF file from the provided URL
-    response = requests.get(pdf_url)
-    if response.status_code != 200:
-        raise Exception(f"Failed to download PDF from {pdf_url}. Status code: {response.status_code}")
+    max_chars = int(max_chars) if max_chars else DEFAULT_MAX_CHARS
+
+    # Formats other than PDF cannot be read by page; convert them whole
+    if not attachment_reader.is_pdf(pdf_url):
+        try:
+            markdown_content = attachment_reader.markdown(pdf_url, size=size)
+        except Exception as e:
+            raise Exception(f"Failed to convert {pdf_url} to Markdown: {str(e)}")
+        return result_store.offload(session_id(context_variables), markdown_content, "get_pdf_content", inline_chars=max_chars)
+
+    try:
+        result = attachment_reader.read_pages(pdf_url, pages=pages, size=size, max_chars=max_chars, page_offset=page_offset or 0)
+    except ValueError:
+        raise
+    except Exception as e:
+        raise Exception(f"Failed to read PDF from {pdf_url}: {str(e)}")
+    return _format_pdf_pages(pdf_url, result, include_outline=not pages and not page_offset)
+
+
+def get_pdf_passages(query: str, pdf_urls: str, top_k: int = 5) -> str:
+    """
+    Finds the passages of one or more attachments that best answer a question, with their page numbers.
+
+    Use this instead of `get_pdf_content` when the user asks a specific question about a long
+    document (or about every attachment in a docket): it returns a few short passages rather than
+    whole pages. The attachments are indexed locally (keyword ranking, no external service), and
+    the index is cached, so follow-up questions about the same attachments are fast.
+
+    Args:
+        query (str): The question or keywords to look for, e.g. "small business exemption".
+        pdf_urls (str): Comma-separated attachment URLs (the `url` values of `files`) to search together.
+        top_k (int): The number of passages to return (default 5, at most 20).
 
-    # Save the PDF temporarily
-    temp_pdf_path = "temp_downloaded_file.pdf"
-    with open(temp_pdf_path, "wb") as pdf_file:
-        pdf_file.write(response.content)
+    Returns:
+        str: The best passages in Markdown, each with its attachment, page and relevance score.
+    """
+    urls = [url.strip() for url in pdf_urls.split(",") if url.strip()]
+    if not urls:
+        raise ValueError("pdf_urls must contain at least one attachment URL.")
+    top_k = min(max(int(top_k), 1), 20)
 
-    # Step 2: Convert the PDF to Markdown using MarkItDown
     try:
-        md = MarkItDown()
-        result = md.convert(temp_pdf_path)
-        markdown_content = result.text_content
+        passages = attachment_reader.search_passages(query, urls, top_k=top_k)
     except Exception as e:
-        raise Exception(f"Failed to convert PDF to Markdown: {str(e)}")
-    finally:
-        # Clean up the temporary file
-        if os.path.exists(temp_pdf_path):
-            os.remove(temp_pdf_path)
-
-    # Step 3: Return the Markdown content
-    return markdown_content
+        raise Exception(f"Failed to search {pdf_urls}: {str(e)}")
+    if not passages:
+        return f"No passages match '{query}' in {len(urls)} attachment(s)."
+
+    lines = [f"**Query:** {query}", f"**Attachments searched:** {len(urls)}"]
+    for rank, passage in enumerate(passages, 1):
+        location = f"p. {passage['page']}" if passage["page"] else "no page numbers"
+        section = f" - {passage['section']}" if passage["section"] else ""
+        lines.append(f"\n### {rank}. {location}{section} (score {passage['score']})")
+        lines.append(f"*Source:* {passage['source']}\n")
+        lines.append(passage["text"])
+    return "\n".join(lines)
+
+
+def _format_pdf_pages(pdf_url: str, result: dict, include_outline: bool) -> str:
+    """
+    Renders the result of `AttachmentReader.read_pages` as Markdown for the agents.
+    """
+    returned = [page_number for page_number, _ in result["pages"]]
+    lines = [f"**Attachment:** {pdf_url}"]
+    if returned:
+        lines.append(f"**Pages returned:** {returned[0]}-{returned[-1]} of {result['page_count']}")
+    else:
+        lines.append(f"**Pages returned:** none of {result['page_count']}")
+
+    if include_outline and result["outline"]:
+        lines.append("\n## Table of Contents")
+        for entry in result["outline"][:150]:
+            if entry["level"] <= 3:
+                page = f" (p. {entry['page']})" if entry["page"] else ""
+                lines.append(f"{'  ' * (entry['level'] - 1)}- {entry['title']}{page}")
+
+    for page_number, text in result["pages"]:
+        lines.append(f"\n## Page {page_number}\n")
+        lines.append(text.strip())
+
+    if result["truncated"]:
+        lines.append(f"\n*[Page {returned[-1]} was cut to fit the character budget.]*")
+    # Continue with the rest of what was asked for, not everything after the next page
+    remaining = format_page_ranges(result["remaining_pages"], result["page_count"])
+    if result["next_offset"]:
+        lines.append(
+            f"\n---\n*More text is available. Call `get_pdf_content` again with "
+            f"`pages=\"{remaining}\"` and `page_offset={result['next_offset']}` to continue reading.*"
+        )
+    elif result["next_page"]:
+        lines.append(
+            f"\n---\n*More pages are available. Call `get_pdf_content` again with "
+            f"`pages=\"{remaining}\"` to continue reading, or request specific pages.*"
+        )
+    return "\n".join(lines)
+
+
+def read_result(
+    handle: str,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    filter: Optional[str] = None,
+    sort: Optional[str] = None,
+    context_variables: Optional[dict] = None,
+) -> dict:
+    """
+    Reads more of a large result that another tool stored and returned as a `handle`.
+
+    Use this instead of calling the original tool again: it pages, filters and sorts the stored
+    rows (or text sections) without another API call. Handles expire after about 30 minutes.
+
+    Args:
+        handle (str): The handle from the earlier result (e.g., "res-1a2b3c4d").
+        offset (int): The first row (or text section) to return, counting from 0, after filtering.
+        limit (Optional[int]): The most rows (or text sections) to return. Defaults to as many as fit comfortably.
+        filter (Optional[str]): "column=value" keeps rows whose column contains the value (e.g., "type=Rule");
+            any other text keeps rows (or text sections) containing it. Case-insensitive.
+        sort (Optional[str]): A column to sort by, e.g. "posted"; prefix "-" for descending ("-posted").
+        context_variables (Optional[dict]): Set by Swarm; its `session_id` scopes stored results.
+
+    Returns:
+        dict: `offset`, `matched` (rows after filtering), `hasMore`, and the `columns` and `rows`,
+        the `items`, or the `text` of the slice.
+    """
+    return result_store.read(session_id(context_variables), handle, offset=offset, limit=limit, filter=filter, sort=sort)